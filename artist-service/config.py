@@ -2,6 +2,7 @@ from pydantic import Field
 from pydantic_settings import BaseSettings
 from typing import List, Optional
 import boto3
+from botocore.config import Config
 import json
 
 
@@ -10,8 +11,20 @@ class Settings(BaseSettings):
     db_url: str = Field(alias="db_url_py")
     jwt_secret: str = Field(alias="JWT_SECRET")
     jwt_algorithm: str = Field(alias="JWT_ALGORITHM", default="HS256")
+    # Claims ya verificados que se recuerdan por worker (LRU)
+    jwt_cache_max_entries: int = Field(alias="JWT_CACHE_MAX_ENTRIES", default=10000)
     port: int = Field(alias="ARTIST_PORT", default=8002)
     rabbitmq_url: str = Field(alias="RABBITMQ_URL")
+    # Publicador de eventos: canales con confirms y mensajes por lote
+    rabbitmq_publisher_channels: int = Field(
+        alias="RABBITMQ_PUBLISHER_CHANNELS", default=4, ge=1
+    )
+    rabbitmq_publish_batch_size: int = Field(
+        alias="RABBITMQ_PUBLISH_BATCH_SIZE", default=100, ge=1
+    )
+    # Outbox: eventos por pasada del relay y espera máxima entre pasadas (s)
+    outbox_batch_size: int = Field(alias="OUTBOX_BATCH_SIZE", default=100, ge=1)
+    outbox_poll_interval: float = Field(alias="OUTBOX_POLL_INTERVAL", default=1.0, gt=0)
 
     # === CORS ===
     frontend_origins_raw: str = Field(
@@ -24,6 +37,11 @@ class Settings(BaseSettings):
     aws_session_token: Optional[str] = Field(default=None, alias="AWS_SESSION_TOKEN")
     aws_region: str = Field(alias="AWS_REGION")
     aws_s3_bucket: str = Field(alias="AWS_S3_BUCKET")
+    # Endpoint alternativo (moto, MinIO...) para desarrollo y pruebas
+    s3_endpoint_url: Optional[str] = Field(default=None, alias="S3_ENDPOINT_URL")
+    # Llamadas simultáneas a S3 por worker (hilos y conexiones HTTP)
+    s3_max_concurrency: int = Field(alias="S3_MAX_CONCURRENCY", default=16, ge=1)
+    s3_max_attempts: int = Field(alias="S3_MAX_ATTEMPTS", default=4, ge=1)
 
     # === STORAGE SETTINGS ===
     max_file_size: int = Field(default=15 * 1024 * 1024)
@@ -52,7 +70,7 @@ class Settings(BaseSettings):
                 pass
         return [p.strip() for p in s.split(",") if p.strip()]
 
-    def get_s3_client(self):
+    def get_s3_client(self, config: Optional[Config] = None):
         """Devuelve un cliente boto3 configurado para S3."""
         args = {
             "aws_access_key_id": self.aws_access_key_id,
@@ -61,6 +79,10 @@ class Settings(BaseSettings):
         }
         if self.aws_session_token:
             args["aws_session_token"] = self.aws_session_token
+        if self.s3_endpoint_url:
+            args["endpoint_url"] = self.s3_endpoint_url
+        if config is not None:
+            args["config"] = config
         return boto3.client("s3", **args)
 
     def get_public_base_url(self) -> str:
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -129,3 +130,18 @@ class SongArtist(Base):
     artist_id = Column(
         Integer, ForeignKey("music_streaming.artists.id"), primary_key=True
     )
+
+
+class OutboxEvent(Base):
+    """Evento pendiente de publicar: se escribe en la misma transacción que el cambio."""
+
+    __tablename__ = "artist_outbox"
+    __table_args__ = {"schema": "music_streaming"}
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    queue = Column(String(100), nullable=False)
+    body = Column(Text, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, server_default=text("CURRENT_TIMESTAMP"))
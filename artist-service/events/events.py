@@ -1,7 +1,6 @@
-import json
-import aio_pika  # librería async para RabbitMQ
 from datetime import datetime, date
-from config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+from events.outbox import add_outbox_event
 
 
 def default_serializer(obj):
@@ -10,15 +9,10 @@ def default_serializer(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
-async def publish_artist_created_event(artist_data: dict):
-    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
-    async with connection:
-        channel = await connection.channel()
-        # Declaramos la cola (si no existe)
-        queue = await channel.declare_queue("artist_created", durable=True)
+def enqueue_artist_created_event(session: AsyncSession, artist_data: dict):
+    # Se guarda en la outbox de la transacción; default_serializer para fechas
+    add_outbox_event(session, "artist_created", artist_data, default=default_serializer)
 
-        # Publicamos el mensaje, usando default_serializer para fechas
-        message = aio_pika.Message(
-            body=json.dumps(artist_data, default=default_serializer).encode()
-        )
-        await channel.default_exchange.publish(message, routing_key=queue.name)
+
+def enqueue_artist_deleted_event(session: AsyncSession, artist_data: dict):
+    add_outbox_event(session, "artist_deleted", artist_data, default=default_serializer)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+from typing import Any, Callable
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from database.connection import AsyncSessionLocal
+from database.models import OutboxEvent
+from events.publisher import EventPublisher, event_publisher
+from config import settings
+
+# Marca en session.info: hay eventos nuevos en la transacción en curso
+_PENDING_FLAG = "outbox_pending"
+
+
+def add_outbox_event(
+    session: AsyncSession,
+    queue_name: str,
+    payload: dict,
+    default: Callable[[Any], Any] | None = None,
+) -> None:
+    """
+    Añade el evento a la transacción de `session`: se guarda (o se pierde)
+    junto con el cambio que lo origina. El relay lo publica tras el commit.
+    """
+    session.add(OutboxEvent(queue=queue_name, body=json.dumps(payload, default=default)))
+    session.info[_PENDING_FLAG] = True
+
+
+class OutboxRelay:
+    """
+    Publica en RabbitMQ los eventos de la outbox, por lotes.
+
+    Cada pasada toma hasta `batch_size` filas con FOR UPDATE SKIP LOCKED
+    (varios workers pueden drenar a la vez sin repetir filas), las publica
+    con confirmación y borra las confirmadas en la misma transacción. Las
+    que fallan se quedan para la siguiente pasada. Un commit con eventos
+    despierta al relay al momento; si no, revisa la tabla cada
+    `poll_interval` segundos. La entrega es al menos una vez.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        publisher: EventPublisher,
+        batch_size: int = 100,
+        poll_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.publisher = publisher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self._ensure_table()
+        self._task = asyncio.create_task(self._run())
+        print("[*] Relay de la outbox iniciado")
+
+    async def _ensure_table(self) -> None:
+        try:
+            async with self.session_factory() as session:
+                connection = await session.connection()
+                await connection.run_sync(
+                    lambda sync_conn: OutboxEvent.__table__.create(sync_conn, checkfirst=True)
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"[!] No se pudo comprobar la tabla de la outbox: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                published = await self.relay_batch()
+            except Exception as e:
+                print(f"[!] Error drenando la outbox: {e}")
+                published = 0
+            # Lote completo: probablemente quedan más, se sigue sin esperar
+            if published >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def relay_batch(self) -> int:
+        """Publica un lote de la outbox; devuelve cuántos eventos se confirmaron."""
+        async with self.session_factory() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(OutboxEvent)
+                    .order_by(OutboxEvent.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = result.scalars().all()
+                if not rows:
+                    return 0
+
+                results = await asyncio.gather(
+                    *(self.publisher.publish(row.queue, row.body.encode()) for row in rows),
+                    return_exceptions=True,
+                )
+                published = []
+                for row, outcome in zip(rows, results):
+                    if isinstance(outcome, BaseException):
+                        row.attempts += 1
+                        row.last_error = str(outcome)[:500]
+                    else:
+                        published.append(row.id)
+
+                if published:
+                    await session.execute(
+                        delete(OutboxEvent)
+                        .where(OutboxEvent.id.in_(published))
+                        .execution_options(synchronize_session=False)
+                    )
+
+        failed = len(rows) - len(published)
+        if failed:
+            print(f"[!] Outbox: {failed} evento(s) sin publicar, se reintentarán")
+        return len(published)
+
+    async def close(self) -> None:
+        # Lo que quede en la tabla se publica en el próximo arranque
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+outbox_relay = OutboxRelay(
+    AsyncSessionLocal,
+    event_publisher,
+    batch_size=settings.outbox_batch_size,
+    poll_interval=settings.outbox_poll_interval,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_relay(session: Session) -> None:
+    if session.info.pop(_PENDING_FLAG, False):
+        outbox_relay.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_flag(session: Session) -> None:
+    session.info.pop(_PENDING_FLAG, None)
@@ -0,0 +1,166 @@
+import asyncio
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
+from pamqp.commands import Basic
+from config import settings
+
+
+class PublishError(RuntimeError):
+    """RabbitMQ no confirmó el mensaje (nack o canal caído)."""
+
+
+class EventPublisher:
+    """
+    Publicador de eventos compartido por todo el proceso.
+
+    Una sola conexión robusta (se reconecta sola), un pool de canales con
+    publisher confirms y las colas declaradas una única vez. Los mensajes
+    se agrupan: lo que llega mientras dura `linger` (o hasta `batch_size`)
+    se publica de golpe en un mismo canal y el broker lo confirma en bloque.
+    `publish` vuelve cuando el broker ha confirmado ese mensaje.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 4,
+        batch_size: int = 100,
+        linger: float = 0.002,
+        confirm_timeout: float = 10.0,
+    ):
+        self.url = url
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self.linger = linger
+        self.confirm_timeout = confirm_timeout
+        self._connection: AbstractRobustConnection | None = None
+        self._channels: Pool[AbstractChannel] | None = None
+        self._declared: set[str] = set()
+        self._pending: asyncio.Queue[tuple[str, bytes, asyncio.Future]] = asyncio.Queue()
+        self._batcher: asyncio.Task | None = None
+        self._flushing: set[asyncio.Task] = set()
+        # Mensajes aún sin confirmar (los de la cola y los ya publicados)
+        self._unconfirmed: set[asyncio.Future] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self._connection is not None:
+            return
+        async with self._start_lock:
+            if self._connection is not None:
+                return
+            connection = await aio_pika.connect_robust(self.url)
+            self._channels = Pool(self._open_channel, max_size=self.pool_size)
+            self._batcher = asyncio.create_task(self._run())
+            self._connection = connection
+            print(f"[✓] Publicador RabbitMQ conectado ({self.pool_size} canales)")
+
+    async def _open_channel(self) -> AbstractChannel:
+        assert self._connection is not None
+        return await self._connection.channel(publisher_confirms=True)
+
+    async def publish(self, queue_name: str, body: bytes) -> None:
+        # Si el lifespan no lo arrancó (scripts, consumers) se conecta aquí
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._unconfirmed.add(future)
+        self._idle.clear()
+        future.add_done_callback(self._on_done)
+        self._pending.put_nowait((queue_name, body, future))
+        await future
+
+    def _on_done(self, future: asyncio.Future) -> None:
+        self._unconfirmed.discard(future)
+        if not self._unconfirmed:
+            self._idle.set()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._pending.get()]
+            if self.linger:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.batch_size and not self._pending.empty():
+                batch.append(self._pending.get_nowait())
+            # Cada lote usa su propio canal: varios lotes pueden esperar
+            # confirmación a la vez, como mucho uno por canal del pool
+            task = asyncio.create_task(self._flush(batch))
+            self._flushing.add(task)
+            task.add_done_callback(self._flushing.discard)
+
+    async def _flush(self, batch: list[tuple[str, bytes, asyncio.Future]]) -> None:
+        results: list = [PublishError("Publicador cerrado")] * len(batch)
+        try:
+            assert self._channels is not None
+            async with self._channels.acquire() as channel:
+                if channel.is_closed:
+                    await channel.reopen()
+                for queue_name in {queue_name for queue_name, _, _ in batch}:
+                    if queue_name not in self._declared:
+                        await channel.declare_queue(queue_name, durable=True)
+                        self._declared.add(queue_name)
+
+                results = await asyncio.gather(
+                    *(
+                        channel.default_exchange.publish(
+                            aio_pika.Message(
+                                body=body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+                            ),
+                            routing_key=queue_name,
+                            timeout=self.confirm_timeout,
+                        )
+                        for queue_name, body, _ in batch
+                    ),
+                    return_exceptions=True,
+                )
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            for (queue_name, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Basic.Ack):
+                    future.set_result(None)
+                elif isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_exception(
+                        PublishError(f"RabbitMQ rechazó el mensaje de {queue_name}")
+                    )
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Espera a que se confirme lo pendiente (como mucho `timeout` s) y cierra."""
+        if self._connection is None:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[!] Apagando con {len(self._unconfirmed)} evento(s) sin confirmar")
+        if self._batcher is not None:
+            self._batcher.cancel()
+        for task in list(self._flushing):
+            task.cancel()
+        await asyncio.gather(self._batcher, *self._flushing, return_exceptions=True)
+        while not self._pending.empty():
+            self._pending.get_nowait()
+        for future in list(self._unconfirmed):
+            if not future.done():
+                future.set_exception(PublishError("Publicador cerrado"))
+
+        assert self._channels is not None
+        await self._channels.close()
+        await self._connection.close()
+        self._connection = None
+        self._channels = None
+        self._batcher = None
+        self._declared.clear()
+        print("[*] Publicador RabbitMQ cerrado")
+
+
+event_publisher = EventPublisher(
+    settings.rabbitmq_url,
+    pool_size=settings.rabbitmq_publisher_channels,
+    batch_size=settings.rabbitmq_publish_batch_size,
+)
@@ -3,12 +3,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 from handlers.artist_handler import router as artist_router
-from middleware.auth_middleware import AuthMiddleware
+from middleware.auth_middleware import AuthMiddleware, token_cache
+from utils.s3_storage import s3_storage
+from utils.storage_cleanup import storage_cleanup
+from events.publisher import event_publisher
+from events.outbox import outbox_relay
 from config import settings
+from contextlib import asynccontextmanager
 import uvicorn
 import traceback
 
-app = FastAPI(title="Artist Service", version="0.1")
+
+@asynccontextmanager
+async def lifespan(_):
+    try:
+        await event_publisher.start()
+    except Exception as e:
+        print(f"[!] Error conectando el publicador RabbitMQ: {e}")
+    await outbox_relay.start()
+    yield
+    # Shutdown
+    await outbox_relay.close()
+    await event_publisher.close()
+    await storage_cleanup.close()
+    s3_storage.close()
+
+
+app = FastAPI(title="Artist Service", version="0.1", lifespan=lifespan)
 
 # Servir archivos de directorio de almacenamiento
 
@@ -36,6 +57,11 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return token_cache.stats()
+
+
 # Manejo global de excepciones para asegurar headers CORS
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -1,136 +1,124 @@
-from fastapi import Request, HTTPException
-from fastapi.security import HTTPBearer
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
-import time
+import logging
 from config import settings
+from middleware.token_cache import VerifiedTokenCache
+
+logger = logging.getLogger(__name__)
 
 REQUIRED_CLAIMS = {"user_id", "username", "email", "role", "exp"}
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Permitir solicitudes OPTIONS (CORS preflight) sin autenticación
-        if request.method == "OPTIONS":
-            return await call_next(request)
-            
-        # Excluir rutas que no requieran autenticación
-        if request.url.path.startswith("/health") or request.url.path.startswith("/files"):
-            return await call_next(request)
-
-        print(f"🔍 Headers recibidos: {dict(request.headers)}")
-        
+# Rutas que no requieren autenticación (prefijos, para str.startswith)
+PUBLIC_PREFIXES = ("/health", "/files")
+
+token_cache = VerifiedTokenCache(max_entries=settings.jwt_cache_max_entries)
+
+_DECODE_OPTIONS = {"verify_signature": True, "require": list(REQUIRED_CLAIMS)}
+_ALGORITHMS = [settings.jwt_algorithm]
+
+# El middleware va por fuera de CORSMiddleware: sus errores llevan las cabeceras
+_CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "http://localhost:5173",
+    "Access-Control-Allow-Credentials": "true",
+}
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail}, headers=_CORS_HEADERS)
+
+
+# Respuestas de error fijas: se construyen una vez y se reutilizan
+_MISSING_AUTH = _error(401, "Falta header Authorization")
+_EXPIRED = _error(401, "Token expirado")
+_BAD_SIGNATURE = _error(401, "Firma no válida")
+_INVALID_TOKEN = _error(401, "Token inválido")
+_AUTH_ERROR = _error(500, "Error en autenticación")
+
+
+def bearer_token(scope: Scope) -> str | None:
+    """Token de `Authorization: Bearer <token>`, leído directamente del scope."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            return token
+    return None
+
+
+def authenticate(token: str) -> dict:
+    """Claims del usuario; lanza los errores de `jwt` si el token no es válido."""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = jwt.decode(
+        token, settings.jwt_secret, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS
+    )
+    logger.debug("✅ Token válido para el usuario %s", payload["user_id"])
+
+    user = {
+        "user_id": payload["user_id"],
+        "username": payload["username"],
+        "email": payload["email"],
+        "role": payload["role"],
+    }
+    token_cache.put(token, user, payload["exp"])
+    return user
+
+
+class AuthMiddleware:
+    """
+    Middleware ASGI puro: a diferencia de BaseHTTPMiddleware no crea tareas
+    ni envuelve el stream de la respuesta (las subidas pasan sin
+    buffer), y en el camino feliz no construye ningún objeto. El usuario
+    queda en `request.state.user`; los handlers solo lo leen.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Permitir OPTIONS (CORS preflight) y rutas públicas sin autenticación
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(PUBLIC_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        token = bearer_token(scope)
+        if token is None:
+            print(f"❌ No se encontró header Authorization ({scope['path']})")
+            await _MISSING_AUTH(scope, receive, send)
+            return
+
         try:
-            auth = HTTPBearer(auto_error=False)
-            credentials = await auth(request)
-            
-            print(f"🔍 Credentials: {credentials}")
-            
-            if credentials is None:
-                print("❌ No se encontró header Authorization")
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Falta header Authorization"},
-                    headers={
-                        "Access-Control-Allow-Origin": "http://localhost:5173",
-                        "Access-Control-Allow-Credentials": "true",
-                    }
-                )
-
-            token = credentials.credentials
-            print(f"🔍 Token recibido: {token}")
-
-            # Verificar expiración manualmente primero
-            try:
-                decoded_without_verify = jwt.decode(token, options={"verify_signature": False})
-                print(f"🔍 Token decodificado (sin verificar): {decoded_without_verify}")
-                
-                # Verificar expiración
-                exp = decoded_without_verify.get('exp')
-                if exp and exp < time.time():
-                    print(f"❌ Token expirado. Exp: {exp}, Now: {time.time()}")
-                    raise jwt.ExpiredSignatureError("Token expirado")
-                    
-            except Exception as e:
-                print(f"❌ Error en decodificación básica: {e}")
-                raise
-
-            # Ahora verificar con el secret
-            print(f"🔍 Verificando con secret: {settings.jwt_secret[:10]}...")  # Solo mostrar parte del secret
-            print(f"🔍 Algorithm: {settings.jwt_algorithm}")
-            
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm],
-                options={
-                    "verify_signature": True,
-                    "require": list(REQUIRED_CLAIMS),
-                },
-            )
-            
-            print(f"✅ Token válido. Payload: {payload}")
-
-            request.state.user = {
-                "user_id": payload["user_id"],
-                "username": payload["username"],
-                "email": payload["email"],
-                "role": payload["role"],
-            }
-
-            return await call_next(request)
-            
+            user = authenticate(token)
         except jwt.ExpiredSignatureError as e:
             print(f"❌ Token expirado: {e}")
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Token expirado"},
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:5173",
-                    "Access-Control-Allow-Credentials": "true",
-                }
-            )
+            response = _EXPIRED
         except jwt.InvalidSignatureError as e:
             print(f"❌ Firma no válida: {e}")
             print(f"❌ ¿El JWT_SECRET coincide con el del servicio de auth?")
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Firma no válida"},
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:5173",
-                    "Access-Control-Allow-Credentials": "true",
-                }
-            )
+            response = _BAD_SIGNATURE
         except jwt.MissingRequiredClaimError as e:
             print(f"❌ Falta claim requerido: {e}")
             print(f"❌ Claims requeridos: {REQUIRED_CLAIMS}")
-            return JSONResponse(
-                status_code=400,
-                content={"detail": f"Falta claim: {e.claim}"},
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:5173", 
-                    "Access-Control-Allow-Credentials": "true",
-                }
-            )
+            response = _error(400, f"Falta claim: {e.claim}")
         except jwt.InvalidTokenError as e:
             print(f"❌ Token inválido: {e}")
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Token inválido"},
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:5173",
-                    "Access-Control-Allow-Credentials": "true",
-                }
-            )
+            response = _INVALID_TOKEN
         except Exception as e:
             print(f"❌ Error inesperado en auth: {e}")
             import traceback
             traceback.print_exc()
-            return JSONResponse(
-                status_code=500,
-                content={"detail": "Error en autenticación"},
-                headers={
-                    "Access-Control-Allow-Origin": "http://localhost:5173",
-                    "Access-Control-Allow-Credentials": "true",
-                }
-            )
\ No newline at end of file
+            response = _AUTH_ERROR
+        else:
+            scope.setdefault("state", {})["user"] = user
+            await self.app(scope, receive, send)
+            return
+
+        await response(scope, receive, send)
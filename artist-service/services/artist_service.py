@@ -1,15 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.repositories.artist_repository import ArtistRepository
-from events.events import publish_artist_created_event
+from events.events import enqueue_artist_created_event, enqueue_artist_deleted_event
 from models.artist import (
     ArtistCreateSchema,
     ArtistUpdateSchema,
     ArtistResponseSchema,
 )
-import asyncio
 from fastapi import UploadFile
 from typing import Optional
 from utils.file_uploader import FileUploader
+from utils.storage_cleanup import storage_cleanup
+from config import settings
 
 
 class ArtistService:
@@ -28,7 +29,14 @@ class ArtistService:
             )
 
         # Creamos el artista primero para obtener el artist_id
-        artist = await ArtistRepository.create(db, data, user_id)
+        artist = await ArtistRepository.create(db, data, user_id, commit=False)
+
+        # 🚀 El evento de artista creado se guarda en la misma transacción
+        enqueue_artist_created_event(
+            db,
+            ArtistResponseSchema.model_validate(artist, from_attributes=True).model_dump(),
+        )
+        await db.commit()
 
         # 🔹 AHORA que tenemos el artist_id, subimos la foto a su carpeta utils
         if profile_pic_file:
@@ -44,9 +52,6 @@ class ArtistService:
             artist, from_attributes=True
         )
 
-        # 🚀 Publicamos el evento de artista creado
-        asyncio.create_task(publish_artist_created_event(artist_schema.model_dump()))
-
         return artist_schema
 
     @staticmethod
@@ -87,5 +92,32 @@ class ArtistService:
         artist = await ArtistRepository.get_by_user_id(db, user_id)
         if not artist:
             return False
+        artist_id = artist.id
+        album_ids = await ArtistRepository.get_album_ids(db, artist_id)
+        audio_urls = await ArtistRepository.get_album_song_audio_urls(db, artist_id)
+
+        # Se confirma junto con el borrado (content-service invalida su caché)
+        enqueue_artist_deleted_event(db, {"id": artist_id, "user_id": artist.user_id})
         await ArtistRepository.delete(db, artist)
+
+        # 🔹 S3 se limpia en segundo plano, con la transacción ya confirmada.
+        # No se borra todo {artist_id}/: ahí también hay audios de
+        # colaboraciones en álbumes de otros artistas, que siguen existiendo
+        bucket = settings.aws_s3_bucket
+        prefixes = [f"{artist_id}/utils/"] + [
+            f"{artist_id}/{album_id}/" for album_id in album_ids
+        ]
+        for prefix in prefixes:
+            storage_cleanup.enqueue_prefix(bucket, prefix)
+
+        # Audios de sus álbumes subidos bajo la carpeta de otro artista
+        base_url = f"{settings.get_public_base_url()}/"
+        keys = [
+            url[len(base_url) :]
+            for url in audio_urls
+            if url.startswith(base_url)
+            and not url[len(base_url) :].startswith(tuple(prefixes))
+        ]
+        if keys:
+            storage_cleanup.enqueue_keys(bucket, keys)
         return True
@@ -3,13 +3,13 @@ from sqlalchemy.future import select
 from database.models import Artist, Album, Song, SongArtist
 from models.artist import ArtistCreateSchema, ArtistUpdateSchema
 from typing import Any, cast
-from sqlalchemy import delete
+from sqlalchemy import delete, or_
 
 
 class ArtistRepository:
     @staticmethod
     async def create(
-        db: AsyncSession, data: ArtistCreateSchema, user_id: int
+        db: AsyncSession, data: ArtistCreateSchema, user_id: int, commit: bool = True
     ) -> Artist:
         new_artist = Artist(
             user_id=user_id,
@@ -19,7 +19,11 @@ class ArtistRepository:
             social_links=data.social_links if data.social_links else {},
         )
         db.add(new_artist)
-        await db.commit()
+        if commit:
+            await db.commit()
+        else:
+            # Sin commit: el llamador añade más cambios a la misma transacción
+            await db.flush()
         await db.refresh(new_artist)
         return new_artist
 
@@ -52,6 +56,21 @@ class ArtistRepository:
         await db.refresh(artist)
         return artist
 
+    @staticmethod
+    async def get_album_ids(db: AsyncSession, artist_id: int) -> list[int]:
+        result = await db.execute(select(Album.id).where(Album.artist_id == artist_id))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_album_song_audio_urls(db: AsyncSession, artist_id: int) -> list[str]:
+        """URLs de audio de las canciones de los álbumes del artista"""
+        result = await db.execute(
+            select(Song.audio_url)
+            .join(Album, Song.album_id == Album.id)
+            .where(Album.artist_id == artist_id)
+        )
+        return list(result.scalars().all())
+
     @staticmethod
     async def delete(db: AsyncSession, artist: Artist) -> None:
         """
@@ -60,34 +79,22 @@ class ArtistRepository:
         - Canciones de esos álbumes
         - Relaciones song_artists de esas canciones
         - Relaciones song_artists del artista en canciones de otros álbumes
-        """
 
-        # 1) Obtener álbumes del artista
-        albums_res = await db.execute(select(Album).where(Album.artist_id == artist.id))
-        albums = albums_res.scalars().all()
-
-        for album in albums:
-            # 2) Obtener canciones del álbum
-            songs_res = await db.execute(select(Song).where(Song.album_id == album.id))
-            songs = songs_res.scalars().all()
-
-            for song in songs:
-                # 2a) Eliminar relaciones song_artists de la canción
-                await db.execute(
-                    delete(SongArtist).where(SongArtist.song_id == song.id)
-                )
-
-                # 2b) Eliminar la canción
-                await db.delete(song)
-
-            # 2c) Eliminar el álbum
-            await db.delete(album)
-
-        # 3) Eliminar relaciones song_artists del artista en colaboraciones
-        await db.execute(delete(SongArtist).where(SongArtist.artist_id == artist.id))
-
-        # 4) Eliminar el artista
-        await db.delete(artist)
+        Cada paso es un único DELETE en bloque, dentro de una transacción.
+        """
+        album_ids = select(Album.id).where(Album.artist_id == artist.id)
+        song_ids = select(Song.id).where(Song.album_id.in_(album_ids))
+        statements = [
+            delete(SongArtist).where(
+                or_(SongArtist.song_id.in_(song_ids), SongArtist.artist_id == artist.id)
+            ),
+            delete(Song).where(Song.album_id.in_(album_ids)),
+            delete(Album).where(Album.artist_id == artist.id),
+            delete(Artist).where(Artist.id == artist.id),
+        ]
+        for statement in statements:
+            await db.execute(
+                statement.execution_options(synchronize_session=False)
+            )
 
-        # 5) Confirmar cambios
         await db.commit()
@@ -1,6 +1,7 @@
 import os
 from fastapi import UploadFile, HTTPException
 from config import settings
+from utils.s3_storage import s3_storage
 from typing import Union, Any
 
 
@@ -37,14 +38,10 @@ class FileUploader:
         filename = f"profile_picture{ext}"
         key = f"{artist_id_str}/utils/{filename}"
 
-        s3_client = settings.get_s3_client()
         try:
             file_bytes = await file.read()
-            s3_client.put_object(
-                Bucket=settings.aws_s3_bucket,
-                Key=key,
-                Body=file_bytes,
-                ContentType=file.content_type,
+            await s3_storage.put_object(
+                settings.aws_s3_bucket, key, file_bytes, file.content_type
             )
             print(f"✅ Imagen subida a S3: s3://{settings.aws_s3_bucket}/{key}")
         except Exception as e:
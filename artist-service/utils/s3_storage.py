@@ -0,0 +1,129 @@
+# utils/s3_storage.py
+import asyncio
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from config import settings
+
+# Errores de S3 que merece la pena reintentar (throttling y fallos del servicio)
+RETRYABLE_CODES = {
+    "InternalError",
+    "RequestTimeout",
+    "RequestTimeTooSkewed",
+    "ServiceUnavailable",
+    "SlowDown",
+    "Throttling",
+    "ThrottlingException",
+}
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code", "")
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return code in RETRYABLE_CODES or status >= 500
+    # Conexión cortada, timeouts de lectura, endpoint inaccesible...
+    return isinstance(error, BotoCoreError)
+
+
+class S3Storage:
+    """
+    Acceso asíncrono a S3 sobre boto3.
+
+    Un único cliente por proceso (con su pool de conexiones HTTP) y un pool
+    de hilos acotado: como mucho `max_concurrency` llamadas en curso, el
+    resto espera en el event loop sin bloquearlo. Los errores transitorios
+    se reintentan con backoff exponencial y jitter; la espera entre intentos
+    es un `asyncio.sleep`, así que no retiene ningún hilo del pool.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[Config], Any],
+        max_concurrency: int = 16,
+        max_attempts: int = 4,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+    ):
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def client(self):
+        """Cliente compartido; se crea en el primer uso (boto3 es thread-safe)."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self.client_factory(
+                        Config(
+                            max_pool_connections=self.max_concurrency,
+                            # Los reintentos los hace esta capa, sin ocupar hilos
+                            retries={"total_max_attempts": 1},
+                        )
+                    )
+        return self._client
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="s3"
+            )
+        return self._executor
+
+    async def _run(self, description: str, fn: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        attempt = 1
+        while True:
+            try:
+                async with self._slots:
+                    return await loop.run_in_executor(self._get_executor(), fn)
+            except Exception as e:
+                if attempt >= self.max_attempts or not is_retryable(e):
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                delay = random.uniform(delay / 2, delay)
+                print(f"[!] S3 {description} falló ({e}); reintento {attempt} en {delay:.2f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def call(self, operation: str, **kwargs) -> dict:
+        """Ejecuta cualquier operación del cliente boto3 (`put_object`, `upload_part`...)."""
+        return await self._run(operation, lambda: getattr(self.client, operation)(**kwargs))
+
+    async def put_object(
+        self, bucket: str, key: str, body: bytes, content_type: str | None = None
+    ) -> dict:
+        extra_args = {"ContentType": content_type} if content_type else {}
+        return await self.call("put_object", Bucket=bucket, Key=key, Body=body, **extra_args)
+
+    async def get_object_bytes(self, bucket: str, key: str) -> bytes:
+        # La lectura del cuerpo también bloquea: va en el mismo hilo que la petición
+        def get():
+            return self.client.get_object(Bucket=bucket, Key=key)["Body"].read()
+
+        return await self._run("get_object", get)
+
+    async def delete_object(self, bucket: str, key: str) -> dict:
+        return await self.call("delete_object", Bucket=bucket, Key=key)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+s3_storage = S3Storage(
+    client_factory=settings.get_s3_client,
+    max_concurrency=settings.s3_max_concurrency,
+    max_attempts=settings.s3_max_attempts,
+)
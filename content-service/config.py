@@ -5,6 +5,7 @@ from typing import List, Optional
 from pathlib import Path
 import json
 import boto3
+from botocore.config import Config
 
 
 class Settings(BaseSettings):
@@ -12,10 +13,42 @@ class Settings(BaseSettings):
     db_url: str = Field(alias="db_url_py")
     jwt_secret: str = Field(alias="JWT_SECRET")
     jwt_algorithm: str = Field(alias="JWT_ALGORITHM", default="HS256")
+    # Claims ya verificados que se recuerdan por worker (LRU)
+    jwt_cache_max_entries: int = Field(alias="JWT_CACHE_MAX_ENTRIES", default=10000)
+    # Caché user_id -> artist_id (entradas por worker y segundos de validez)
+    artist_cache_max_entries: int = Field(alias="ARTIST_CACHE_MAX_ENTRIES", default=10000)
+    artist_cache_ttl: float = Field(alias="ARTIST_CACHE_TTL", default=300.0, gt=0)
     port: int = Field(alias="CONTENT_PORT", default=8001)
 
     # === RABBITMQ ===
     rabbitmq_url: str = Field(alias="RABBITMQ_URL")
+    # Publicador de eventos: canales con confirms y mensajes por lote
+    rabbitmq_publisher_channels: int = Field(
+        alias="RABBITMQ_PUBLISHER_CHANNELS", default=4, ge=1
+    )
+    rabbitmq_publish_batch_size: int = Field(
+        alias="RABBITMQ_PUBLISH_BATCH_SIZE", default=100, ge=1
+    )
+    # Outbox: eventos por pasada del relay y espera máxima entre pasadas (s)
+    outbox_batch_size: int = Field(alias="OUTBOX_BATCH_SIZE", default=100, ge=1)
+    outbox_poll_interval: float = Field(alias="OUTBOX_POLL_INTERVAL", default=1.0, gt=0)
+
+    # === TRABAJOS EN SEGUNDO PLANO ===
+    # Trabajos en paralelo por worker y procesos para la parte pesada de CPU
+    job_concurrency: int = Field(alias="JOB_CONCURRENCY", default=4, ge=1)
+    job_process_workers: int = Field(alias="JOB_PROCESS_WORKERS", default=2, ge=1)
+    # Espera máxima entre revisiones de la tabla y tiempo máximo por trabajo (s)
+    job_poll_interval: float = Field(alias="JOB_POLL_INTERVAL", default=1.0, gt=0)
+    job_lease_seconds: float = Field(alias="JOB_LEASE_SECONDS", default=600.0, gt=0)
+    job_max_attempts: int = Field(alias="JOB_MAX_ATTEMPTS", default=3, ge=1)
+    # Segundos que se conserva el audio descargado para otros trabajos de la canción
+    job_audio_linger_seconds: float = Field(
+        alias="JOB_AUDIO_LINGER_SECONDS", default=120.0, ge=0
+    )
+    # Binario de ffmpeg para decodificar el audio (forma de onda...)
+    ffmpeg_path: str = Field(alias="FFMPEG_PATH", default="ffmpeg")
+    # Duración aproximada de los segmentos HLS (se cortan por frames)
+    hls_segment_seconds: float = Field(alias="HLS_SEGMENT_SECONDS", default=6.0, gt=0)
 
     # === CORS ===
     frontend_origins_raw: str = Field(
@@ -28,9 +61,23 @@ class Settings(BaseSettings):
     aws_session_token: Optional[str] = Field(default=None, alias="AWS_SESSION_TOKEN")
     aws_region: str = Field(alias="AWS_REGION")
     aws_s3_bucket: str = Field(alias="AWS_S3_BUCKET")
+    # Endpoint alternativo (moto, MinIO...) para desarrollo y pruebas
+    s3_endpoint_url: Optional[str] = Field(default=None, alias="S3_ENDPOINT_URL")
+    # Llamadas simultáneas a S3 por worker (hilos y conexiones HTTP)
+    s3_max_concurrency: int = Field(alias="S3_MAX_CONCURRENCY", default=16, ge=1)
+    s3_max_attempts: int = Field(alias="S3_MAX_ATTEMPTS", default=4, ge=1)
+    # Las copias dentro de S3 mayores que esto se hacen por partes en paralelo
+    s3_multipart_copy_threshold: int = Field(
+        alias="S3_MULTIPART_COPY_THRESHOLD", default=64 * 1024 * 1024, ge=5 * 1024 * 1024
+    )
 
     # === STORAGE SETTINGS ===
     max_file_size: int = Field(default=15 * 1024 * 1024)
+    max_audio_file_size: int = Field(alias="MAX_AUDIO_FILE_SIZE", default=50 * 1024 * 1024)
+    # Las subidas de audio van a S3 por partes de este tamaño (mínimo 5 MB)
+    s3_multipart_part_size: int = Field(
+        alias="S3_MULTIPART_PART_SIZE", default=8 * 1024 * 1024, ge=5 * 1024 * 1024
+    )
     allowed_image_types: list = Field(
         default=["image/jpeg", "image/png", "image/jpg", "image/gif"]
     )
@@ -63,7 +110,7 @@ class Settings(BaseSettings):
     # ---------------------------------------
     # CLIENTE S3
     # ---------------------------------------
-    def get_s3_client(self):
+    def get_s3_client(self, config: Optional[Config] = None):
         args = {
             "aws_access_key_id": self.aws_access_key_id,
             "aws_secret_access_key": self.aws_secret_access_key,
@@ -71,6 +118,10 @@ class Settings(BaseSettings):
         }
         if self.aws_session_token:
             args["aws_session_token"] = self.aws_session_token
+        if self.s3_endpoint_url:
+            args["endpoint_url"] = self.s3_endpoint_url
+        if config is not None:
+            args["config"] = config
 
         return boto3.client("s3", **args)
 
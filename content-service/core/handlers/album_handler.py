@@ -15,10 +15,20 @@ from utils.ownership import validate_album_ownership
 router = APIRouter(prefix="/albums", tags=["albums"])
 
 
+def _includes_tracks(include: Optional[str]) -> bool:
+    """`include` admite una lista separada por comas: ?include=tracks"""
+    return "tracks" in {part.strip() for part in (include or "").split(",")}
+
+
 # === Rutas "específicas" (literales) FIRST ===
 @router.get("/my-albums", response_model=dict)
-async def get_my_albums(request: Request, db: AsyncSession = Depends(get_db)):
-    """Obtiene todos los álbumes del usuario autenticado con información completa"""
+async def get_my_albums(
+    request: Request, include: Optional[str] = None, db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtiene todos los álbumes del usuario autenticado con información completa.
+    `?include=tracks` añade la tracklist de cada álbum.
+    """
     # Verificar si el request.state.user existe
     if not hasattr(request.state, "user"):
         print("❌ No hay request.state.user")
@@ -44,8 +54,10 @@ async def get_my_albums(request: Request, db: AsyncSession = Depends(get_db)):
             return error_response(404, "No tienes un perfil de artista creado")
 
         # Obtener álbumes con información completa
-        albums = await service.get_artist_albums_with_info(artist_id)
-        print(f"🔍 Álbumes: {albums}")
+        albums = await service.get_artist_albums_with_info(
+            artist_id, include_tracks=_includes_tracks(include)
+        )
+        print(f"🔍 Álbumes: {len(albums)}")
 
         return success_response(
             {"artist_id": artist_id, "total_albums": len(albums), "albums": albums},
@@ -57,12 +69,19 @@ async def get_my_albums(request: Request, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/artist/{artist_id}", response_model=dict)
-async def get_artist_albums(artist_id: int, db: AsyncSession = Depends(get_db)):
-    """Obtiene todos los álbumes de un artista con información completa"""
+async def get_artist_albums(
+    artist_id: int, include: Optional[str] = None, db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtiene todos los álbumes de un artista con información completa.
+    `?include=tracks` añade la tracklist de cada álbum.
+    """
     service = AlbumService(AlbumRepository(db))
 
     try:
-        albums = await service.get_artist_albums_with_info(artist_id)
+        albums = await service.get_artist_albums_with_info(
+            artist_id, include_tracks=_includes_tracks(include)
+        )
 
         return success_response(
             {"artist_id": artist_id, "total_albums": len(albums), "albums": albums},
@@ -0,0 +1,19 @@
+# job_handler.py
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from infrastructure.db.connection import get_db
+from core.repositories.job_repository import JobRepository
+from core.services.job_service import JobService
+from utils.json_response import success_response, error_response
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=dict)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Estado de un trabajo en segundo plano (intentos, error, resultado)"""
+    service = JobService(JobRepository(db))
+    job = await service.get_job(job_id)
+    if not job:
+        return error_response(404, "Trabajo no encontrado")
+    return success_response(service.job_to_dict(job), "Trabajo recuperado correctamente")
@@ -1,14 +1,39 @@
 # song_handler.py
-from fastapi import APIRouter, Depends, Request, File, UploadFile, Form, HTTPException
+from fastapi import (
+    APIRouter,
+    Depends,
+    Request,
+    Response,
+    File,
+    UploadFile,
+    Form,
+    HTTPException,
+    Query,
+)
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from infrastructure.db.connection import get_db
 from core.repositories.song_repository import SongRepository
 from core.repositories.album_repository import AlbumRepository
 from core.services.song_service import SongService
+from core.repositories.job_repository import JobRepository
+from core.services.job_service import JobService
 from core.entities.song import SongOut
+from infrastructure.db.models import ProcessingJob, JOB_DONE, JOB_PENDING, JOB_RUNNING
 from utils.json_response import success_response, error_response
 from typing import Optional
 from utils.audio_validation import validate_audio_file
+from infrastructure.storage.multipart_upload import UploadTooLargeError
+from infrastructure.storage.s3_storage import s3_storage
+from infrastructure.storage.s3_client import build_s3_public_url
+from utils.waveform import WAVEFORM_CONTENT_TYPE
+from utils.mpeg_audio import (
+    SEEK_INDEX_CONTENT_TYPE,
+    decode_seek_entry,
+    seek_entry_range,
+    seek_frame,
+)
+from config import settings
 from utils.ownership import (
     validate_song_ownership,
     validate_album_ownership,
@@ -16,11 +41,15 @@ from utils.ownership import (
 
 router = APIRouter(prefix="/songs", tags=["songs"])
 
+# La URL de un derivado no cambia cuando cambia el audio: se revalida
+# siempre con el ETag (el trabajo que lo generó) y si no cambió es un 304
+ASSET_CACHE_CONTROL = "no-cache"
+
 
 @router.post("/", response_model=dict)
 async def create_song(
     request: Request,  # obligatorio primero
-    title: str = Form(...),
+    title: Optional[str] = Form(None),  # sin título: se toma de las etiquetas
     album_id: int = Form(...),
     audio_file: UploadFile = File(...),
     track_number: Optional[int] = Form(None),
@@ -37,6 +66,15 @@ async def create_song(
     # 🔹 Validar archivo de audio
     validate_audio_file(audio_file)
 
+    # 🔹 Validar tamaño del archivo antes de subir nada (máximo configurable)
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"El archivo de audio es demasiado grande "
+        f"(máximo {settings.max_audio_file_size // (1024 * 1024)}MB)",
+    )
+    if audio_file.size is not None and audio_file.size > settings.max_audio_file_size:
+        raise too_large
+
     # 🔹 Procesar artist_ids si se proporcionan
     parsed_artist_ids = None
     if artist_ids:
@@ -58,33 +96,29 @@ async def create_song(
 
     album_name = album.title  # (podría usarse para almacenamiento físico en carpeta)
 
-    # 🔹 Leer datos del archivo de audio
-    audio_data = await audio_file.read()
-
-    # 🔹 Validar tamaño del archivo (opcional - máximo 50MB)
-    max_size = 50 * 1024 * 1024  # 50MB
-    if len(audio_data) > max_size:
-        raise HTTPException(
-            status_code=400,
-            detail="El archivo de audio es demasiado grande (máximo 50MB)",
-        )
-
+    # 🔹 El audio se sube a S3 en streaming, sin leerlo entero en memoria
     service = SongService(SongRepository(db))
-    song = await service.create_song(
-        title=title,
-        album_id=album_id,
-        user_id=user_id,
-        audio_file=audio_data,
-        audio_filename=audio_file.filename or "unknown.mp3",
-        db=db,
-        artist_ids=parsed_artist_ids,
-        track_number=track_number,
-        genre_id=genre_id,
-        override_duration=override_duration,
-    )
+    try:
+        song = await service.create_song(
+            title=title,
+            album_id=album_id,
+            user_id=user_id,
+            audio_file=audio_file,
+            db=db,
+            artist_ids=parsed_artist_ids,
+            track_number=track_number,
+            genre_id=genre_id,
+            override_duration=override_duration,
+        )
+    except UploadTooLargeError:
+        raise too_large
 
+    # El procesado del audio (duración, etiquetas...) sigue en segundo plano
     schema = SongOut.model_validate(song)
-    return success_response(schema.model_dump(), "Canción creada exitosamente")
+    processing = await JobService(JobRepository(db)).get_song_processing(song.id)
+    return success_response(
+        {**schema.model_dump(), **processing}, "Canción creada exitosamente"
+    )
 
 
 @router.get("/{song_id}", response_model=dict)
@@ -94,7 +128,123 @@ async def get_song(song_id: int, db: AsyncSession = Depends(get_db)):
     if not song:
         return error_response(404, "Canción no encontrada")
     schema = SongOut.model_validate(song)
-    return success_response(schema.model_dump(), "Canción recuperada correctamente")
+    processing = await JobService(JobRepository(db)).get_song_processing(song_id)
+    return success_response(
+        {**schema.model_dump(), "status": processing["status"]},
+        "Canción recuperada correctamente",
+    )
+
+
+@router.get("/{song_id}/jobs", response_model=dict)
+async def get_song_jobs(song_id: int, db: AsyncSession = Depends(get_db)):
+    """Estado del procesado en segundo plano de la canción y sus trabajos"""
+    song = await SongService(SongRepository(db)).get_song(song_id)
+    if not song:
+        return error_response(404, "Canción no encontrada")
+    processing = await JobService(JobRepository(db)).get_song_processing(song_id)
+    return success_response(processing, "Trabajos recuperados correctamente")
+
+
+@router.get("/{song_id}/waveform")
+async def get_song_waveform(
+    song_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    """
+    Blob binario con los picos de la forma de onda (ver utils/waveform.py).
+    El ETag identifica el trabajo que lo generó: con If-None-Match se
+    responde 304 sin tocar S3. Mientras se procesa un audio nuevo, 404.
+    """
+    job = _current_asset(
+        await JobService(JobRepository(db)).get_song_result(song_id, "waveform"),
+        "Forma de onda",
+    )
+
+    headers = _asset_headers(job)
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    blob = await s3_storage.get_object_bytes(settings.aws_s3_bucket, job.result["key"])
+    return Response(content=blob, media_type=WAVEFORM_CONTENT_TYPE, headers=headers)
+
+
+@router.get("/{song_id}/seek-index")
+async def get_song_seek_index(
+    song_id: int,
+    request: Request,
+    t: Optional[float] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Índice tiempo -> byte del audio (ver utils/mpeg_audio.py). Con `?t=`
+    (segundos) devuelve directamente el rango a pedir para empezar a
+    reproducir en ese instante, leyendo de S3 solo esa entrada del índice.
+    """
+    job = _current_asset(
+        await JobService(JobRepository(db)).get_song_result(song_id, "seek_index"),
+        "Índice de búsqueda",
+    )
+
+    headers = _asset_headers(job)
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    index = job.result
+    if t is None:
+        blob = await s3_storage.get_object_bytes(settings.aws_s3_bucket, index["key"])
+        return Response(content=blob, media_type=SEEK_INDEX_CONTENT_TYPE, headers=headers)
+
+    frame = seek_frame(t, index["sample_rate"], index["samples_per_frame"], index["frames"])
+    start, end = seek_entry_range(frame, index["header_size"])
+    entry = await s3_storage.get_object_range(settings.aws_s3_bucket, index["key"], start, end)
+    offset = decode_seek_entry(entry)
+    data = {
+        "time": t,
+        "frame": frame,
+        "frame_time": round(frame * index["samples_per_frame"] / index["sample_rate"], 3),
+        "offset": offset,
+        "range": f"bytes={offset}-{index['audio_end'] - 1}",
+    }
+    return JSONResponse(
+        success_response(data, "Posición recuperada correctamente"), headers=headers
+    )
+
+
+@router.get("/{song_id}/hls", response_model=dict)
+async def get_song_hls(song_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Playlist HLS de la canción. Playlist y segmentos se sirven directamente
+    desde el bucket y no cambian nunca: se pueden cachear sin límite.
+    """
+    job = _current_asset(
+        await JobService(JobRepository(db)).get_song_result(song_id, "hls"), "HLS"
+    )
+    hls = job.result
+    data = {
+        "playlist_url": build_s3_public_url(
+            settings.aws_s3_bucket, settings.aws_region, hls["playlist_key"]
+        ),
+        "segments": hls["segments"],
+        "duration": hls["duration"],
+        "target_duration": hls["target_duration"],
+    }
+    return success_response(data, "HLS recuperado correctamente")
+
+
+def _current_asset(job: ProcessingJob | None, label: str) -> ProcessingJob:
+    """
+    Trabajo cuyo resultado se puede servir. Si el último de su tipo sigue
+    pendiente, el audio cambió: el resultado anterior ya no le corresponde.
+    """
+    if job is not None and job.status in (JOB_PENDING, JOB_RUNNING):
+        raise HTTPException(status_code=404, detail=f"{label} en proceso")
+    if job is None or job.status != JOB_DONE or not (job.result or {}).get("key"):
+        raise HTTPException(status_code=404, detail=f"{label} no disponible")
+    return job
+
+
+def _asset_headers(job: ProcessingJob) -> dict:
+    """Cabeceras de caché de un derivado: el ETag es el trabajo que lo generó."""
+    return {"ETag": f'"{job.kind}-{job.id}"', "Cache-Control": ASSET_CACHE_CONTROL}
 
 
 @router.put("/{song_id}", response_model=dict)
@@ -0,0 +1,39 @@
+# core/jobs/registry.py
+from typing import Any, Awaitable, Callable, Protocol, TypeVar
+from infrastructure.db.models import ProcessingJob
+
+T = TypeVar("T")
+
+
+class JobContext(Protocol):
+    async def run_cpu(self, fn: Callable[..., T], *args: Any) -> T:
+        """Ejecuta `fn` en el pool de procesos (argumentos y resultado picklables)."""
+        ...
+
+
+JobHandler = Callable[[ProcessingJob, JobContext], Awaitable[dict | None]]
+
+_handlers: dict[str, JobHandler] = {}
+
+# Trabajos que se encolan cada vez que una canción recibe un audio nuevo
+SONG_PIPELINE: list[str] = []
+
+
+def job_handler(kind: str, song_pipeline: bool = False):
+    """
+    Registra la función que ejecuta los trabajos de tipo `kind`. Devuelve un
+    dict (se guarda como resultado del trabajo) o None; si lanza excepción
+    el trabajo se reintenta. Con `song_pipeline` se encola en cada subida.
+    """
+
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        if song_pipeline and kind not in SONG_PIPELINE:
+            SONG_PIPELINE.append(kind)
+        return handler
+
+    return register
+
+
+def get_handler(kind: str) -> JobHandler | None:
+    return _handlers.get(kind)
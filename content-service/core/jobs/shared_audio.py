@@ -0,0 +1,98 @@
+# core/jobs/shared_audio.py
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator
+from pathlib import Path
+from infrastructure.storage.s3_storage import S3Storage, s3_storage
+from config import settings
+
+
+class _Download:
+    __slots__ = ("path", "task", "users", "expiry")
+
+    def __init__(self, path: str, task: asyncio.Task):
+        self.path = path
+        self.task = task
+        self.users = 0
+        self.expiry: asyncio.TimerHandle | None = None
+
+
+class SharedAudioDownloads:
+    """
+    Una sola descarga del audio por canción para todos sus trabajos.
+
+    Los trabajos del pipeline (forma de onda, índice de búsqueda, HLS) se
+    encolan juntos y suelen correr a la vez: el primero que pide el audio lo
+    descarga a un archivo temporal y los demás esperan a esa misma descarga.
+    El archivo se borra `linger_seconds` después de que lo suelte el último,
+    por si llega otro trabajo de la misma canción. La clave incluye el ETag:
+    si el audio se reemplaza bajo la misma clave, se descarga de nuevo.
+    """
+
+    def __init__(self, storage: S3Storage, linger_seconds: float):
+        self.storage = storage
+        self.linger_seconds = linger_seconds
+        self._downloads: dict[tuple[str, str], _Download] = {}
+
+    async def _download(self, bucket: str, key: str, path: str) -> None:
+        await self.storage.download_file(bucket, key, path)
+        print(f"[✓] Audio descargado para los trabajos: {key}")
+
+    def _start(self, bucket: str, key: str, etag: str) -> _Download:
+        fd, path = tempfile.mkstemp(suffix=Path(key).suffix, prefix="song-")
+        os.close(fd)
+        task = asyncio.create_task(self._download(bucket, key, path))
+        download = self._downloads[(key, etag)] = _Download(path, task)
+        return download
+
+    def _drop(self, cache_key: tuple[str, str], download: _Download) -> None:
+        if download.users or self._downloads.get(cache_key) is not download:
+            return
+        if not download.task.done():
+            # Nadie la espera ya, pero el archivo se sigue escribiendo
+            download.task.add_done_callback(lambda _: self._drop(cache_key, download))
+            return
+        del self._downloads[cache_key]
+        Path(download.path).unlink(missing_ok=True)
+
+    @asynccontextmanager
+    async def open(self, bucket: str, key: str) -> AsyncIterator[str]:
+        """Ruta local del audio, compartida con los demás trabajos de la canción."""
+        head = await self.storage.call("head_object", Bucket=bucket, Key=key)
+        cache_key = (key, head.get("ETag", ""))
+        download = self._downloads.get(cache_key) or self._start(bucket, key, cache_key[1])
+        download.users += 1
+        if download.expiry is not None:
+            download.expiry.cancel()
+            download.expiry = None
+        try:
+            # shield: si se cancela este trabajo, la descarga sigue para los demás
+            await asyncio.shield(download.task)
+            yield download.path
+        finally:
+            download.users -= 1
+            if (
+                download.task.done()
+                and not download.task.cancelled()
+                and download.task.exception() is not None
+            ):
+                # Una descarga fallida no se reutiliza: el reintento la repite
+                self._drop(cache_key, download)
+            elif not download.users:
+                download.expiry = asyncio.get_running_loop().call_later(
+                    self.linger_seconds, self._drop, cache_key, download
+                )
+
+    def close(self) -> None:
+        """Borra los audios que quedan en disco (al parar el worker)."""
+        for download in self._downloads.values():
+            if download.expiry is not None:
+                download.expiry.cancel()
+            download.task.cancel()
+            Path(download.path).unlink(missing_ok=True)
+        self._downloads.clear()
+
+
+shared_audio = SharedAudioDownloads(s3_storage, settings.job_audio_linger_seconds)
@@ -0,0 +1,216 @@
+# core/jobs/song_jobs.py
+import asyncio
+import tempfile
+from pathlib import Path
+from infrastructure.db.connection import AsyncSessionLocal
+from infrastructure.db.models import ProcessingJob, Song
+from infrastructure.storage.s3_client import (
+    extract_s3_key_from_url,
+    build_song_assets_prefix,
+)
+from infrastructure.storage.s3_storage import s3_storage
+from infrastructure.storage.cleanup import storage_cleanup
+from core.jobs.registry import JobContext, job_handler
+from core.jobs.shared_audio import shared_audio
+from core.repositories.job_repository import JobRepository
+from core.services.song_service import SongService
+from events.producer import enqueue_song_updated_event
+from utils.audio_metadata import extract_audio_metadata
+from utils.audio_validation import AUDIO_HEADER_SIZE, sniff_audio_format
+from utils.waveform import WAVEFORM_CONTENT_TYPE, build_waveform_file
+from utils.mpeg_audio import SEEK_INDEX_CONTENT_TYPE, build_seek_index_file
+from utils.hls import (
+    HLS_PLAYLIST_CONTENT_TYPE,
+    HLS_PLAYLIST_NAME,
+    HLS_SEGMENT_CONTENT_TYPE,
+    package_hls_file,
+)
+from config import settings
+
+# Cada empaquetado HLS va en su propia carpeta: sus objetos no cambian nunca
+HLS_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class SongGone(Exception):
+    """La canción se borró (o perdió su audio) antes de procesarla."""
+
+
+async def load_song_audio_key(song_id: int) -> str:
+    async with AsyncSessionLocal() as session:
+        song = await session.get(Song, song_id)
+        if song is None or not song.audio_url:
+            raise SongGone(song_id)
+        key = extract_s3_key_from_url(
+            song.audio_url, settings.aws_s3_bucket, settings.aws_region
+        )
+    if not key:
+        raise ValueError(f"URL de audio no reconocida: {song.audio_url}")
+    return key
+
+
+def sniff_file_format(path: str) -> str | None:
+    """Formato real del audio descargado, por sus magic bytes."""
+    with open(path, "rb") as source:
+        return sniff_audio_format(source.read(AUDIO_HEADER_SIZE))
+
+
+def downloaded_audio(key: str):
+    """Copia local del audio, una por canción y compartida entre sus trabajos."""
+    return shared_audio.open(settings.aws_s3_bucket, key)
+
+
+@job_handler("audio_metadata", song_pipeline=True)
+async def extract_song_metadata(job: ProcessingJob, ctx: JobContext) -> dict | None:
+    """
+    Duración y etiquetas del audio. payload: override_duration (la duración
+    la fijó el usuario), fill_title / fill_track_number (rellenar desde las
+    etiquetas porque la subida no los traía).
+    """
+    payload = job.payload or {}
+    try:
+        key = await load_song_audio_key(job.song_id)
+    except SongGone:
+        return {"skipped": "canción eliminada"}
+
+    # Sin descargar el audio: mutagen solo lee la cabecera y las etiquetas, y
+    # el lector pide por rangos justo esos bloques
+    bucket = settings.aws_s3_bucket
+    head = await s3_storage.call("head_object", Bucket=bucket, Key=key)
+    reader = s3_storage.open_reader(bucket, key, head["ContentLength"])
+    metadata = await asyncio.to_thread(extract_audio_metadata, reader, Path(key).name)
+    print(
+        f"[*] Metadatos de {key}: {reader.bytes_fetched} de {reader.size} bytes "
+        f"en {reader.requests} peticiones"
+    )
+
+    async with AsyncSessionLocal() as session:
+        song = await session.get(Song, job.song_id)
+        if song is None:
+            return {"skipped": "canción eliminada"}
+
+        if not payload.get("override_duration"):
+            song.duration = metadata.get("duration", 0)
+        if payload.get("fill_title") and metadata.get("title"):
+            song.title = metadata["title"]
+        if payload.get("fill_track_number") and metadata.get("track_number"):
+            try:
+                song.track_number = int(metadata["track_number"])
+            except (ValueError, TypeError):
+                pass
+
+        enqueue_song_updated_event(session, SongService.event_payload(song))
+        await session.commit()
+
+    return metadata
+
+
+@job_handler("waveform", song_pipeline=True)
+async def build_song_waveform(job: ProcessingJob, ctx: JobContext) -> dict | None:
+    """
+    Picos min/max a varias resoluciones para dibujar la forma de onda sin
+    descargar el audio. El blob se guarda junto al audio y lo sirve
+    GET /songs/{song_id}/waveform.
+    """
+    try:
+        key = await load_song_audio_key(job.song_id)
+    except SongGone:
+        return {"skipped": "canción eliminada"}
+
+    async with downloaded_audio(key) as path:
+        blob, summary = await ctx.run_cpu(build_waveform_file, path, settings.ffmpeg_path)
+
+    waveform_key = build_song_assets_prefix(key, job.song_id) + "waveform.bin"
+    await s3_storage.put_object(
+        settings.aws_s3_bucket, waveform_key, blob, WAVEFORM_CONTENT_TYPE
+    )
+    print(f"[✓] Forma de onda guardada: {waveform_key} ({len(blob)} bytes)")
+    return {"key": waveform_key, "size": len(blob), **summary}
+
+
+@job_handler("seek_index", song_pipeline=True)
+async def build_song_seek_index(job: ProcessingJob, ctx: JobContext) -> dict | None:
+    """
+    Tabla tiempo -> byte de cada frame del MP3, para convertir un salto en
+    el tiempo en una única petición por rangos. Otros formatos se omiten.
+    """
+    try:
+        key = await load_song_audio_key(job.song_id)
+    except SongGone:
+        return {"skipped": "canción eliminada"}
+
+    async with downloaded_audio(key) as path:
+        # Solo MP3: en otros formatos el escáner de frames no tiene sentido
+        if sniff_file_format(path) != "audio/mpeg":
+            return {"skipped": "formato sin índice de búsqueda"}
+        built = await ctx.run_cpu(build_seek_index_file, path)
+    if built is None:
+        return {"skipped": "formato sin índice de búsqueda"}
+
+    blob, summary = built
+    index_key = build_song_assets_prefix(key, job.song_id) + "seek_index.bin"
+    await s3_storage.put_object(
+        settings.aws_s3_bucket, index_key, blob, SEEK_INDEX_CONTENT_TYPE
+    )
+    print(f"[✓] Índice de búsqueda guardado: {index_key} ({summary['frames']} frames)")
+    return {"key": index_key, "size": len(blob), **summary}
+
+
+@job_handler("hls", song_pipeline=True)
+async def package_song_hls(job: ProcessingJob, ctx: JobContext) -> dict | None:
+    """
+    Segmentos HLS de unos segundos, cortados por frames, y su playlist en
+    processed/{song_id}/hls/{job_id}/. La playlist se sube la última, cuando
+    todos sus segmentos ya existen; el empaquetado anterior se borra después.
+    """
+    try:
+        key = await load_song_audio_key(job.song_id)
+    except SongGone:
+        return {"skipped": "canción eliminada"}
+
+    prefix = build_song_assets_prefix(key, job.song_id) + f"hls/{job.id}/"
+    bucket = settings.aws_s3_bucket
+    with tempfile.TemporaryDirectory(prefix="hls-") as out_dir:
+        async with downloaded_audio(key) as path:
+            # Solo MP3: el empaquetado corta por frames MPEG
+            if sniff_file_format(path) != "audio/mpeg":
+                return {"skipped": "formato sin empaquetado HLS"}
+            summary = await ctx.run_cpu(
+                package_hls_file, path, out_dir, settings.hls_segment_seconds
+            )
+        if summary is None:
+            return {"skipped": "formato sin empaquetado HLS"}
+
+        segments = sorted(Path(out_dir).glob("segment_*"))
+        await asyncio.gather(
+            *(
+                s3_storage.upload_file(
+                    bucket,
+                    prefix + segment.name,
+                    str(segment),
+                    HLS_SEGMENT_CONTENT_TYPE,
+                    HLS_CACHE_CONTROL,
+                )
+                for segment in segments
+            )
+        )
+        await s3_storage.upload_file(
+            bucket,
+            prefix + HLS_PLAYLIST_NAME,
+            str(Path(out_dir) / HLS_PLAYLIST_NAME),
+            HLS_PLAYLIST_CONTENT_TYPE,
+            HLS_CACHE_CONTROL,
+        )
+
+    # Solo empaquetados anteriores a este: uno más nuevo (de un audio
+    # posterior) puede haber terminado antes y es el que se sirve
+    async with AsyncSessionLocal() as session:
+        previous = await JobRepository(session).list_done_before(
+            job.song_id, "hls", job.id
+        )
+    for old in previous:
+        if (old.result or {}).get("prefix"):
+            storage_cleanup.enqueue_prefix(bucket, old.result["prefix"])
+
+    print(f"[✓] HLS guardado: {prefix} ({summary['segments']} segmentos)")
+    playlist_key = prefix + HLS_PLAYLIST_NAME
+    return {"key": playlist_key, "prefix": prefix, "playlist_key": playlist_key, **summary}
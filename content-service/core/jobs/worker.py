@@ -0,0 +1,186 @@
+# core/jobs/worker.py
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from infrastructure.db.connection import AsyncSessionLocal
+from infrastructure.db.models import ProcessingJob
+from core.repositories.job_repository import JobRepository, JOBS_PENDING_FLAG
+from core.jobs.registry import get_handler
+from config import settings
+
+T = TypeVar("T")
+
+
+class JobWorker:
+    """
+    Ejecuta los trabajos de content_jobs fuera de las peticiones.
+
+    Un bucle reclama trabajos listos (FOR UPDATE SKIP LOCKED, con un lease
+    por si el proceso muere a medias) hasta ocupar `concurrency` huecos; cada
+    trabajo corre como tarea asyncio y su parte pesada de CPU va a un pool de
+    `process_workers` procesos, así no compite con el event loop que atiende
+    las peticiones. Los fallos se reintentan con espera exponencial hasta
+    `max_attempts`; después el trabajo queda en estado failed.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int = 4,
+        process_workers: int = 2,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 600.0,
+        retry_delay: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.process_workers = process_workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_delay = retry_delay
+        self._executor: ProcessPoolExecutor | None = None
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._running: dict[int, asyncio.Task] = {}
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self._ensure_table()
+        # spawn: hacer fork de un proceso con hilos y un event loop no es seguro
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        self._task = asyncio.create_task(self._run())
+        print(
+            f"[*] Worker de trabajos iniciado ({self.concurrency} en paralelo, "
+            f"{self.process_workers} procesos)"
+        )
+
+    async def _ensure_table(self) -> None:
+        try:
+            async with self.session_factory() as session:
+                connection = await session.connection()
+                await connection.run_sync(
+                    lambda sync_conn: ProcessingJob.__table__.create(sync_conn, checkfirst=True)
+                )
+                await session.commit()
+        except Exception as e:
+            print(f"[!] No se pudo comprobar la tabla de trabajos: {e}")
+
+    async def run_cpu(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            raise RuntimeError("El worker de trabajos no está iniciado")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            if free > 0:
+                try:
+                    async with self.session_factory() as session:
+                        jobs = await JobRepository(session).claim(free, self.lease_seconds)
+                except Exception as e:
+                    print(f"[!] Error reclamando trabajos: {e}")
+                    jobs = []
+                for job in jobs:
+                    task = asyncio.create_task(self._execute(job))
+                    self._running[job.id] = task
+                    task.add_done_callback(
+                        lambda _, job_id=job.id: self._finished(job_id)
+                    )
+                # Todos los huecos cubiertos: puede haber más listos
+                if jobs and len(jobs) == free:
+                    continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, job_id: int) -> None:
+        self._running.pop(job_id, None)
+        self.notify()
+
+    async def _execute(self, job: ProcessingJob) -> None:
+        handler = get_handler(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f"Tipo de trabajo desconocido: {job.kind}")
+            result = await asyncio.wait_for(handler(job, self), self.lease_seconds)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            retry_in = None
+            if job.attempts < job.max_attempts:
+                retry_in = self.retry_delay * 2 ** (job.attempts - 1)
+            print(
+                f"[!] Trabajo {job.id} ({job.kind}) falló, intento {job.attempts}/"
+                f"{job.max_attempts}: {error}"
+            )
+            try:
+                async with self.session_factory() as session:
+                    await JobRepository(session).fail(job.id, error, retry_in)
+            except Exception as e:
+                # Sin registrar: el lease vencido lo devolverá a la cola
+                print(f"[!] No se pudo registrar el fallo del trabajo {job.id}: {e}")
+            return
+
+        try:
+            async with self.session_factory() as session:
+                await JobRepository(session).complete(job.id, result)
+        except Exception as e:
+            print(f"[!] No se pudo marcar como completado el trabajo {job.id}: {e}")
+            return
+        print(f"[✓] Trabajo {job.id} ({job.kind}) completado")
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        running = list(self._running.values())
+        interrupted = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(self._task, *running, return_exceptions=True)
+        self._task = None
+        # Los interrumpidos vuelven a pendiente sin esperar a que venza el lease
+        try:
+            async with self.session_factory() as session:
+                await JobRepository(session).release(interrupted)
+        except Exception as e:
+            print(f"[!] No se pudieron liberar los trabajos interrumpidos: {e}")
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        print("[*] Worker de trabajos detenido")
+
+
+job_worker = JobWorker(
+    AsyncSessionLocal,
+    concurrency=settings.job_concurrency,
+    process_workers=settings.job_process_workers,
+    poll_interval=settings.job_poll_interval,
+    lease_seconds=settings.job_lease_seconds,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker(session: Session) -> None:
+    if session.info.pop(JOBS_PENDING_FLAG, False):
+        job_worker.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_flag(session: Session) -> None:
+    session.info.pop(JOBS_PENDING_FLAG, None)
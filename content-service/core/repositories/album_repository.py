@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, func
 from infrastructure.db.models import Album, Artist, Song
 from collections.abc import Sequence
 from typing import Dict, Any, List
@@ -55,8 +55,18 @@ class AlbumRepository:
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def list_song_audio_urls(self, album_id: int) -> list[str]:
+        stmt = select(Song.audio_url).where(
+            Song.album_id == album_id, Song.audio_url.is_not(None)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_albums_with_artist_info(self, artist_id: int) -> list[dict]:
-        """Obtiene todos los álbumes de un artista con información completa"""
+        """
+        Álbumes de un artista con su número de canciones y duración total,
+        agregados en la misma consulta (LEFT JOIN + GROUP BY)
+        """
         stmt = (
             select(
                 Album.id,
@@ -67,9 +77,13 @@ class AlbumRepository:
                 Album.updated_at,
                 Artist.artist_name,
                 Artist.id.label("artist_id"),
+                func.count(Song.id).label("total_songs"),
+                func.coalesce(func.sum(Song.duration), 0).label("total_duration"),
             )
             .join(Artist, Album.artist_id == Artist.id)
+            .outerjoin(Song, Song.album_id == Album.id)
             .where(Album.artist_id == artist_id)
+            .group_by(Album.id, Artist.id)
             .order_by(Album.release_date.desc().nulls_last(), Album.created_at.desc())
             .execution_options(prepared=False)
         )
@@ -89,7 +103,43 @@ class AlbumRepository:
                     "updated_at": row.updated_at,
                     "artist_id": row.artist_id,
                     "artist_name": row.artist_name,
+                    "total_songs": row.total_songs,
+                    "total_duration": row.total_duration,
                 }
             )
 
         return albums
+
+    async def list_tracks_by_albums(self, album_ids: list[int]) -> dict[int, list[dict]]:
+        """Tracklists de varios álbumes en una sola consulta: {album_id: [canción, ...]}"""
+        if not album_ids:
+            return {}
+        stmt = (
+            select(
+                Song.id,
+                Song.album_id,
+                Song.title,
+                Song.duration,
+                Song.audio_url,
+                Song.track_number,
+                Song.genre_id,
+            )
+            .where(Song.album_id.in_(album_ids))
+            .order_by(Song.album_id, Song.track_number.asc().nulls_last(), Song.id)
+            .execution_options(prepared=False)
+        )
+        result = await self.session.execute(stmt)
+
+        tracks: dict[int, list[dict]] = {}
+        for row in result:
+            tracks.setdefault(row.album_id, []).append(
+                {
+                    "id": row.id,
+                    "title": row.title,
+                    "duration": row.duration,
+                    "audio_url": row.audio_url,
+                    "track_number": row.track_number,
+                    "genre_id": row.genre_id,
+                }
+            )
+        return tracks
@@ -0,0 +1,157 @@
+import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, or_, and_
+from infrastructure.db.models import (
+    ProcessingJob,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_DONE,
+    JOB_FAILED,
+)
+from collections.abc import Sequence
+
+# Marca en session.info: la transacción en curso encola trabajos
+JOBS_PENDING_FLAG = "jobs_pending"
+
+
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def add(
+        self,
+        kind: str,
+        song_id: int | None = None,
+        payload: dict | None = None,
+        max_attempts: int = 3,
+    ) -> ProcessingJob:
+        """Encola un trabajo en la transacción en curso (sin commit)."""
+        job = ProcessingJob(
+            kind=kind,
+            song_id=song_id,
+            payload=payload,
+            status=JOB_PENDING,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_after=datetime.datetime.utcnow(),
+        )
+        self.session.add(job)
+        self.session.info[JOBS_PENDING_FLAG] = True
+        return job
+
+    async def get_by_id(self, job_id: int) -> ProcessingJob | None:
+        return await self.session.get(ProcessingJob, job_id)
+
+    async def list_by_song(self, song_id: int) -> Sequence[ProcessingJob]:
+        stmt = (
+            select(ProcessingJob)
+            .where(ProcessingJob.song_id == song_id)
+            .order_by(ProcessingJob.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def get_latest(self, song_id: int, kind: str) -> ProcessingJob | None:
+        """Última ejecución de `kind` para la canción, en cualquier estado."""
+        stmt = (
+            select(ProcessingJob)
+            .where(ProcessingJob.song_id == song_id, ProcessingJob.kind == kind)
+            .order_by(ProcessingJob.id.desc())
+            .limit(1)
+        )
+        return await self.session.scalar(stmt)
+
+    async def list_done_before(
+        self, song_id: int, kind: str, before_id: int
+    ) -> Sequence[ProcessingJob]:
+        """Ejecuciones completadas de `kind` anteriores al trabajo `before_id`."""
+        stmt = (
+            select(ProcessingJob)
+            .where(
+                ProcessingJob.song_id == song_id,
+                ProcessingJob.kind == kind,
+                ProcessingJob.status == JOB_DONE,
+                ProcessingJob.id < before_id,
+            )
+            .order_by(ProcessingJob.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
+
+    async def claim(self, limit: int, lease_seconds: float) -> list[ProcessingJob]:
+        """
+        Toma hasta `limit` trabajos listos: pendientes cuyo run_after ya pasó
+        o en curso con el lease vencido (el worker que los tenía murió).
+        """
+        now = datetime.datetime.utcnow()
+        stmt = (
+            select(ProcessingJob)
+            .where(
+                or_(
+                    and_(
+                        ProcessingJob.status == JOB_PENDING,
+                        ProcessingJob.run_after <= now,
+                    ),
+                    and_(
+                        ProcessingJob.status == JOB_RUNNING,
+                        ProcessingJob.locked_until < now,
+                    ),
+                )
+            )
+            .order_by(ProcessingJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list((await self.session.execute(stmt)).scalars().all())
+        for job in jobs:
+            job.status = JOB_RUNNING
+            job.attempts += 1
+            job.started_at = now
+            job.locked_until = now + datetime.timedelta(seconds=lease_seconds)
+        await self.session.commit()
+        return jobs
+
+    async def complete(self, job_id: int, result: dict | None) -> None:
+        await self.session.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id)
+            .values(
+                status=JOB_DONE,
+                result=result,
+                last_error=None,
+                locked_until=None,
+                finished_at=datetime.datetime.utcnow(),
+            )
+        )
+        await self.session.commit()
+
+    async def fail(self, job_id: int, error: str, retry_in: float | None) -> None:
+        """Registra el error; con `retry_in` vuelve a pendiente, si no queda fallido."""
+        now = datetime.datetime.utcnow()
+        values: dict = {"last_error": error[:1000], "locked_until": None}
+        if retry_in is None:
+            values.update(status=JOB_FAILED, finished_at=now)
+        else:
+            values.update(
+                status=JOB_PENDING, run_after=now + datetime.timedelta(seconds=retry_in)
+            )
+        await self.session.execute(
+            update(ProcessingJob).where(ProcessingJob.id == job_id).values(**values)
+        )
+        await self.session.commit()
+
+    async def release(self, job_ids: list[int]) -> None:
+        """Devuelve a pendiente trabajos interrumpidos (apagado ordenado)."""
+        if not job_ids:
+            return
+        await self.session.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id.in_(job_ids), ProcessingJob.status == JOB_RUNNING)
+            .values(
+                status=JOB_PENDING,
+                attempts=ProcessingJob.attempts - 1,
+                locked_until=None,
+                run_after=datetime.datetime.utcnow(),
+            )
+        )
+        await self.session.commit()
@@ -1,7 +1,7 @@
 from datetime import date
 from infrastructure.db.models import Album, Song
 from core.repositories.album_repository import AlbumRepository
-from events.producer import publish_album_created_event, publish_album_updated_event
+from events.producer import enqueue_album_created_event, enqueue_album_updated_event
 from core.services.artist_lookup import ArtistLookupService
 import os
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,13 +12,14 @@ from infrastructure.storage.s3_client import (
     delete_from_s3,
     extract_s3_key_from_url,
 )
+from infrastructure.storage.cleanup import storage_cleanup
 
 
 class AlbumService:
     def __init__(self, repo: AlbumRepository):
         self.repo = repo
 
-    def _save_cover_image(
+    async def _save_cover_image(
         self,
         artist_id: int,
         album_id: int,
@@ -36,7 +37,7 @@ class AlbumService:
         key = f"{artist_id}/{album_id}/{filename}"
         content_type = "image/png" if ext == ".png" else "image/jpeg"
 
-        upload_bytes_to_s3(settings.aws_s3_bucket, key, image_data, content_type)
+        await upload_bytes_to_s3(settings.aws_s3_bucket, key, image_data, content_type)
 
         cover_url = build_s3_public_url(
             settings.aws_s3_bucket, settings.aws_region, key
@@ -44,15 +45,27 @@ class AlbumService:
         print(f"[✓] Imagen subida a S3: {cover_url}")
         return cover_url
 
-    def _delete_cover_image(self, cover_url: str) -> bool:
+    async def _delete_cover_image(self, cover_url: str) -> bool:
         """Elimina la imagen de portada de S3"""
         key = extract_s3_key_from_url(
             cover_url, settings.aws_s3_bucket, settings.aws_region
         )
         if key:
-            return delete_from_s3(settings.aws_s3_bucket, key)
+            return await delete_from_s3(settings.aws_s3_bucket, key)
         return False
 
+    @staticmethod
+    def _album_event(album: Album) -> dict:
+        return {
+            "id": album.id,
+            "title": album.title,
+            "artist_id": album.artist_id,
+            "release_date": album.release_date.isoformat()
+            if album.release_date
+            else None,
+            "cover_url": album.cover_url,
+        }
+
     async def create_album(
         self,
         title: str,
@@ -75,29 +88,21 @@ class AlbumService:
             artist_id=artist_id,
             release_date=release_date,
         )
+        # El id hace falta para el evento, que va en la misma transacción
+        self.repo.session.add(album)
+        await self.repo.session.flush()
+        enqueue_album_created_event(self.repo.session, self._album_event(album))
         album = await self.repo.create(album)
 
         # 2. Guardar la portada en S3 si se envía
         if cover_image:
-            cover_url = self._save_cover_image(
+            cover_url = await self._save_cover_image(
                 artist_id, album.id, cover_image, cover_filename
             )
             album.cover_url = cover_url
+            enqueue_album_updated_event(self.repo.session, self._album_event(album))
             album = await self.repo.update(album)
 
-        # 3. Publicar evento
-        await publish_album_created_event(
-            {
-                "id": album.id,
-                "title": album.title,
-                "artist_id": album.artist_id,
-                "release_date": album.release_date.isoformat()
-                if album.release_date
-                else None,
-                "cover_url": album.cover_url,
-            }
-        )
-
         return album
 
     async def get_album(self, album_id: int) -> Album | None:
@@ -129,66 +134,71 @@ class AlbumService:
         if cover_image:
             # Eliminar imagen anterior si existe
             if album.cover_url:
-                self._delete_cover_image(album.cover_url)
+                await self._delete_cover_image(album.cover_url)
 
             # Subir nueva imagen a S3
-            cover_url = self._save_cover_image(
+            cover_url = await self._save_cover_image(
                 album.artist_id, album.id, cover_image, cover_filename
             )
             album.cover_url = cover_url
 
+        enqueue_album_updated_event(self.repo.session, self._album_event(album))
         album = await self.repo.update(album)
 
-        await publish_album_updated_event(
-            {
-                "id": album.id,
-                "title": album.title,
-                "artist_id": album.artist_id,
-                "release_date": album.release_date.isoformat()
-                if album.release_date
-                else None,
-                "cover_url": album.cover_url,
-            }
-        )
-
         return album
 
     async def delete_album(self, album: Album) -> None:
-        """Elimina un álbum y todos sus archivos de S3"""
-        # Eliminar imagen de portada de S3 si existe
+        """
+        Elimina un álbum y sus canciones de la base de datos; sus archivos
+        de S3 se borran en segundo plano una vez confirmada la transacción.
+        """
+        bucket = settings.aws_s3_bucket
+        # Portada y audios viven bajo {artist_id}/{album_id}/ salvo las
+        # canciones subidas a nombre de otro artista: esas se borran por clave
+        prefix = f"{album.artist_id}/{album.id}/"
+        urls = await self.repo.list_song_audio_urls(album.id)
         if album.cover_url:
-            self._delete_cover_image(album.cover_url)
-
-        # Eliminar archivos de audio de todas las canciones del álbum
-        songs = await self.repo.list_songs_by_album(album.id)
-        for song in songs:
-            if song.audio_url:
-                key = extract_s3_key_from_url(
-                    song.audio_url, settings.aws_s3_bucket, settings.aws_region
-                )
-                if key:
-                    delete_from_s3(settings.aws_s3_bucket, key)
-
-        # Eliminar álbum de la base de datos
+            urls.append(album.cover_url)
+        keys = [
+            key
+            for key in (
+                extract_s3_key_from_url(url, bucket, settings.aws_region) for url in urls
+            )
+            if key and not key.startswith(prefix)
+        ]
+
         await self.repo.delete(album)
 
+        storage_cleanup.enqueue_prefix(bucket, prefix)
+        if keys:
+            storage_cleanup.enqueue_keys(bucket, keys)
+
     async def list_songs_by_album(self, album_id: int) -> list[Song]:
         """Lista todas las canciones de un álbum"""
         return list(await self.repo.list_songs_by_album(album_id))
 
-    async def get_artist_albums_with_info(self, artist_id: int) -> list[dict]:
-        """Obtiene todos los álbumes de un artista con información completa"""
+    async def get_artist_albums_with_info(
+        self, artist_id: int, include_tracks: bool = False
+    ) -> list[dict]:
+        """
+        Obtiene todos los álbumes de un artista con información completa.
+        Con `include_tracks` añade la tracklist de cada álbum (una consulta más)
+        """
         albums = await self.repo.get_albums_with_artist_info(artist_id)
+        tracks = (
+            await self.repo.list_tracks_by_albums([album["id"] for album in albums])
+            if include_tracks
+            else {}
+        )
 
         for album in albums:
-            songs = await self.repo.list_songs_by_album(album["id"])
-            album["total_songs"] = len(songs)
-
             if album["release_date"]:
                 album["release_date"] = album["release_date"].isoformat()
             if album["created_at"]:
                 album["created_at"] = album["created_at"].isoformat()
             if album["updated_at"]:
                 album["updated_at"] = album["updated_at"].isoformat()
+            if include_tracks:
+                album["tracks"] = tracks.get(album["id"], [])
 
         return albums
@@ -1,6 +1,67 @@
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
 from sqlalchemy import select
 from infrastructure.db.models import Artist
 from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+
+
+class ArtistIdCache:
+    """
+    user_id -> artist_id por proceso (LRU con caducidad). Solo se guardan
+    artistas existentes: un usuario sin artista se vuelve a consultar, así
+    un alta se ve al momento. Los eventos artist_created / artist_deleted la
+    mantienen al día; el TTL acota lo que dure un dato si se pierde un
+    evento (o lo consume otra réplica).
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[int, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> int | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: int, artist_id: int) -> None:
+        self._entries[user_id] = (artist_id, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else None,
+        }
+
+
+artist_id_cache = ArtistIdCache(
+    max_entries=settings.artist_cache_max_entries,
+    ttl=settings.artist_cache_ttl,
+)
 
 
 class ArtistLookupService:
@@ -10,10 +71,44 @@ class ArtistLookupService:
         Obtiene el artist_id basado en el user_id
         Retorna None si no se encuentra el artista
         """
+        cached = artist_id_cache.get(user_id)
+        if cached is not None:
+            return cached
         try:
             stmt = select(Artist.id).where(Artist.user_id == user_id)
             result = await db.scalar(stmt)
+            if result is not None:
+                artist_id_cache.set(user_id, result)
             return result
         except Exception as e:
             print(f"Error en get_artist_id_by_user: {e}")
             return None
+
+    @staticmethod
+    async def get_artist_ids_by_users(
+        user_ids: Iterable[int], db: AsyncSession
+    ) -> dict[int, int | None]:
+        """
+        Resuelve varios user_id a la vez: los que no están en caché se
+        consultan juntos en una sola query. Los que no son artistas -> None
+        """
+        resolved: dict[int, int | None] = {}
+        missing = []
+        for user_id in set(user_ids):
+            cached = artist_id_cache.get(user_id)
+            if cached is not None:
+                resolved[user_id] = cached
+            else:
+                missing.append(user_id)
+
+        if missing:
+            resolved.update(dict.fromkeys(missing))
+            try:
+                stmt = select(Artist.user_id, Artist.id).where(Artist.user_id.in_(missing))
+                for user_id, artist_id in await db.execute(stmt):
+                    resolved[user_id] = artist_id
+                    artist_id_cache.set(user_id, artist_id)
+            except Exception as e:
+                print(f"Error en get_artist_ids_by_users: {e}")
+
+        return resolved
@@ -0,0 +1,74 @@
+from collections.abc import Sequence
+from core.repositories.job_repository import JobRepository
+from core.jobs.registry import SONG_PIPELINE
+from infrastructure.db.models import (
+    ProcessingJob,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JOB_FAILED,
+)
+from config import settings
+
+# Estado de procesado de una canción, según sus trabajos
+SONG_PROCESSING = "processing"
+SONG_READY = "ready"
+SONG_FAILED = "failed"
+
+
+class JobService:
+    def __init__(self, repo: JobRepository):
+        self.repo = repo
+
+    def enqueue_song_pipeline(
+        self, song_id: int, payload: dict | None = None
+    ) -> list[ProcessingJob]:
+        """Encola el procesado de un audio nuevo, en la transacción de la canción."""
+        return [
+            self.repo.add(kind, song_id, payload, max_attempts=settings.job_max_attempts)
+            for kind in SONG_PIPELINE
+        ]
+
+    async def get_job(self, job_id: int) -> ProcessingJob | None:
+        return await self.repo.get_by_id(job_id)
+
+    async def get_song_result(self, song_id: int, kind: str) -> ProcessingJob | None:
+        """
+        Último trabajo de ese tipo. Su resultado solo es el vigente si está
+        completado: uno pendiente significa que el audio cambió y que los
+        resultados anteriores ya no le corresponden.
+        """
+        return await self.repo.get_latest(song_id, kind)
+
+    async def get_song_processing(self, song_id: int) -> dict:
+        jobs = await self.repo.list_by_song(song_id)
+        return {
+            "status": self.song_status(jobs),
+            "jobs": [self.job_to_dict(job) for job in jobs],
+        }
+
+    @staticmethod
+    def song_status(jobs: Sequence[ProcessingJob]) -> str:
+        # Solo cuenta la última ejecución de cada tipo (un audio nuevo la repite)
+        latest = {job.kind: job for job in sorted(jobs, key=lambda job: job.id)}
+        statuses = {job.status for job in latest.values()}
+        if statuses & {JOB_PENDING, JOB_RUNNING}:
+            return SONG_PROCESSING
+        if JOB_FAILED in statuses:
+            return SONG_FAILED
+        return SONG_READY
+
+    @staticmethod
+    def job_to_dict(job: ProcessingJob) -> dict:
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "song_id": job.song_id,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "last_error": job.last_error,
+            "result": job.result,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
@@ -1,9 +1,8 @@
-import tempfile
 from pathlib import Path
-from mutagen._file import File as MutagenFile
+from fastapi import UploadFile
 from infrastructure.db.models import Song, Artist
 from core.repositories.song_repository import SongRepository
-from events.producer import publish_song_created_event, publish_song_updated_event
+from events.producer import enqueue_song_created_event, enqueue_song_updated_event
 from core.services.artist_lookup import ArtistLookupService
 import re
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,73 +12,46 @@ from infrastructure.storage.s3_client import (
     build_s3_public_url,
     delete_from_s3,
     extract_s3_key_from_url,
-    get_s3_client,
+    copy_in_s3,
+    schedule_delete_from_s3,
+    build_song_assets_prefix,
 )
+from infrastructure.storage.cleanup import storage_cleanup
+from infrastructure.storage.multipart_upload import StreamedObject, stream_upload_to_s3
+from utils.audio_validation import AUDIO_HEADER_SIZE, validate_audio_header
+from core.repositories.job_repository import JobRepository
+from core.services.job_service import JobService
 
 
 class SongService:
     def __init__(self, repo: SongRepository):
         self.repo = repo
 
-    def _extract_audio_metadata(self, audio_data: bytes, filename: str) -> dict:
-        """Extrae metadatos del archivo de audio usando mutagen"""
-        try:
-            with tempfile.NamedTemporaryFile(
-                suffix=Path(filename).suffix, delete=False
-            ) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            audio_file = MutagenFile(temp_file_path)
-            Path(temp_file_path).unlink(missing_ok=True)
-
-            if audio_file is None:
-                raise ValueError("Formato de audio no soportado")
-
-            metadata = {
-                "duration": int(audio_file.info.length) if audio_file.info else 0,
-                "bitrate": getattr(audio_file.info, "bitrate", None),
-                "sample_rate": getattr(audio_file.info, "sample_rate", None),
-                "channels": getattr(audio_file.info, "channels", None),
-            }
-
-            if audio_file.tags:
-                metadata.update(
-                    {
-                        "artist": str(audio_file.tags.get("TPE1", [""])[0])
-                        if "TPE1" in audio_file.tags
-                        else None,
-                        "album": str(audio_file.tags.get("TALB", [""])[0])
-                        if "TALB" in audio_file.tags
-                        else None,
-                        "title": str(audio_file.tags.get("TIT2", [""])[0])
-                        if "TIT2" in audio_file.tags
-                        else None,
-                        "track_number": str(audio_file.tags.get("TRCK", [""])[0]).split(
-                            "/"
-                        )[0]
-                        if "TRCK" in audio_file.tags
-                        else None,
-                        "genre": str(audio_file.tags.get("TCON", [""])[0])
-                        if "TCON" in audio_file.tags
-                        else None,
-                    }
-                )
-
-            print(
-                f"[✓] Metadatos extraídos: duración={metadata['duration']}s, bitrate={metadata['bitrate']}"
-            )
-            return metadata
-
-        except Exception as e:
-            print(f"[!] Error extrayendo metadatos: {e}")
-            return {"duration": 0}
+    @staticmethod
+    def event_payload(song: Song) -> dict:
+        """Datos de la canción que viajan en los eventos song_created / song_updated"""
+        return {
+            "id": song.id,
+            "title": song.title,
+            "album_id": song.album_id,
+            "duration": song.duration,
+            "audio_url": song.audio_url,
+            "track_number": song.track_number,
+            "genre_id": song.genre_id,
+        }
 
     def _sanitize_filename(self, name: str) -> str:
         """Sanitiza un nombre para que sea válido como archivo"""
         return re.sub(r"[^a-zA-Z0-9_\- ]+", "", name).strip().replace(" ", "_")
 
-    def _save_audio_file(
+    def _build_audio_key(
+        self, artist_id: str, album_id: str, title: str, original_filename: str
+    ) -> str:
+        ext = Path(original_filename).suffix or ".mp3"
+        safe_title = self._sanitize_filename(title) or "untitled"
+        return f"{artist_id}/{album_id}/{safe_title}{ext}"
+
+    async def _save_audio_file(
         self,
         artist_id: str,
         album_id: str,
@@ -88,12 +60,9 @@ class SongService:
         original_filename: str,
     ) -> str:
         """Sube un archivo de audio a S3"""
-        ext = Path(original_filename).suffix or ".mp3"
-        safe_title = self._sanitize_filename(title) or "untitled"
-        filename = f"{safe_title}{ext}"
-        key = f"{artist_id}/{album_id}/{filename}"
+        key = self._build_audio_key(artist_id, album_id, title, original_filename)
 
-        upload_bytes_to_s3(settings.aws_s3_bucket, key, audio_data, "audio/mpeg")
+        await upload_bytes_to_s3(settings.aws_s3_bucket, key, audio_data, "audio/mpeg")
 
         audio_url = build_s3_public_url(
             settings.aws_s3_bucket, settings.aws_region, key
@@ -101,22 +70,45 @@ class SongService:
         print(f"[✓] Archivo subido a S3: {audio_url}")
         return audio_url
 
-    def _delete_audio_file(self, audio_url: str) -> bool:
+    async def _stream_audio_file(
+        self, artist_id: str, album_id: str, audio_file: UploadFile, title: str
+    ) -> StreamedObject:
+        """
+        Sube el audio a S3 por bloques (multipart) sin cargarlo entero en
+        memoria, validando sus magic bytes antes de escribir nada.
+        """
+        filename = audio_file.filename or "unknown.mp3"
+        key = self._build_audio_key(artist_id, album_id, title, filename)
+        await audio_file.seek(0)
+        uploaded = await stream_upload_to_s3(
+            audio_file,
+            settings.aws_s3_bucket,
+            key,
+            max_size=settings.max_audio_file_size,
+            part_size=settings.s3_multipart_part_size,
+            inspect_header=lambda header: validate_audio_header(header, filename),
+            header_size=AUDIO_HEADER_SIZE,
+        )
+        print(
+            f"[✓] Archivo subido a S3: {key} ({uploaded.size} bytes, sha256={uploaded.sha256})"
+        )
+        return uploaded
+
+    async def _delete_audio_file(self, audio_url: str) -> bool:
         """Elimina el archivo de audio de S3"""
         key = extract_s3_key_from_url(
             audio_url, settings.aws_s3_bucket, settings.aws_region
         )
         if key:
-            return delete_from_s3(settings.aws_s3_bucket, key)
+            return await delete_from_s3(settings.aws_s3_bucket, key)
         return False
 
     async def create_song(
         self,
-        title: str,
+        title: str | None,
         album_id: int,
         user_id: int,
-        audio_file: bytes,
-        audio_filename: str,
+        audio_file: UploadFile,
         db: AsyncSession,
         artist_ids: list[int] | None = None,
         track_number: int | None = None,
@@ -130,30 +122,26 @@ class SongService:
                 raise ValueError(f"No existe artista para el user_id {user_id}")
             artist_ids = [artist_id]
 
-        # Extraer metadatos del audio
-        metadata = self._extract_audio_metadata(audio_file, audio_filename)
-        duration = (
-            override_duration if override_duration is not None else metadata["duration"]
-        )
+        # Sin título: el nombre del archivo hasta que el trabajo de metadatos
+        # lo rellene con el de las etiquetas (si las tiene)
+        fill_title = not title
+        if fill_title:
+            title = Path(audio_file.filename or "").stem or "untitled"
 
-        # Subir archivo a S3
-        audio_url = self._save_audio_file(
-            str(artist_ids[0]), str(album_id), audio_file, title, audio_filename
+        # Subir archivo a S3 en streaming
+        uploaded = await self._stream_audio_file(
+            str(artist_ids[0]), str(album_id), audio_file, title
+        )
+        audio_url = build_s3_public_url(
+            settings.aws_s3_bucket, settings.aws_region, uploaded.key
         )
 
-        # Fallbacks con metadatos
-        if not title and metadata.get("title"):
-            title = metadata["title"]
-        if track_number is None and metadata.get("track_number"):
-            try:
-                track_number = int(metadata["track_number"])
-            except (ValueError, TypeError):
-                pass
-
+        # Metadatos y derivados se calculan después, en trabajos en segundo
+        # plano: la duración queda a 0 hasta entonces (salvo override)
         song = Song(
             title=title,
             album_id=album_id,
-            duration=duration,
+            duration=override_duration if override_duration is not None else 0,
             audio_url=audio_url,
             track_number=track_number,
             genre_id=genre_id,
@@ -166,20 +154,21 @@ class SongService:
                 raise ValueError(f"El artista con id {artist_id} no existe")
             song.artists.append(artist)
 
-        song = await self.repo.create(song)
-
-        await publish_song_created_event(
+        # El evento y los trabajos se guardan en la misma transacción que la canción
+        self.repo.session.add(song)
+        await self.repo.session.flush()
+        enqueue_song_created_event(
+            self.repo.session, {**self.event_payload(song), "artist_ids": artist_ids}
+        )
+        JobService(JobRepository(self.repo.session)).enqueue_song_pipeline(
+            song.id,
             {
-                "id": song.id,
-                "title": song.title,
-                "album_id": song.album_id,
-                "artist_ids": artist_ids,
-                "duration": song.duration,
-                "audio_url": song.audio_url,
-                "track_number": song.track_number,
-                "genre_id": song.genre_id,
-            }
+                "override_duration": override_duration is not None,
+                "fill_title": fill_title,
+                "fill_track_number": track_number is None,
+            },
         )
+        song = await self.repo.create(song)
         return song
 
     async def update_song(
@@ -192,6 +181,7 @@ class SongService:
         audio_filename: str | None = None,
     ) -> Song:
         """Actualiza una canción existente"""
+        renamed: tuple[str, str] | None = None
 
         # Si se actualiza el título, renombrar archivo en S3
         if title and title != song.title:
@@ -203,46 +193,36 @@ class SongService:
             )
 
             if old_key:
-                try:
-                    s3 = get_s3_client()
-
-                    # Descargar archivo actual de S3
-                    response = s3.get_object(Bucket=settings.aws_s3_bucket, Key=old_key)
-                    audio_data = response["Body"].read()
-
-                    # Crear nuevo key con título sanitizado
-                    ext = Path(old_key).suffix or ".mp3"
-                    safe_title = self._sanitize_filename(title)
-                    new_filename = f"{safe_title}{ext}"
-
-                    # Mantener estructura: artist_id/album_id/filename
-                    path_parts = old_key.split("/")
-                    if len(path_parts) >= 3:
-                        new_key = f"{path_parts[0]}/{path_parts[1]}/{new_filename}"
-                    else:
-                        artist_id = (
-                            song.artists[0].id if song.artists else song.album.artist_id
-                        )
-                        new_key = f"{artist_id}/{song.album_id}/{new_filename}"
-
-                    # Subir con nuevo nombre
-                    upload_bytes_to_s3(
-                        settings.aws_s3_bucket, new_key, audio_data, "audio/mpeg"
+                # Crear nuevo key con título sanitizado
+                ext = Path(old_key).suffix or ".mp3"
+                safe_title = self._sanitize_filename(title) or "untitled"
+                new_filename = f"{safe_title}{ext}"
+
+                # Mantener estructura: artist_id/album_id/filename
+                path_parts = old_key.split("/")
+                if len(path_parts) >= 3:
+                    new_key = f"{path_parts[0]}/{path_parts[1]}/{new_filename}"
+                else:
+                    artist_id = (
+                        song.artists[0].id if song.artists else song.album.artist_id
                     )
+                    new_key = f"{artist_id}/{song.album_id}/{new_filename}"
 
-                    # Eliminar archivo antiguo
-                    delete_from_s3(settings.aws_s3_bucket, old_key)
+                # Títulos distintos pueden sanitizarse al mismo key
+                if new_key != old_key:
+                    try:
+                        # Copia dentro de S3: el audio no pasa por este servicio
+                        await copy_in_s3(settings.aws_s3_bucket, old_key, new_key)
+                    except Exception as e:
+                        print(f"[!] Error renombrando archivo en S3: {e}")
+                        raise
 
-                    # Actualizar URL
                     song.audio_url = build_s3_public_url(
                         settings.aws_s3_bucket, settings.aws_region, new_key
                     )
-
-                    print(f"[✓] Archivo renombrado en S3: {old_key} -> {new_key}")
-
-                except Exception as e:
-                    print(f"[!] Error renombrando archivo en S3: {e}")
-                    raise
+                    # El original se borra cuando la nueva URL ya está guardada
+                    renamed = (old_key, new_key)
+                    print(f"[✓] Archivo copiado en S3: {old_key} -> {new_key}")
 
             song.title = title
 
@@ -250,11 +230,11 @@ class SongService:
         if audio_file and audio_filename:
             # Eliminar archivo anterior de S3
             if song.audio_url:
-                self._delete_audio_file(song.audio_url)
+                await self._delete_audio_file(song.audio_url)
 
             # Subir nuevo archivo a S3
             artist_id = song.artists[0].id if song.artists else song.album.artist_id
-            audio_url = self._save_audio_file(
+            audio_url = await self._save_audio_file(
                 str(artist_id),
                 str(song.album_id),
                 audio_file,
@@ -263,39 +243,50 @@ class SongService:
             )
             song.audio_url = audio_url
 
-            # Actualizar duración con el nuevo archivo
-            metadata = self._extract_audio_metadata(audio_file, audio_filename)
-            song.duration = metadata.get("duration", 0)
+            # Duración y derivados del nuevo archivo, en segundo plano
+            JobService(JobRepository(self.repo.session)).enqueue_song_pipeline(song.id)
 
         if track_number is not None:
             song.track_number = track_number
         if genre_id is not None:
             song.genre_id = genre_id
 
-        song = await self.repo.update(song)
+        enqueue_song_updated_event(self.repo.session, self.event_payload(song))
+        try:
+            song = await self.repo.update(song)
+        except Exception:
+            # La base de datos sigue apuntando al archivo original
+            if renamed:
+                schedule_delete_from_s3(settings.aws_s3_bucket, renamed[1])
+            raise
+        if renamed:
+            schedule_delete_from_s3(settings.aws_s3_bucket, renamed[0])
 
-        await publish_song_updated_event(
-            {
-                "id": song.id,
-                "title": song.title,
-                "album_id": song.album_id,
-                "duration": song.duration,
-                "audio_url": song.audio_url,
-                "track_number": song.track_number,
-                "genre_id": song.genre_id,
-            }
-        )
         return song
 
     async def delete_song(self, song: Song) -> None:
-        """Elimina una canción y su archivo de S3"""
+        """Elimina una canción, su archivo de S3 y sus derivados"""
+        key = (
+            extract_s3_key_from_url(
+                song.audio_url, settings.aws_s3_bucket, settings.aws_region
+            )
+            if song.audio_url
+            else None
+        )
         # Eliminar archivo de audio de S3 si existe
         if song.audio_url:
-            self._delete_audio_file(song.audio_url)
+            await self._delete_audio_file(song.audio_url)
 
         # Eliminar canción de la base de datos
+        song_id = song.id
         await self.repo.delete(song)
 
+        # Forma de onda y demás derivados, en segundo plano
+        if key:
+            storage_cleanup.enqueue_prefix(
+                settings.aws_s3_bucket, build_song_assets_prefix(key, song_id)
+            )
+
     async def get_song(self, song_id: int) -> Song | None:
         """Obtiene una canción por ID"""
         return await self.repo.get_by_id(song_id)
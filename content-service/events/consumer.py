@@ -6,7 +6,7 @@ from aio_pika.abc import AbstractIncomingMessage
 from infrastructure.db.connection import AsyncSessionLocal
 from core.repositories.album_repository import AlbumRepository
 from core.services.album_service import AlbumService
-from core.services.artist_lookup import ArtistLookupService
+from core.services.artist_lookup import ArtistLookupService, artist_id_cache
 from config import settings
 
 
@@ -25,6 +25,10 @@ async def handle_artist_created(message: AbstractIncomingMessage) -> None:
                 print("[!] Evento artist_created inválido: falta user_id")
                 return
 
+            # El evento ya trae el artist_id: la caché no necesita consultar
+            if data.get("id"):
+                artist_id_cache.set(user_id, data["id"])
+
             # Abrimos sesión centralizada para todo el flujo
             async with AsyncSessionLocal() as session:
                 # 🔹 Resolvemos artist_id usando la misma sesión
@@ -59,13 +63,35 @@ async def handle_artist_created(message: AbstractIncomingMessage) -> None:
             print(f"[!] Error procesando evento artist_created: {e}")
 
 
+async def handle_artist_deleted(message: AbstractIncomingMessage) -> None:
+    """El usuario deja de ser artista: se olvida su artist_id en caché"""
+    async with message.process():
+        try:
+            data = json.loads(message.body.decode())
+            user_id = data.get("user_id")
+
+            if not user_id:
+                print("[!] Evento artist_deleted inválido: falta user_id")
+                return
+
+            artist_id_cache.invalidate(user_id)
+            print(f"[✓] Artista {data.get('id')} eliminado; caché de user {user_id} invalidada")
+
+        except json.JSONDecodeError:
+            print("[!] Error: mensaje inválido (no es JSON)")
+        except Exception as e:
+            print(f"[!] Error procesando evento artist_deleted: {e}")
+
+
 async def consume_events():
-    """Suscripción a la cola de eventos de artistas"""
+    """Suscripción a las colas de eventos de artistas"""
     connection = await aio_pika.connect_robust(settings.rabbitmq_url)
     channel = await connection.channel()
     queue = await channel.declare_queue("artist_created", durable=True)
     await queue.consume(handle_artist_created)
-    print("[*] Esperando eventos artist_created...")
+    queue = await channel.declare_queue("artist_deleted", durable=True)
+    await queue.consume(handle_artist_deleted)
+    print("[*] Esperando eventos artist_created / artist_deleted...")
     return connection
 
 
@@ -1,17 +1,8 @@
-import json
-import aio_pika
-from config import settings
+from sqlalchemy.ext.asyncio import AsyncSession
+from events.outbox import add_outbox_event
 
-
-async def publish_event(queue_name: str, payload: dict):
-    """Función genérica para publicar eventos"""
-    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
-    async with connection:
-        channel = await connection.channel()
-        queue = await channel.declare_queue(queue_name, durable=True)
-
-        message = aio_pika.Message(body=json.dumps(payload).encode())
-        await channel.default_exchange.publish(message, routing_key=queue.name)
+# Los eventos no se publican aquí: se guardan en la outbox dentro de la
+# transacción del cambio y el relay los envía a RabbitMQ tras el commit.
 
 
 # -------------------------------
@@ -19,17 +10,17 @@ async def publish_event(queue_name: str, payload: dict):
 # -------------------------------
 
 
-async def publish_album_created_event(album_data: dict):
-    await publish_event("album_created", album_data)
+def enqueue_album_created_event(session: AsyncSession, album_data: dict):
+    add_outbox_event(session, "album_created", album_data)
 
 
-async def publish_album_updated_event(album_data: dict):
-    await publish_event("album_updated", album_data)
+def enqueue_album_updated_event(session: AsyncSession, album_data: dict):
+    add_outbox_event(session, "album_updated", album_data)
 
 
-async def publish_song_created_event(song_data: dict):
-    await publish_event("song_created", song_data)
+def enqueue_song_created_event(session: AsyncSession, song_data: dict):
+    add_outbox_event(session, "song_created", song_data)
 
 
-async def publish_song_updated_event(song_data: dict):
-    await publish_event("song_updated", song_data)
+def enqueue_song_updated_event(session: AsyncSession, song_data: dict):
+    add_outbox_event(session, "song_updated", song_data)
@@ -1,5 +1,6 @@
 import datetime
 from sqlalchemy import (
+    BigInteger,
     Integer,
     String,
     Text,
@@ -161,3 +162,66 @@ class Song(Base):
 
     def __repr__(self) -> str:
         return f"<Song id={self.id} title={self.title} album_id={self.album_id}>"
+
+
+class OutboxEvent(Base):
+    """Evento pendiente de publicar: se escribe en la misma transacción que el cambio."""
+
+    __tablename__ = "content_outbox"
+    __table_args__ = {"schema": "music_streaming"}
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    queue: Mapped[str] = mapped_column(String(100), nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEvent id={self.id} queue={self.queue}>"
+
+
+# Estados de un trabajo de procesado
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class ProcessingJob(Base):
+    """Trabajo en segundo plano sobre una canción (metadatos, derivados, análisis)."""
+
+    __tablename__ = "content_jobs"
+    __table_args__ = (
+        Index("ix_content_jobs_status_run_after", "status", "run_after"),
+        {"schema": "music_streaming"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Sin clave foránea: si la canción se borra, el trabajo se descarta al ejecutarse
+    song_id: Mapped[int | None] = mapped_column(Integer, index=True)
+    payload: Mapped[dict | None] = mapped_column(JSON)
+    status: Mapped[str] = mapped_column(String(20), default=JOB_PENDING, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    result: Mapped[dict | None] = mapped_column(JSON)
+
+    # No se reclama antes de run_after (reintentos con espera)
+    run_after: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow, nullable=False
+    )
+    # Mientras corre, otro worker no lo toma hasta que venza el lease
+    locked_until: Mapped[datetime.datetime | None] = mapped_column(DateTime)
+    created_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime, default=datetime.datetime.utcnow
+    )
+    started_at: Mapped[datetime.datetime | None] = mapped_column(DateTime)
+    finished_at: Mapped[datetime.datetime | None] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<ProcessingJob id={self.id} kind={self.kind} status={self.status}>"
@@ -0,0 +1,121 @@
+# infrastructure/storage/cleanup.py
+import asyncio
+from infrastructure.storage.s3_storage import S3Storage, s3_storage
+
+# Máximo de claves que admite S3 en una llamada a delete_objects
+DELETE_BATCH_SIZE = 1000
+
+
+class StorageCleanup:
+    """
+    Borrado de objetos de S3 en segundo plano.
+
+    Quien borra filas solo encola el trabajo (claves sueltas o un prefijo
+    entero) y responde en cuanto la transacción está confirmada. Un único
+    worker agrupa lo que haya pendiente y lo borra con `delete_objects`, de
+    hasta 1000 claves por llamada; los prefijos se listan con
+    `list_objects_v2` y se borran página a página.
+    """
+
+    def __init__(self, storage: S3Storage = s3_storage, batch_size: int = DELETE_BATCH_SIZE):
+        self.storage = storage
+        self.batch_size = min(batch_size, DELETE_BATCH_SIZE)
+        # (bucket, clave o prefijo, es_prefijo)
+        self._queue: asyncio.Queue[tuple[str, str, bool]] = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    def enqueue_keys(self, bucket: str, keys: list[str]) -> None:
+        for key in keys:
+            self._queue.put_nowait((bucket, key, False))
+        self._ensure_worker()
+
+    def enqueue_prefix(self, bucket: str, prefix: str) -> None:
+        # Un prefijo vacío o sin "/" final podría alcanzar objetos ajenos
+        if not prefix.strip("/") or not prefix.endswith("/"):
+            raise ValueError(f"Prefijo de borrado no válido: {prefix!r}")
+        self._queue.put_nowait((bucket, prefix, True))
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._process(batch)
+            except Exception as e:
+                print(f"[!] Error en la limpieza de S3: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process(self, batch: list[tuple[str, str, bool]]) -> None:
+        keys_by_bucket: dict[str, list[str]] = {}
+        for bucket, value, is_prefix in batch:
+            if is_prefix:
+                await self._delete_prefix(bucket, value)
+            else:
+                keys_by_bucket.setdefault(bucket, []).append(value)
+
+        for bucket, keys in keys_by_bucket.items():
+            await self._delete_keys(bucket, list(dict.fromkeys(keys)))
+
+    async def _delete_keys(self, bucket: str, keys: list[str]) -> int:
+        deleted = 0
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start : start + self.batch_size]
+            response = await self.storage.call(
+                "delete_objects",
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in chunk], "Quiet": True},
+            )
+            # Con Quiet solo se informan los fallos, clave a clave
+            errors = response.get("Errors", [])
+            for error in errors:
+                print(f"[!] No se pudo eliminar {error.get('Key')} de S3: {error.get('Message')}")
+            deleted += len(chunk) - len(errors)
+        if deleted:
+            print(f"[✓] {deleted} archivo(s) eliminados de S3")
+        return deleted
+
+    async def _delete_prefix(self, bucket: str, prefix: str) -> None:
+        deleted = 0
+        token = None
+        while True:
+            extra_args = {"ContinuationToken": token} if token else {}
+            page = await self.storage.call(
+                "list_objects_v2",
+                Bucket=bucket,
+                Prefix=prefix,
+                MaxKeys=self.batch_size,
+                **extra_args,
+            )
+            keys = [item["Key"] for item in page.get("Contents", [])]
+            if keys:
+                deleted += await self._delete_keys(bucket, keys)
+            if not page.get("IsTruncated"):
+                break
+            token = page["NextContinuationToken"]
+        print(f"[✓] Prefijo {prefix} limpiado en S3 ({deleted} archivo(s))")
+
+    async def close(self, timeout: float = 30.0) -> None:
+        """Espera a que se vacíe la cola (como mucho `timeout` segundos) y para el worker."""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[!] Limpieza de S3 sin terminar al apagar ({self._queue.qsize()} pendientes)")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+
+storage_cleanup = StorageCleanup()
@@ -0,0 +1,163 @@
+# infrastructure/storage/multipart_upload.py
+import hashlib
+from dataclasses import dataclass
+from typing import Callable, Protocol
+from infrastructure.storage.s3_storage import S3Storage, s3_storage
+
+# S3 exige al menos 5 MB en todas las partes salvo la última
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Tamaño de cada lectura del archivo subido
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class AsyncReadable(Protocol):
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+class UploadTooLargeError(ValueError):
+    """El cuerpo supera el tamaño máximo permitido."""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"El archivo supera el tamaño máximo de {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class StreamedObject:
+    key: str
+    size: int
+    sha256: str
+    content_type: str
+
+
+class S3MultipartWriter:
+    """
+    Escribe un objeto en S3 por partes: en memoria solo vive la parte en
+    curso. Si todo el objeto cabe en una parte se sube con un único
+    put_object y no se llega a abrir la subida multipart.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        key: str,
+        content_type: str,
+        part_size: int,
+        storage: S3Storage = s3_storage,
+    ):
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.storage = storage
+        self._buffer = bytearray()
+        self._upload_id: str | None = None
+        self._parts: list[dict] = []
+
+    async def write(self, data: bytes) -> None:
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            await self._upload_part(part)
+
+    async def _upload_part(self, body: bytes) -> None:
+        if self._upload_id is None:
+            response = await self.storage.call(
+                "create_multipart_upload",
+                Bucket=self.bucket,
+                Key=self.key,
+                ContentType=self.content_type,
+            )
+            self._upload_id = response["UploadId"]
+
+        part_number = len(self._parts) + 1
+        response = await self.storage.call(
+            "upload_part",
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    async def complete(self) -> None:
+        if self._upload_id is None:
+            await self.storage.call(
+                "put_object",
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                ContentType=self.content_type,
+            )
+            self._buffer.clear()
+            return
+
+        if self._buffer:
+            await self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        await self.storage.call(
+            "complete_multipart_upload",
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+
+    async def abort(self) -> None:
+        self._buffer.clear()
+        if self._upload_id is None:
+            return
+        try:
+            await self.storage.call(
+                "abort_multipart_upload",
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+            )
+        except Exception as e:
+            print(f"[!] Error abortando subida multipart de {self.key}: {e}")
+
+
+async def stream_upload_to_s3(
+    source: AsyncReadable,
+    bucket: str,
+    key: str,
+    max_size: int,
+    part_size: int,
+    inspect_header: Callable[[bytes], str],
+    header_size: int = 64,
+) -> StreamedObject:
+    """
+    Copia `source` a S3 leyendo por bloques, con memoria constante por
+    subida. Los primeros `header_size` bytes se pasan a `inspect_header`
+    antes de escribir nada (valida el formato y devuelve el content type);
+    el tamaño se controla y el SHA-256 se calcula sobre la marcha.
+    """
+    header = b""
+    while len(header) < header_size:
+        chunk = await source.read(header_size - len(header))
+        if not chunk:
+            break
+        header += chunk
+    content_type = inspect_header(header)
+
+    writer = S3MultipartWriter(bucket, key, content_type, part_size)
+    digest = hashlib.sha256(header)
+    size = len(header)
+    try:
+        await writer.write(header)
+        while chunk := await source.read(READ_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadTooLargeError(max_size)
+            digest.update(chunk)
+            await writer.write(chunk)
+        await writer.complete()
+    except BaseException:
+        await writer.abort()
+        raise
+
+    return StreamedObject(key=key, size=size, sha256=digest.hexdigest(), content_type=content_type)
@@ -0,0 +1,77 @@
+# infrastructure/storage/ranged_reader.py
+import io
+from typing import Callable
+
+
+class RangedReader(io.RawIOBase):
+    """
+    Archivo de solo lectura sobre un objeto remoto que se pide por rangos.
+
+    Solo se descargan los bloques que se llegan a leer (con caché), así que
+    un lector que salta a la cabecera y a las etiquetas (mutagen) trae unos
+    pocos KB aunque el objeto ocupe decenas de MB. `fetch(start, end)`
+    devuelve los bytes [start, end], ambos incluidos, y se llama de forma
+    síncrona: el lector se usa desde un hilo, nunca en el event loop.
+    """
+
+    def __init__(
+        self, fetch: Callable[[int, int], bytes], size: int, block_size: int = 64 * 1024
+    ):
+        self.fetch = fetch
+        self.size = size
+        self.block_size = block_size
+        self.requests = 0
+        self.bytes_fetched = 0
+        self._blocks: dict[int, bytes] = {}
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("Posición negativa")
+        self._position = offset
+        return offset
+
+    def _load(self, first: int, last: int) -> None:
+        """Trae de una vez los bloques [first, last] que falten (contiguos)."""
+        missing = [block for block in range(first, last + 1) if block not in self._blocks]
+        if not missing:
+            return
+        start = missing[0] * self.block_size
+        end = min(self.size, (missing[-1] + 1) * self.block_size) - 1
+        data = self.fetch(start, end)
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        for block in range(missing[0], missing[-1] + 1):
+            offset = (block - missing[0]) * self.block_size
+            self._blocks.setdefault(block, data[offset : offset + self.block_size])
+
+    def readinto(self, buffer) -> int:
+        end = min(self.size, self._position + len(buffer))
+        if self._position >= end:
+            return 0
+        first = self._position // self.block_size
+        last = (end - 1) // self.block_size
+        self._load(first, last)
+
+        view = memoryview(buffer)
+        written = 0
+        while self._position < end:
+            block, offset = divmod(self._position, self.block_size)
+            chunk = self._blocks[block][offset : offset + end - self._position]
+            view[written : written + len(chunk)] = chunk
+            written += len(chunk)
+            self._position += len(chunk)
+        return written
@@ -1,37 +1,48 @@
 # infrastructure/storage/s3_client.py
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 from config import settings
+from infrastructure.storage.s3_storage import s3_storage
+from infrastructure.storage.cleanup import storage_cleanup
 
 
 def get_s3_client():
-    return settings.get_s3_client()
+    """Cliente boto3 compartido (síncrono); para llamadas desde código async usar s3_storage."""
+    return s3_storage.client
 
 
-def upload_bytes_to_s3(
+async def upload_bytes_to_s3(
     bucket: str, key: str, data: bytes, content_type: str | None = None
 ):
     """Sube bytes a S3 y no devuelve URL."""
-    s3 = get_s3_client()
-    extra_args = {"ContentType": content_type} if content_type else {}
-    s3.put_object(Bucket=bucket, Key=key, Body=data, **extra_args)
+    await s3_storage.put_object(bucket, key, data, content_type)
 
 
-def delete_from_s3(bucket: str, key: str) -> bool:
+async def delete_from_s3(bucket: str, key: str) -> bool:
     """
     Elimina un objeto de S3.
     Retorna True si se eliminó correctamente, False si hubo error.
     """
     try:
-        s3 = get_s3_client()
-        s3.delete_object(Bucket=bucket, Key=key)
+        await s3_storage.delete_object(bucket, key)
         print(f"[✓] Archivo eliminado de S3: {key}")
         return True
-    except ClientError as e:
+    except (BotoCoreError, ClientError) as e:
         print(f"[!] Error eliminando archivo de S3: {e}")
         return False
 
 
+async def copy_in_s3(bucket: str, source_key: str, dest_key: str) -> None:
+    """Copia un objeto dentro del bucket (server-side, multipart si es grande)."""
+    await s3_storage.copy_object(
+        bucket, source_key, dest_key, settings.s3_multipart_copy_threshold
+    )
+
+
+def schedule_delete_from_s3(bucket: str, key: str) -> None:
+    """Borra el objeto en segundo plano, sin retrasar la respuesta."""
+    storage_cleanup.enqueue_keys(bucket, [key])
+
+
 def extract_s3_key_from_url(url: str, bucket: str, region: str) -> str | None:
     """
     Extrae el key de S3 desde una URL pública de AWS.
@@ -52,3 +63,13 @@ def extract_s3_key_from_url(url: str, bucket: str, region: str) -> str | None:
 def build_s3_public_url(bucket: str, region: str, key: str) -> str:
     """Crea una URL pública de S3 para AWS."""
     return f"https://{bucket}.s3.{region}.amazonaws.com/{key}"
+
+
+def build_song_assets_prefix(audio_key: str, song_id: int) -> str:
+    """
+    Carpeta de los derivados de una canción (forma de onda, índices...), junto
+    al audio: `{artist_id}/{album_id}/processed/{song_id}/`. No depende del
+    título, así sobrevive a los renombrados del audio.
+    """
+    folder = audio_key.rsplit("/", 1)[0] + "/" if "/" in audio_key else ""
+    return f"{folder}processed/{song_id}/"
@@ -3,7 +3,17 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from core.handlers.album_handler import router as album_router
 from core.handlers.song_handler import router as song_router
-from middleware.auth_middleware import AuthMiddleware
+from core.handlers.job_handler import router as job_router
+from middleware.auth_middleware import AuthMiddleware, token_cache
+from core.services.artist_lookup import artist_id_cache
+from middleware.upload_limit import UploadLimitMiddleware
+from infrastructure.storage.s3_storage import s3_storage
+from infrastructure.storage.cleanup import storage_cleanup
+from events.publisher import event_publisher
+from events.outbox import outbox_relay
+from core.jobs.worker import job_worker
+from core.jobs.shared_audio import shared_audio
+import core.jobs.song_jobs  # registra los trabajos de canciones
 import asyncio
 from contextlib import asynccontextmanager
 
@@ -29,22 +39,42 @@ async def lifespan(_):
         except Exception as e:
             print(f"[!] Error iniciando consumer RabbitMQ: {e}")
             print("[!] Continuando sin RabbitMQ...")
+        try:
+            await event_publisher.start()
+        except Exception as e:
+            print(f"[!] Error conectando el publicador RabbitMQ: {e}")
     else:
         print("[!] Ejecutando sin RabbitMQ (modo desarrollo)")
+    # Los eventos se guardan en la outbox aunque RabbitMQ no esté disponible
+    await outbox_relay.start()
+    await job_worker.start()
 
     yield
 
     # Shutdown
+    await job_worker.close()
+    shared_audio.close()
+    await outbox_relay.close()
+    await storage_cleanup.close()
+    s3_storage.close()
     if "task" in locals():
         task.cancel()
         try:
             await task
         except asyncio.CancelledError:
             print("[*] Consumer detenido correctamente.")
+    await event_publisher.close()
 
 
 app = FastAPI(title="Music Service", version="0.1", lifespan=lifespan)
 
+# Subidas de audio: el audio más el resto de campos del formulario
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={("POST", "/songs/"): settings.max_audio_file_size + 1024 * 1024},
+    detail=f"El archivo de audio es demasiado grande "
+    f"(máximo {settings.max_audio_file_size // (1024 * 1024)}MB)",
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -57,6 +87,7 @@ app.add_middleware(
 app.add_middleware(AuthMiddleware)
 app.include_router(album_router)
 app.include_router(song_router)
+app.include_router(job_router)
 
 
 @app.get("/health")
@@ -64,6 +95,16 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return token_cache.stats()
+
+
+@app.get("/health/artist-cache")
+def artist_cache_stats():
+    return artist_id_cache.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=settings.port, reload=True)
 
@@ -0,0 +1,50 @@
+# content-service/middleware/upload_limit.py
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class UploadLimitMiddleware:
+    """
+    Corta los cuerpos demasiado grandes antes de que FastAPI los reciba y
+    los vuelque a disco: rechaza por Content-Length sin leer nada y, si el
+    cliente no lo envía (o miente), en cuanto los bytes recibidos superan el
+    límite. Solo aplica a las rutas de `limits`: {(método, ruta): bytes}.
+    """
+
+    def __init__(self, app: ASGIApp, limits: dict[tuple[str, str], int], detail: str):
+        self.app = app
+        self.limits = limits
+        self.detail = detail
+        self._too_large = JSONResponse(status_code=413, content={"detail": detail})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limits.get((scope["method"], scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > limit:
+                    await self._too_large(scope, receive, send)
+                    return
+                break
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI propaga las HTTPException lanzadas al leer el cuerpo
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
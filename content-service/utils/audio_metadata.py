@@ -0,0 +1,74 @@
+# utils/audio_metadata.py
+from typing import BinaryIO
+from mutagen._file import File as MutagenFile
+
+# Etiqueta "fácil" de mutagen (igual en ID3, Vorbis/FLAC y MP4) -> campo propio
+_TAGS = {
+    "artist": "artist",
+    "album": "album",
+    "title": "title",
+    "tracknumber": "track_number",
+    "genre": "genre",
+}
+# Frames ID3 equivalentes: WAVE (y AIFF) no tienen variante "easy" en mutagen
+# y sus etiquetas ID3 llegan en crudo
+_ID3_FRAMES = {
+    "TPE1": "artist",
+    "TALB": "album",
+    "TIT2": "title",
+    "TRCK": "track_number",
+    "TCON": "genre",
+}
+
+
+def _read_tags(tags) -> dict:
+    """Etiquetas propias a partir de las de mutagen ("easy" o ID3 en crudo)."""
+    found = {}
+    for tag, field in _TAGS.items():
+        values = tags.get(tag)
+        found[field] = str(values[0]) if values else None
+    if any(found.values()) or not hasattr(tags, "getall"):
+        return found
+    for frame_id, field in _ID3_FRAMES.items():
+        frame = tags.get(frame_id)
+        if frame is None:
+            continue
+        values = frame.genres if frame_id == "TCON" else frame.text
+        found[field] = str(values[0]) if values else None
+    return found
+
+
+def extract_audio_metadata(source: BinaryIO, filename: str = "") -> dict:
+    """
+    Duración, calidad y etiquetas del audio leyendo directamente del buffer
+    (archivo de la subida, BytesIO o el `RangedReader` del objeto en S3), sin
+    copiarlo a un archivo temporal. mutagen solo lee la cabecera y las
+    regiones de etiquetas que necesita.
+    """
+    try:
+        source.seek(0)
+        audio_file = MutagenFile(source, easy=True)
+        if audio_file is None:
+            raise ValueError("Formato de audio no soportado")
+
+        info = audio_file.info
+        metadata = {
+            "duration": int(info.length) if info else 0,
+            "bitrate": getattr(info, "bitrate", None),
+            "sample_rate": getattr(info, "sample_rate", None),
+            "channels": getattr(info, "channels", None),
+        }
+
+        if audio_file.tags:
+            metadata.update(_read_tags(audio_file.tags))
+            if metadata["track_number"]:
+                metadata["track_number"] = metadata["track_number"].split("/")[0]
+
+        print(
+            f"[✓] Metadatos extraídos: duración={metadata['duration']}s, bitrate={metadata['bitrate']}"
+        )
+        return metadata
+
+    except Exception as e:
+        print(f"[!] Error extrayendo metadatos de {filename or 'audio'}: {e}")
+        return {"duration": 0}
@@ -43,3 +43,46 @@ def validate_audio_file(audio_file: UploadFile) -> None:
             detail=f"Extensión de archivo no válida. "
             f"Extensiones permitidas: {', '.join(valid_extensions)}",
         )
+
+
+# Firmas (magic bytes) por formato -> content type con el que se guarda en S3
+def sniff_audio_format(header: bytes) -> str | None:
+    """Formato real del audio a partir de sus primeros bytes."""
+    if header.startswith(b"ID3"):
+        return "audio/mpeg"
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"  # frame MPEG sin etiqueta ID3
+    if header.startswith(b"fLaC"):
+        return "audio/flac"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "audio/wav"
+    if header.startswith(b"OggS"):
+        return "audio/ogg"
+    if header[4:8] == b"ftyp":
+        return "audio/mp4"
+    return None
+
+
+# Bytes necesarios para reconocer cualquiera de las firmas anteriores
+AUDIO_HEADER_SIZE = 12
+
+
+def validate_audio_header(header: bytes, filename: str) -> str:
+    """
+    Comprueba que el contenido sea audio y coincida con la extensión del
+    archivo; devuelve el content type detectado.
+    """
+    detected = sniff_audio_format(header)
+    if detected is None:
+        raise HTTPException(
+            status_code=400,
+            detail="El contenido del archivo no es un formato de audio soportado",
+        )
+
+    filename_lower = filename.lower()
+    if not any(filename_lower.endswith(ext) for ext in SUPPORTED_AUDIO_FORMATS[detected]):
+        raise HTTPException(
+            status_code=400,
+            detail=f"El contenido del archivo ({detected}) no coincide con su extensión",
+        )
+    return detected
@@ -0,0 +1,85 @@
+# utils/hls.py
+import math
+import struct
+from pathlib import Path
+from utils.mpeg_audio import audio_frames
+
+HLS_PLAYLIST_NAME = "playlist.m3u8"
+HLS_PLAYLIST_CONTENT_TYPE = "application/vnd.apple.mpegurl"
+HLS_SEGMENT_CONTENT_TYPE = "audio/mpeg"
+
+# Audio "empaquetado" (RFC 8216, 3.4): cada segmento empieza con una etiqueta
+# ID3 con su marca de tiempo MPEG-2 (33 bits a 90 kHz) en un frame PRIV
+_TIMESTAMP_OWNER = b"com.apple.streaming.transportStreamTimestamp\x00"
+
+
+def _syncsafe(size: int) -> bytes:
+    return bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+
+
+def id3_timestamp_tag(seconds: float) -> bytes:
+    """Etiqueta ID3v2.4 con la marca de tiempo del primer frame del segmento."""
+    timestamp = round(seconds * 90000) & (2**33 - 1)
+    payload = _TIMESTAMP_OWNER + struct.pack(">Q", timestamp)
+    frame = b"PRIV" + _syncsafe(len(payload)) + b"\x00\x00" + payload
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frame)) + frame
+
+
+def build_playlist(segments: list[dict]) -> str:
+    """Playlist VOD con URIs relativas: segmentos junto a la playlist."""
+    target = max(math.ceil(segment["duration"]) for segment in segments)
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{target}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+    ]
+    for segment in segments:
+        lines.append(f"#EXTINF:{segment['duration']:.3f},")
+        lines.append(segment["name"])
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+def package_hls_file(path: str, out_dir: str, segment_seconds: float) -> dict | None:
+    """
+    Corta un MP3 en segmentos de unos `segment_seconds` alineados a frames y
+    escribe segmentos y playlist en `out_dir`. No recodifica: cada segmento
+    son los bytes originales de sus frames. None si no es MPEG audio.
+    Se ejecuta en el pool de procesos.
+    """
+    data = Path(path).read_bytes()
+    frames = audio_frames(data)
+    if not frames:
+        return None
+
+    sample_rate = frames[0][1].sample_rate
+    samples_per_frame = frames[0][1].samples
+    frames_per_segment = max(1, round(segment_seconds * sample_rate / samples_per_frame))
+
+    out = Path(out_dir)
+    segments = []
+    for index, first in enumerate(range(0, len(frames), frames_per_segment)):
+        chunk = frames[first : first + frames_per_segment]
+        name = f"segment_{index:05d}.mp3"
+        # Solo los bytes de los frames: nada de lo que haya entre ellos
+        body = id3_timestamp_tag(first * samples_per_frame / sample_rate) + b"".join(
+            data[offset : offset + header.length] for offset, header in chunk
+        )
+        (out / name).write_bytes(body)
+        segments.append(
+            {
+                "name": name,
+                "duration": len(chunk) * samples_per_frame / sample_rate,
+                "size": len(body),
+            }
+        )
+
+    (out / HLS_PLAYLIST_NAME).write_text(build_playlist(segments))
+    return {
+        "format": "mpeg",
+        "segments": len(segments),
+        "duration": round(len(frames) * samples_per_frame / sample_rate, 3),
+        "target_duration": max(math.ceil(s["duration"]) for s in segments),
+    }
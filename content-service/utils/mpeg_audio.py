@@ -0,0 +1,230 @@
+# utils/mpeg_audio.py
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+# kbps por índice de bitrate, según (MPEG-1 o MPEG-2/2.5, capa)
+_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Hz por índice, según los bits de versión (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+# Formato del índice (little endian):
+#   cabecera: magic "VSSI", versión (u16), reservado (u16), sample rate (u32),
+#             muestras por frame (u32), nº de frames (u32), fin del audio (u32)
+#   datos: byte de inicio de cada frame de audio (u32)
+# Todos los frames duran lo mismo, así que el frame de un instante t es
+# t * sample_rate // muestras_por_frame y su posición está en la tabla.
+SEEK_INDEX_MAGIC = b"VSSI"
+SEEK_INDEX_VERSION = 1
+SEEK_INDEX_CONTENT_TYPE = "application/octet-stream"
+_SEEK_HEADER = struct.Struct("<4sHHIIII")
+_SEEK_ENTRY = struct.Struct("<I")
+
+# Frames pegados que confirman dónde empieza el audio, y cuánto se busca
+SYNC_FRAMES = 8
+_SYNC_SEARCH = 64 * 1024
+
+
+class FrameHeader(NamedTuple):
+    version: int  # bits de versión: 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    layer: int
+    sample_rate: int
+    samples: int
+    length: int
+    channels: int
+    protected: bool
+
+
+def parse_frame_header(data: bytes, offset: int) -> FrameHeader | None:
+    """Cabecera del frame MPEG en `offset`, o None si ahí no empieza uno válido."""
+    if offset < 0 or offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset : offset + 4]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    # Versión y capa reservadas, bitrate libre o inválido, sample rate reservado
+    if version == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(1 if mpeg1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+    return FrameHeader(
+        version=version,
+        layer=layer,
+        sample_rate=sample_rate,
+        samples=samples,
+        length=length,
+        channels=1 if b3 >> 6 == 0x03 else 2,
+        protected=not b1 & 0x01,
+    )
+
+
+def _same_stream(a: FrameHeader, b: FrameHeader) -> bool:
+    return (a.version, a.layer, a.sample_rate) == (b.version, b.layer, b.sample_rate)
+
+
+def skip_id3v2(data: bytes) -> int:
+    """Posición tras las etiquetas ID3v2 del principio (puede haber varias)."""
+    offset = 0
+    while data.startswith(b"ID3", offset) and offset + 10 <= len(data):
+        flags = data[offset + 5]
+        size = 0
+        for byte in data[offset + 6 : offset + 10]:
+            size = (size << 7) | (byte & 0x7F)  # entero "syncsafe"
+        offset += 10 + size + (10 if flags & 0x10 else 0)
+    return offset
+
+
+def _frame_run(data: bytes, offset: int, limit: int) -> list[tuple[int, FrameHeader]]:
+    """Hasta `limit` frames pegados del mismo stream a partir de `offset`."""
+    run: list[tuple[int, FrameHeader]] = []
+    while len(run) < limit:
+        header = parse_frame_header(data, offset)
+        if (
+            header is None
+            or (run and not _same_stream(run[0][1], header))
+            or offset + header.length > len(data)
+        ):
+            break
+        run.append((offset, header))
+        offset += header.length
+    return run
+
+
+def iter_frames(data: bytes) -> Iterator[tuple[int, FrameHeader]]:
+    """
+    Frames MPEG del archivo: (posición, cabecera). El audio empieza donde hay
+    SYNC_FRAMES frames pegados (o una cadena que acaba justo al final del
+    archivo), buscando solo al principio: unos 0xFF al azar en datos que no
+    son MPEG no pasan esa prueba. Desde ahí solo cuentan frames pegados; el
+    primer hueco (etiqueta final, basura, frame cortado) termina el audio.
+    """
+    start = skip_id3v2(data)
+    offset = start
+    while 0 <= offset <= start + _SYNC_SEARCH:
+        run = _frame_run(data, offset, SYNC_FRAMES)
+        if run and (
+            len(run) == SYNC_FRAMES or run[-1][0] + run[-1][1].length == len(data)
+        ):
+            break
+        offset = data.find(b"\xff", offset + 1)
+    else:
+        return
+
+    stream = run[0][1]
+    while True:
+        header = parse_frame_header(data, offset)
+        if (
+            header is None
+            or not _same_stream(stream, header)
+            or offset + header.length > len(data)
+        ):
+            return
+        yield offset, header
+        offset += header.length
+
+
+def is_info_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """Frame Xing/Info/VBRI del principio: metadatos del encoder, no audio."""
+    if header.layer != 3:
+        return False
+    if header.version == 3:
+        side_info = 17 if header.channels == 1 else 32
+    else:
+        side_info = 9 if header.channels == 1 else 17
+    tag_at = offset + 4 + (2 if header.protected else 0) + side_info
+    return data[tag_at : tag_at + 4] in (b"Xing", b"Info") or (
+        data[offset + 36 : offset + 40] == b"VBRI"
+    )
+
+
+def audio_frames(data: bytes) -> list[tuple[int, FrameHeader]]:
+    """Frames con audio (sin el frame de información del encoder)."""
+    frames = list(iter_frames(data))
+    if frames and is_info_frame(data, *frames[0]):
+        frames.pop(0)
+    return frames
+
+
+def build_seek_index(data: bytes) -> tuple[bytes, dict] | None:
+    """Tabla tiempo -> byte de un MP3 (o MPEG audio). None si no lo es."""
+    frames = audio_frames(data)
+    if not frames:
+        return None
+
+    first = frames[0][1]
+    offsets = array("I", (offset for offset, _ in frames))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    last_offset, last = frames[-1]
+    audio_end = last_offset + last.length
+
+    header = _SEEK_HEADER.pack(
+        SEEK_INDEX_MAGIC,
+        SEEK_INDEX_VERSION,
+        0,
+        first.sample_rate,
+        first.samples,
+        len(frames),
+        audio_end,
+    )
+    summary = {
+        "format": "mpeg",
+        "sample_rate": first.sample_rate,
+        "samples_per_frame": first.samples,
+        "frames": len(frames),
+        "duration": round(len(frames) * first.samples / first.sample_rate, 3),
+        "audio_start": frames[0][0],
+        "audio_end": audio_end,
+        "header_size": _SEEK_HEADER.size,
+    }
+    return header + offsets.tobytes(), summary
+
+
+def build_seek_index_file(path: str) -> tuple[bytes, dict] | None:
+    """Igual, a partir de una ruta: apta para ejecutarse en otro proceso."""
+    return build_seek_index(Path(path).read_bytes())
+
+
+def seek_frame(seconds: float, sample_rate: int, samples_per_frame: int, frames: int) -> int:
+    """Frame que suena en el instante `seconds` (el último si se pasa del final)."""
+    frame = int(seconds * sample_rate) // samples_per_frame
+    return max(0, min(frame, frames - 1))
+
+
+def seek_entry_range(frame: int, header_size: int = _SEEK_HEADER.size) -> tuple[int, int]:
+    """Bytes (inicio, fin inclusive) de la entrada de `frame` dentro del índice."""
+    start = header_size + frame * _SEEK_ENTRY.size
+    return start, start + _SEEK_ENTRY.size - 1
+
+
+def decode_seek_entry(entry: bytes) -> int:
+    return _SEEK_ENTRY.unpack(entry)[0]
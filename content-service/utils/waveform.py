@@ -0,0 +1,126 @@
+# utils/waveform.py
+import struct
+import subprocess
+from collections.abc import Iterator
+import numpy as np
+
+# Frecuencia a la que se decodifica el audio (mono) para calcular los picos
+WAVEFORM_SAMPLE_RATE = 22050
+# Muestras por pico de cada resolución: cada nivel agrupa 4 picos del anterior
+WAVEFORM_LEVELS = (256, 1024, 4096, 16384)
+
+# Formato del blob (little endian):
+#   cabecera: magic "VSWF", versión (u16), nº de niveles (u16),
+#             sample rate (u32), muestras totales (u32)
+#   por nivel: muestras por pico (u32), nº de picos (u32)
+#   datos: por nivel, pares (min, max) en int8 intercalados
+WAVEFORM_MAGIC = b"VSWF"
+WAVEFORM_VERSION = 1
+WAVEFORM_CONTENT_TYPE = "application/octet-stream"
+_HEADER = struct.Struct("<4sHHII")
+_LEVEL = struct.Struct("<II")
+
+# Muestras que se leen de ffmpeg de cada vez (2 bytes por muestra)
+_CHUNK_SAMPLES = 1 << 20
+
+
+def decode_pcm(
+    path: str, ffmpeg: str = "ffmpeg", sample_rate: int = WAVEFORM_SAMPLE_RATE
+) -> Iterator[np.ndarray]:
+    """
+    Decodifica cualquier formato que entienda ffmpeg a PCM int16 mono, por
+    bloques: el audio completo nunca está entero en memoria.
+    """
+    command = [
+        ffmpeg, "-nostdin", "-v", "error", "-i", path,
+        "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "-",
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(_CHUNK_SAMPLES * 2)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+        errors = process.stderr.read().decode(errors="replace").strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg no pudo decodificar el audio: {errors[-500:]}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def compute_peaks(
+    chunks: Iterator[np.ndarray], samples_per_peak: int
+) -> tuple[np.ndarray, np.ndarray, int]:
+    """Mínimos y máximos por ventana de `samples_per_peak` muestras."""
+    mins: list[np.ndarray] = []
+    maxs: list[np.ndarray] = []
+    rest = np.empty(0, dtype=np.int16)
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        samples = np.concatenate((rest, chunk)) if len(rest) else chunk
+        whole = len(samples) - len(samples) % samples_per_peak
+        windows = samples[:whole].reshape(-1, samples_per_peak)
+        mins.append(windows.min(axis=1))
+        maxs.append(windows.max(axis=1))
+        rest = samples[whole:]
+    # La última ventana puede quedar incompleta
+    if len(rest):
+        mins.append(rest.min(keepdims=True))
+        maxs.append(rest.max(keepdims=True))
+    if not mins:
+        return np.empty(0, np.int16), np.empty(0, np.int16), 0
+    return np.concatenate(mins), np.concatenate(maxs), total
+
+
+def downsample_peaks(
+    mins: np.ndarray, maxs: np.ndarray, factor: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Agrupa los picos de `factor` en `factor` (min de mínimos, max de máximos)."""
+    padding = -len(mins) % factor
+    info = np.iinfo(mins.dtype)
+    mins = np.pad(mins, (0, padding), constant_values=info.max)
+    maxs = np.pad(maxs, (0, padding), constant_values=info.min)
+    return mins.reshape(-1, factor).min(axis=1), maxs.reshape(-1, factor).max(axis=1)
+
+
+def encode_waveform(
+    levels: list[tuple[int, np.ndarray, np.ndarray]], sample_rate: int, total: int
+) -> bytes:
+    header = _HEADER.pack(WAVEFORM_MAGIC, WAVEFORM_VERSION, len(levels), sample_rate, total)
+    tables = b"".join(_LEVEL.pack(step, len(mins)) for step, mins, _ in levels)
+    # int16 -> int8 quedándose con el byte alto: de sobra para dibujar
+    data = b"".join(
+        np.stack((mins >> 8, maxs >> 8), axis=1).astype(np.int8).tobytes()
+        for _, mins, maxs in levels
+    )
+    return header + tables + data
+
+
+def build_waveform_file(
+    path: str, ffmpeg: str = "ffmpeg", sample_rate: int = WAVEFORM_SAMPLE_RATE
+) -> tuple[bytes, dict]:
+    """
+    Blob de picos de un archivo de audio y un resumen para el resultado del
+    trabajo. Se ejecuta en el pool de procesos (CPU).
+    """
+    base = WAVEFORM_LEVELS[0]
+    mins, maxs, total = compute_peaks(decode_pcm(path, ffmpeg, sample_rate), base)
+    if not total:
+        raise ValueError("El audio no contiene muestras")
+
+    levels = [(base, mins, maxs)]
+    for step in WAVEFORM_LEVELS[1:]:
+        previous, prev_mins, prev_maxs = levels[-1]
+        levels.append((step, *downsample_peaks(prev_mins, prev_maxs, step // previous)))
+
+    blob = encode_waveform(levels, sample_rate, total)
+    summary = {
+        "sample_rate": sample_rate,
+        "samples": total,
+        "levels": [{"samples_per_peak": step, "peaks": len(m)} for step, m, _ in levels],
+    }
+    return blob, summary
@@ -3,6 +3,9 @@ import { searchRequest } from './api';
 class SearchService {
   constructor() {
     this.baseEndpoint = '/search';
+    // Cursor del ranking de la última consulta: las páginas siguientes lo reutilizan
+    this.lastQuery = null;
+    this.cursor = null;
   }
 
   async search(query, options = {}, authContext) {
@@ -14,17 +17,25 @@ class SearchService {
     } = options;
 
     try {
+      const params = {
+        q: query,
+        song_page: songPage,
+        album_page: albumPage,
+        artist_page: artistPage,
+        limit: limit,
+      };
+      if (this.cursor && this.lastQuery === query) {
+        params.cursor = this.cursor;
+      }
+
       const response = await searchRequest(this.baseEndpoint, {
         method: 'GET',
-        params: {
-          q: query,
-          song_page: songPage,
-          album_page: albumPage,
-          artist_page: artistPage,
-          limit: limit,
-        },
+        params,
       }, authContext);
 
+      this.lastQuery = query;
+      this.cursor = response?.cursor || null;
+
       return response;
     } catch (error) {
       console.error('Error en búsqueda:', error);
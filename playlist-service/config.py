@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     db_url: str = Field(alias="db_url_py")
     jwt_secret: str = Field(alias="JWT_SECRET", default="HolaMundoo")
     jwt_algorithm: str = Field(alias="JWT_ALGORITHM", default="HS256")
+    # Claims ya verificados que se recuerdan por worker (LRU)
+    jwt_cache_max_entries: int = Field(alias="JWT_CACHE_MAX_ENTRIES", default=10000)
     port: int = Field(alias="PLAYLIST_PORT", default=8004)
     frontend_origins_raw: str = Field(alias="FRONTEND_ORIGINS", default="http://localhost:3000,http://localhost:5173")
     # URL base para acceder a archivos (covers/audio) desde otros servicios
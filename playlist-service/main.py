@@ -2,7 +2,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from handlers.playlist_handlers import router as playlist_router
-from middleware.auth_middleware import AuthMiddleware
+from middleware.auth_middleware import AuthMiddleware, token_cache
 import uvicorn
 from config import settings
 import logging
@@ -50,6 +50,11 @@ app.include_router(playlist_router, prefix="/playlists", tags=["playlists"])
 def health_check():
     return {"status": "ok", "service": "playlist-service"}
 
+
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return token_cache.stats()
+
 # Root endpoint
 @app.get("/")
 def root():
@@ -1,95 +1,123 @@
-# middleware/auth_middleware.py - VERSIÓN CORREGIDA
-from fastapi import Request, HTTPException
-from fastapi.security import HTTPBearer
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+# middleware/auth_middleware.py - VERSIÓN ASGI
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
 import logging
 from config import settings
+from middleware.token_cache import VerifiedTokenCache
 
 logger = logging.getLogger(__name__)
 
 # claims requeridos según tu auth-service en Go
 REQUIRED_CLAIMS = {"user_id", "username", "email", "role", "exp"}
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # ✅ PERMITIR OPTIONS requests sin autenticación (CORS preflight)
-        if request.method == "OPTIONS":
-            logger.debug("OPTIONS request - skipping auth")
-            return await call_next(request)
-        
-        # ✅ PERMITIR endpoints públicos sin autenticación
-        public_paths = [
-            "/health", 
-            "/", 
-            "/docs", 
-            "/redoc", 
-            "/openapi.json",
-            "/favicon.ico"
-        ]
-        
-        if any(request.url.path == path or request.url.path.startswith(path + '/') for path in public_paths):
-            logger.debug(f"Public path {request.url.path} - skipping auth")
-            return await call_next(request)
-
-        # ✅ INICIALIZAR request.state.user como None por defecto
-        if not hasattr(request.state, 'user'):
-            request.state.user = None
-
-        auth = HTTPBearer(auto_error=False)
-        credentials = await auth(request)
-        
-        if credentials is None:
-            logger.warning("Missing Authorization header")
-            raise HTTPException(status_code=401, detail="Falta header Authorization")
+# ✅ Endpoints públicos: la ruta exacta o cualquier subruta
+PUBLIC_PATHS = frozenset({
+    "/health",
+    "/",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/favicon.ico",
+})
+PUBLIC_PREFIXES = tuple(path + "/" for path in PUBLIC_PATHS if path != "/")
 
-        token = credentials.credentials
+token_cache = VerifiedTokenCache(max_entries=settings.jwt_cache_max_entries)
 
-        try:
-            logger.debug(f"Decoding token for path: {request.url.path}")
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm],
-                options={
-                    "verify_signature": True,
-                    "require": list(REQUIRED_CLAIMS),
-                },
-            )
-            
-            # ✅ VALIDAR claims requeridos
-            for claim in REQUIRED_CLAIMS:
-                if claim not in payload:
-                    logger.error(f"Missing required claim: {claim}")
-                    raise HTTPException(status_code=400, detail=f"Falta claim requerido: {claim}")
-                    
-            # ✅ ESTABLECER user en request.state
-            request.state.user = {
-                "user_id": payload["user_id"],
-                "username": payload["username"],
-                "email": payload["email"],
-                "role": payload["role"],
-            }
-            
-            logger.debug(f"Authenticated user: {request.state.user['username']} (ID: {request.state.user['user_id']})")
+_DECODE_OPTIONS = {"verify_signature": True, "require": list(REQUIRED_CLAIMS)}
+_ALGORITHMS = [settings.jwt_algorithm]
+
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+# ✅ Respuestas de error fijas: se construyen una vez y se reutilizan
+_MISSING_AUTH = _error(401, "Falta header Authorization")
+_EXPIRED = _error(401, "Token expirado")
+_BAD_SIGNATURE = _error(401, "Firma no válida")
+_INVALID_TOKEN = _error(401, "Token inválido")
+
+
+def is_public(path: str) -> bool:
+    return path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES)
+
+
+def bearer_token(scope: Scope) -> str | None:
+    """Token de `Authorization: Bearer <token>`, leído directamente del scope."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            return token
+    return None
 
+
+def authenticate(token: str) -> dict:
+    """Claims del usuario; lanza los errores de `jwt` si el token no es válido."""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = jwt.decode(
+        token, settings.jwt_secret, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS
+    )
+    user = {
+        "user_id": payload["user_id"],
+        "username": payload["username"],
+        "email": payload["email"],
+        "role": payload["role"],
+    }
+    token_cache.put(token, user, payload["exp"])
+    logger.debug("Authenticated user: %s (ID: %s)", user["username"], user["user_id"])
+    return user
+
+
+class AuthMiddleware:
+    """
+    Middleware ASGI puro: a diferencia de BaseHTTPMiddleware no crea tareas
+    ni envuelve el stream de la respuesta, y en el camino feliz no construye
+    ningún objeto. El usuario queda en `request.state.user`; los handlers
+    solo lo leen.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # ✅ PERMITIR OPTIONS (CORS preflight) y endpoints públicos sin autenticación
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or is_public(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        token = bearer_token(scope)
+        if token is None:
+            logger.warning("Missing Authorization header")
+            await _MISSING_AUTH(scope, receive, send)
+            return
+
+        try:
+            user = authenticate(token)
         except jwt.ExpiredSignatureError:
             logger.warning("Token expired")
-            raise HTTPException(status_code=401, detail="Token expirado")
+            response = _EXPIRED
         except jwt.InvalidSignatureError:
             logger.warning("Invalid token signature")
-            raise HTTPException(status_code=401, detail="Firma no válida")
+            response = _BAD_SIGNATURE
         except jwt.MissingRequiredClaimError as e:
-            logger.warning(f"Missing required claim: {e.claim}")
-            raise HTTPException(status_code=400, detail=f"Falta claim: {e.claim}")
+            logger.warning("Missing required claim: %s", e.claim)
+            response = _error(400, f"Falta claim: {e.claim}")
         except jwt.InvalidTokenError as e:
-            logger.warning(f"Invalid token: {str(e)}")
-            raise HTTPException(status_code=401, detail="Token inválido")
+            logger.warning("Invalid token: %s", e)
+            response = _INVALID_TOKEN
         except Exception as e:
-            logger.error(f"Unexpected auth error: {str(e)}")
-            raise HTTPException(status_code=401, detail=f"Error de autenticación: {str(e)}")
+            logger.error("Unexpected auth error: %s", e)
+            response = _error(401, f"Error de autenticación: {str(e)}")
+        else:
+            # ✅ ESTABLECER user en request.state y CONTINUAR con la solicitud
+            scope.setdefault("state", {})["user"] = user
+            await self.app(scope, receive, send)
+            return
 
-        # ✅ CONTINUAR con la solicitud
-        response = await call_next(request)
-        return response
\ No newline at end of file
+        await response(scope, receive, send)
@@ -8,10 +8,71 @@ class Settings(BaseSettings):
     db_url: str = Field(alias="db_url_py")
     jwt_secret: str = Field(alias="JWT_SECRET")
     jwt_algorithm: str = Field(alias="JWT_ALGORITHM", default="HS256")
+    # Claims ya verificados que se recuerdan por worker (LRU)
+    jwt_cache_max_entries: int = Field(alias="JWT_CACHE_MAX_ENTRIES", default=10000)
     port: int = Field(alias="SEARCH_PORT", default=8006)
 
     fronted_origins_raw: str = Field(alias="FRONTEND_ORIGINS", default="http://localhost:5173")
 
+    # Estrategia de búsqueda principal y estrategia candidata en modo sombra
+    search_strategy: str = Field(alias="SEARCH_STRATEGY", default="fuzzy")
+    search_fuzzy_threshold: int = Field(alias="SEARCH_FUZZY_THRESHOLD", default=70)
+    search_shadow_strategy: str | None = Field(alias="SEARCH_SHADOW_STRATEGY", default=None)
+    search_shadow_sample_rate: float = Field(
+        alias="SEARCH_SHADOW_SAMPLE_RATE", default=0.0, ge=0.0, le=1.0
+    )
+    search_shadow_max_in_flight: int = Field(alias="SEARCH_SHADOW_MAX_IN_FLIGHT", default=4)
+
+    # Índice invertido en memoria (estrategia "token")
+    search_index_refresh_seconds: int = Field(alias="SEARCH_INDEX_REFRESH_SECONDS", default=300)
+    search_index_max_df_ratio: float = Field(alias="SEARCH_INDEX_MAX_DF_RATIO", default=0.3)
+    # Presupuesto de memoria para postings; lo que no cabe va a disco
+    search_index_memory_budget_mb: float | None = Field(
+        alias="SEARCH_INDEX_MEMORY_BUDGET_MB", default=64
+    )
+    search_index_disk_dir: str | None = Field(alias="SEARCH_INDEX_DISK_DIR", default=None)
+    # Filas por lote al leer la instantánea para reconstruir el índice
+    search_index_batch_size: int = Field(alias="SEARCH_INDEX_BATCH_SIZE", default=1000)
+
+    # Eventos del catálogo (song/album created/updated) para mantener el índice al día
+    rabbitmq_url: str | None = Field(alias="RABBITMQ_URL", default=None)
+
+    # Cursores de paginación: ranking completo guardado por consulta
+    search_cursor_ttl_seconds: int = Field(alias="SEARCH_CURSOR_TTL_SECONDS", default=600)
+    search_cursor_max_entries: int = Field(alias="SEARCH_CURSOR_MAX_ENTRIES", default=5000)
+    search_cursor_max_results: int = Field(alias="SEARCH_CURSOR_MAX_RESULTS", default=200)
+    # Precargas de la página siguiente en curso a la vez (cada una abre su sesión)
+    search_prefetch_max_in_flight: int = Field(alias="SEARCH_PREFETCH_MAX_IN_FLIGHT", default=4)
+
+    # Fragmentos JSON por entidad ya codificados (se invalidan con eventos)
+    search_fragment_cache_ttl_seconds: int = Field(
+        alias="SEARCH_FRAGMENT_CACHE_TTL_SECONDS", default=600
+    )
+    search_fragment_cache_max_entries: int = Field(
+        alias="SEARCH_FRAGMENT_CACHE_MAX_ENTRIES", default=20000
+    )
+
+    # Personalización: ventaja para artistas seguidos (caché por usuario con TTL)
+    search_personalization_enabled: bool = Field(
+        alias="SEARCH_PERSONALIZATION_ENABLED", default=False
+    )
+    search_personalization_boost: float = Field(
+        alias="SEARCH_PERSONALIZATION_BOOST", default=2.0, ge=1.0
+    )
+    search_follow_cache_ttl_seconds: int = Field(
+        alias="SEARCH_FOLLOW_CACHE_TTL_SECONDS", default=300
+    )
+    search_follow_cache_max_users: int = Field(
+        alias="SEARCH_FOLLOW_CACHE_MAX_USERS", default=10000
+    )
+    # Canciones/álbumes por artista seguido, cuando no hay índice de tokens
+    search_ownership_cache_ttl_seconds: int = Field(
+        alias="SEARCH_OWNERSHIP_CACHE_TTL_SECONDS", default=600
+    )
+    search_ownership_cache_max_artists: int = Field(
+        alias="SEARCH_OWNERSHIP_CACHE_MAX_ARTISTS", default=5000
+    )
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -44,4 +105,9 @@ print(f"🔧 Config loaded:")
 print(f"   JWT Secret: {settings.jwt_secret}")
 print(f"   JWT Algorithm: {settings.jwt_algorithm}")
 print(f"   Port: {settings.port}")
-print(f"   Frontend Origins: {settings.frontend_origins}")
\ No newline at end of file
+print(f"   Frontend Origins: {settings.frontend_origins}")
+print(f"   Search Strategy: {settings.search_strategy}")
+print(
+    f"   Shadow Strategy: {settings.search_shadow_strategy} "
+    f"(sample rate {settings.search_shadow_sample_rate})"
+)
\ No newline at end of file
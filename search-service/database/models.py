@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, JSON, Table
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, JSON, Table
 from sqlalchemy.orm import relationship
 from database.connection import Base
 
@@ -64,13 +64,21 @@ class Album(Base):
     songs = relationship("Song", back_populates="album")
 
 
+class Genre(Base):
+    __tablename__ = "genres"
+    __table_args__ = {"schema": "music_streaming"}
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False, unique=True)
+
+
 class Song(Base):
     __tablename__ = "songs"
     __table_args__ = {"schema": "music_streaming"}
 
     id = Column(Integer, primary_key=True, index=True)
     album_id = Column(Integer, ForeignKey("music_streaming.albums.id"), nullable=False)
-    genre_id = Column(Integer, nullable=False)
+    genre_id = Column(Integer, ForeignKey("music_streaming.genres.id"), nullable=False)
     title = Column(String, nullable=False)
     duration = Column(Integer)
     audio_url = Column(Text, nullable=False)
@@ -80,3 +88,18 @@ class Song(Base):
 
     album = relationship("Album", back_populates="songs")
     artists = relationship("Artist", secondary=song_artists, back_populates="songs")
+
+
+class ArtistSubscription(Base):
+    """Artistas que sigue cada usuario (tabla de subscription-service)."""
+
+    __tablename__ = "artist_subscriptions"
+    __table_args__ = {"schema": "music_streaming"}
+
+    user_id = Column(
+        Integer, ForeignKey("music_streaming.users.id"), primary_key=True, nullable=False
+    )
+    artist_id = Column(
+        Integer, ForeignKey("music_streaming.artists.id"), primary_key=True, nullable=False
+    )
+    created_at = Column(DateTime)
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import socket
+import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractIncomingMessage
+from indexing.manager import index_manager
+from services.fragment_cache import fragment_cache
+from services.ownership_cache import ownership_cache
+from config import settings
+
+# Exchanges fanout publicados por content-service -> tipo de entidad que cambia.
+# No hay eventos de borrado de canciones/álbumes, y artist_created/deleted son
+# colas punto a punto que ya consume content-service: borrados y cambios de
+# nombre de artistas solo llegan al índice con la siguiente reconstrucción
+# (`search_index_refresh_seconds`).
+CATALOG_QUEUES = {
+    "song_created": "song",
+    "song_updated": "song",
+    "album_created": "album",
+    "album_updated": "album",
+}
+
+# Reconstrucción pedida por /admin/reindex: la hacen todos los workers
+REINDEX_EXCHANGE = "search_reindex"
+
+# Canal del consumer de este worker (para difundir reindexaciones)
+_channel: AbstractChannel | None = None
+
+
+def worker_queue_name(exchange_name: str) -> str:
+    """
+    Cola propia de este proceso. Cada worker (y cada réplica) tiene su
+    índice y su caché de fragmentos en memoria, así que necesita recibir
+    todos los eventos: una cola compartida los repartiría entre workers.
+    """
+    return f"search.{exchange_name}.{socket.gethostname()}.{os.getpid()}"
+
+
+def invalidate_ownership(kind: str, entity_id: int, data: dict) -> None:
+    """Descarta de la caché de personalización a los artistas afectados."""
+    artist_ids = [int(a) for a in data.get("artist_ids") or []]
+    if data.get("artist_id"):
+        artist_ids.append(int(data["artist_id"]))
+    ownership_cache.invalidate(f"{kind}s", entity_id, artist_ids)
+    if kind == "song" and data.get("album_id"):
+        # Una canción nueva es también del artista de su álbum
+        ownership_cache.invalidate("albums", int(data["album_id"]))
+
+
+def make_handler(queue_name: str):
+    kind = CATALOG_QUEUES[queue_name]
+
+    async def handle_catalog_event(message: AbstractIncomingMessage) -> None:
+        """Recarga la entidad del evento en el índice de búsqueda."""
+        async with message.process():
+            try:
+                data = json.loads(message.body.decode())
+                entity_id = data.get("id")
+
+                if not entity_id:
+                    print(f"[!] Evento {queue_name} inválido: falta id")
+                    return
+
+                # El fragmento JSON se descarta ya; el índice recarga la entidad
+                fragment_cache.invalidate(f"{kind}s", int(entity_id))
+                invalidate_ownership(kind, int(entity_id), data)
+                await index_manager.apply_event(kind, int(entity_id))
+
+            except json.JSONDecodeError:
+                print("[!] Error: mensaje inválido (no es JSON)")
+            except Exception as e:
+                print(f"[!] Error procesando evento {queue_name}: {e}")
+
+    return handle_catalog_event
+
+
+async def handle_reindex(message: AbstractIncomingMessage) -> None:
+    """Reconstruye el índice de este worker en segundo plano."""
+    async with message.process():
+        index_manager.schedule_rebuild()
+        print("[*] Reconstrucción del índice pedida por /admin/reindex")
+
+
+async def _subscribe(channel: AbstractChannel, exchange_name: str, handler) -> None:
+    """Cola exclusiva de este worker enlazada al exchange fanout."""
+    exchange = await channel.declare_exchange(
+        exchange_name, aio_pika.ExchangeType.FANOUT, durable=True
+    )
+    queue = await channel.declare_queue(
+        worker_queue_name(exchange_name), exclusive=True, auto_delete=True
+    )
+    await queue.bind(exchange)
+    await queue.consume(handler)
+
+
+async def broadcast_reindex() -> bool:
+    """Pide la reconstrucción a todos los workers. False si no hay RabbitMQ."""
+    if _channel is None or _channel.is_closed:
+        return False
+    exchange = await _channel.get_exchange(REINDEX_EXCHANGE, ensure=False)
+    await exchange.publish(aio_pika.Message(body=b"{}"), routing_key="")
+    return True
+
+
+def on_reconnect(*_) -> None:
+    """
+    La cola de este worker es exclusiva: mientras estuvo desconectado no
+    existía y los eventos de ese intervalo se perdieron. Las cachés y el
+    índice pueden estar desfasados: se descartan y se reconstruyen.
+    """
+    fragment_cache.clear()
+    ownership_cache.clear()
+    index_manager.schedule_rebuild()
+    print("[!] Reconectado a RabbitMQ: cachés vaciadas y reindexación en curso")
+
+
+async def consume_events():
+    """Suscripción de este worker a los eventos del catálogo"""
+    global _channel
+    connection = await aio_pika.connect_robust(settings.rabbitmq_url)
+    connection.reconnect_callbacks.add(on_reconnect)
+    channel = await connection.channel()
+    await channel.set_qos(prefetch_count=32)
+    for queue_name in CATALOG_QUEUES:
+        await _subscribe(channel, queue_name, make_handler(queue_name))
+    await _subscribe(channel, REINDEX_EXCHANGE, handle_reindex)
+    _channel = channel
+    print(f"[*] Esperando eventos del catálogo: {', '.join(CATALOG_QUEUES)}...")
+    return connection
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    connection = loop.run_until_complete(consume_events())
+    try:
+        loop.run_forever()
+    finally:
+        loop.run_until_complete(connection.close())
@@ -1,25 +1,75 @@
-from fastapi import APIRouter, Depends, Query
+from functools import lru_cache
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.search_service import SearchService
-from strategies.fuzzy_strategy import FuzzySearchStrategy
+from services.shadow import ShadowEvaluator
+from services.cursor_store import CursorStore
+from services.follow_cache import FollowCache
+from services.personalization import Personalizer
+from services.metrics import metrics
+from strategies.registry import get_strategy
+from indexing.manager import index_manager
 from database.connection import get_db  # Tu función que devuelve AsyncSession
+from config import settings
 
 router = APIRouter()
 
 
+@lru_cache
+def get_search_service() -> SearchService:
+    """Construye una sola vez el servicio con la estrategia configurada."""
+    shadow = None
+    if settings.search_shadow_strategy and settings.search_shadow_sample_rate > 0:
+        shadow = ShadowEvaluator(
+            name=settings.search_shadow_strategy,
+            strategy=get_strategy(settings.search_shadow_strategy),
+            sample_rate=settings.search_shadow_sample_rate,
+            max_in_flight=settings.search_shadow_max_in_flight,
+        )
+    cursors = CursorStore(
+        ttl_seconds=settings.search_cursor_ttl_seconds,
+        max_entries=settings.search_cursor_max_entries,
+    )
+    personalizer = None
+    if settings.search_personalization_enabled:
+        personalizer = Personalizer(
+            FollowCache(
+                ttl_seconds=settings.search_follow_cache_ttl_seconds,
+                max_users=settings.search_follow_cache_max_users,
+            ),
+            boost=settings.search_personalization_boost,
+        )
+    return SearchService(
+        get_strategy(settings.search_strategy),
+        shadow=shadow,
+        structured=get_strategy("token"),
+        cursors=cursors,
+        personalizer=personalizer,
+        max_results=settings.search_cursor_max_results,
+        max_prefetches=settings.search_prefetch_max_in_flight,
+    )
+
+
 @router.get("/")
 async def search(
-    q: str = Query(..., description="Texto a buscar"),
+    request: Request,
+    q: str = Query(
+        ...,
+        description=(
+            'Texto a buscar. Admite artist:, album:, genre:, year:2020..2023 '
+            'y frases entre comillas ("love of my life")'
+        ),
+    ),
     song_page: int = Query(1, ge=1, description="Página de canciones"),
     album_page: int = Query(1, ge=1, description="Página de álbumes"),
     artist_page: int = Query(1, ge=1, description="Página de artistas"),
     limit: int = Query(5, ge=1, le=50, description="Número de resultados por página"),
+    cursor: str | None = Query(None, description="Cursor devuelto por la primera página"),
+    prefetch: bool = Query(False, description="Precargar ya la página siguiente"),
     db: AsyncSession = Depends(get_db),
+    service: SearchService = Depends(get_search_service),
 ):
     try:
-        strategy = FuzzySearchStrategy(threshold=70)
-        service = SearchService(strategy)
-
         offset_songs = (song_page - 1) * limit
         offset_albums = (album_page - 1) * limit
         offset_artists = (artist_page - 1) * limit
@@ -32,12 +82,71 @@ async def search(
             offset_songs=offset_songs,
             offset_albums=offset_albums,
             offset_artists=offset_artists,
+            cursor=cursor,
+            prefetch=prefetch,
+            user_id=(getattr(request.state, "user", None) or {}).get("user_id"),
         )
 
-        return result
-        
+        # El cuerpo ya viene codificado (fragmentos JSON concatenados)
+        return Response(content=result, media_type="application/json")
+
     except Exception as e:
         print(f"❌ Error en endpoint de búsqueda: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+
+@router.get("/top")
+async def search_top(
+    q: str = Query(..., description="Texto a buscar"),
+    limit: int = Query(10, ge=1, le=50, description="Número de resultados"),
+    db: AsyncSession = Depends(get_db),
+    service: SearchService = Depends(get_search_service),
+):
+    """Ranking único de canciones, álbumes y artistas en una sola llamada."""
+    try:
+        result = await service.search_top(session=db, query=q, limit=limit)
+        return Response(content=result, media_type="application/json")
+    except Exception as e:
+        print(f"❌ Error en endpoint de búsqueda unificada: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno del servidor: {str(e)}")
+
+
+@router.get("/metrics")
+async def search_metrics():
+    """Métricas en memoria de este worker (latencias y evaluación en sombra)."""
+    return metrics.snapshot()
+
+
+def require_admin(request: Request) -> dict:
+    user = getattr(request.state, "user", None)
+    if not user or user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Se requiere rol admin")
+    return user
+
+
+@router.post("/admin/reindex", status_code=202)
+async def reindex(_: dict = Depends(require_admin)):
+    """
+    Reconstruye el índice de tokens en segundo plano (azul/verde) y lo
+    intercambia al terminar; mientras tanto se sigue sirviendo el anterior.
+    La petición se difunde por RabbitMQ a todos los workers; sin RabbitMQ
+    solo se reconstruye el de este worker.
+    """
+    broadcast = False
+    try:
+        from events.consumer import broadcast_reindex
+
+        broadcast = await broadcast_reindex()
+    except Exception as e:
+        print(f"[!] No se pudo difundir la reindexación: {e}")
+    if not broadcast:
+        index_manager.schedule_rebuild()
+    return {"scheduled": True, "broadcast": broadcast, **index_manager.status()}
+
+
+@router.get("/admin/reindex")
+async def reindex_status(_: dict = Depends(require_admin)):
+    """Estado del índice de tokens y de la última reconstrucción."""
+    return index_manager.status()
@@ -0,0 +1,191 @@
+# indexing/manager.py
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from indexing.token_index import CatalogIndex
+from repositories.catalog_repository import CatalogRepository
+from database.connection import engine, AsyncSessionLocal
+from config import settings
+
+
+class IndexManager:
+    """
+    Mantiene el CatalogIndex del proceso con un esquema azul/verde.
+
+    La primera consulta espera a la construcción inicial. A partir de ahí,
+    las reconstrucciones (por antigüedad o a petición) corren en segundo
+    plano sobre una instantánea consistente de la base de datos mientras las
+    consultas siguen usando el índice anterior. Los eventos del catálogo que
+    llegan durante la construcción se aplican al índice vivo y se guardan
+    para reproducirlos sobre el nuevo antes de intercambiarlos.
+    """
+
+    # Instantánea consistente y de solo lectura para toda la construcción
+    SNAPSHOT_OPTIONS = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+
+    def __init__(
+        self,
+        refresh_seconds: int,
+        max_df_ratio: float,
+        memory_budget_bytes: int | None = None,
+        disk_dir: str | None = None,
+        batch_size: int = 1000,
+        db_engine: AsyncEngine = engine,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.refresh_seconds = refresh_seconds
+        self.max_df_ratio = max_df_ratio
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_dir = disk_dir
+        self.batch_size = batch_size
+        self.db_engine = db_engine
+        self.session_factory = session_factory
+        self._index: CatalogIndex | None = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rebuild_task: asyncio.Task | None = None
+        # Eventos recibidos durante una construcción (None si no hay ninguna)
+        self._pending: list[tuple[str, int]] | None = None
+        self.last_build: dict = {}
+
+    def _is_stale(self) -> bool:
+        return self._index is None or time.monotonic() - self._built_at > self.refresh_seconds
+
+    @property
+    def is_building(self) -> bool:
+        return self._pending is not None
+
+    async def _build_from_snapshot(self) -> CatalogIndex:
+        index = CatalogIndex(max_df_ratio=self.max_df_ratio)
+        async with self.db_engine.connect() as conn:
+            conn = await conn.execution_options(**self.SNAPSHOT_OPTIONS)
+            async with conn.begin(), AsyncSession(bind=conn) as session:
+                catalog = CatalogRepository(session)
+                batches = {
+                    "songs": catalog.iter_song_documents(self.batch_size),
+                    "albums": catalog.iter_album_documents(self.batch_size),
+                    "artists": catalog.iter_artist_documents(self.batch_size),
+                }
+                for kind, documents in batches.items():
+                    async for batch in documents:
+                        # La tokenización va en un hilo para no bloquear el event loop
+                        await asyncio.to_thread(index[kind].add_documents, batch)
+
+        await asyncio.to_thread(index.finalize, self.memory_budget_bytes, self.disk_dir)
+        return index
+
+    async def _apply(
+        self, index: CatalogIndex, session: AsyncSession, kind: str, entity_id: int
+    ) -> None:
+        """Recarga una entidad de la base de datos y la actualiza en `index`."""
+        catalog = CatalogRepository(session)
+        if kind == "song":
+            documents = await catalog.get_song_documents(song_ids=[entity_id])
+            if not documents:
+                index["songs"].remove(entity_id)
+            for document in documents:
+                index["songs"].upsert(*document)
+        elif kind == "album":
+            documents = await catalog.get_album_documents([entity_id])
+            if not documents:
+                index["albums"].remove(entity_id)
+            for document in documents:
+                index["albums"].upsert(*document)
+            # Las canciones llevan título y año del álbum como campos
+            for document in await catalog.get_song_documents(album_id=entity_id):
+                index["songs"].upsert(*document)
+
+    async def apply_event(self, kind: str, entity_id: int) -> None:
+        """Aplica un cambio del catálogo ("song" o "album") al índice vivo."""
+        if self._pending is not None:
+            self._pending.append((kind, entity_id))
+        if self._index is None:
+            return
+        async with self.session_factory() as session:
+            await self._apply(self._index, session, kind, entity_id)
+
+    async def rebuild(self) -> dict:
+        """Construye un índice nuevo y lo intercambia por el vivo de forma atómica."""
+        async with self._lock:
+            return await self._rebuild_locked()
+
+    async def _rebuild_locked(self) -> dict:
+        self._pending = []
+        start = time.perf_counter()
+        replayed = 0
+        try:
+            index = await self._build_from_snapshot()
+
+            # Reproducir lo que llegó mientras se leía la instantánea. No hay
+            # ningún await entre vaciar la cola y el intercambio.
+            async with self.session_factory() as session:
+                while self._pending:
+                    events, self._pending = list(dict.fromkeys(self._pending)), []
+                    for kind, entity_id in events:
+                        await self._apply(index, session, kind, entity_id)
+                    replayed += len(events)
+
+                self._index = index
+                self._built_at = time.monotonic()
+        finally:
+            self._pending = None
+
+        self.last_build = {
+            "finished_at": time.time(),
+            "seconds": round(time.perf_counter() - start, 3),
+            "replayed_events": replayed,
+            "stats": index.stats(),
+        }
+        print(f"🗂️ Índice de tokens construido: {self.last_build}")
+        return self.last_build
+
+    def schedule_rebuild(self) -> asyncio.Task:
+        """Lanza una reconstrucción en segundo plano (o devuelve la que ya corre)."""
+        if self._rebuild_task is None or self._rebuild_task.done():
+            self._rebuild_task = asyncio.create_task(self._rebuild_in_background())
+        return self._rebuild_task
+
+    async def _rebuild_in_background(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception as e:
+            # El índice anterior sigue sirviendo; se reintentará al caducar
+            self._built_at = time.monotonic()
+            print(f"❌ Error reconstruyendo el índice de tokens: {e}")
+
+    async def get_index(self) -> CatalogIndex:
+        if self._index is None:
+            async with self._lock:
+                if self._index is None:
+                    await self._rebuild_locked()
+        elif self._is_stale():
+            self.schedule_rebuild()
+        return self._index
+
+    def current_index(self) -> CatalogIndex | None:
+        """El índice vivo si ya existe; nunca provoca ni espera la construcción inicial."""
+        if self._index is not None and self._is_stale():
+            self.schedule_rebuild()
+        return self._index
+
+    def status(self) -> dict:
+        return {
+            "ready": self._index is not None,
+            "building": self.is_building,
+            "pending_events": len(self._pending or ()),
+            "last_build": self.last_build,
+            "stats": self._index.stats() if self._index is not None else None,
+        }
+
+
+index_manager = IndexManager(
+    refresh_seconds=settings.search_index_refresh_seconds,
+    max_df_ratio=settings.search_index_max_df_ratio,
+    memory_budget_bytes=(
+        int(settings.search_index_memory_budget_mb * 1024 * 1024)
+        if settings.search_index_memory_budget_mb is not None
+        else None
+    ),
+    disk_dir=settings.search_index_disk_dir or None,
+    batch_size=settings.search_index_batch_size,
+)
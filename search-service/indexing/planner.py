@@ -0,0 +1,217 @@
+# indexing/planner.py
+import math
+from typing import Iterable, List, Mapping, Tuple
+from indexing.query_parser import ParsedQuery
+from indexing.token_index import TokenIndex, field_term
+from indexing.tokenizer import tokenize, words
+
+
+class Predicate:
+    """
+    Condición sobre un `TokenIndex`. `cost` estima (en bytes de postings) lo
+    caro que es evaluarla; `candidates` devuelve los ids que la cumplen, o
+    None si solo puede comprobarse documento a documento con `verify` sobre
+    el texto del documento.
+    """
+
+    def cost(self, index: TokenIndex) -> float:
+        raise NotImplementedError
+
+    def candidates(self, index: TokenIndex) -> set[int] | None:
+        raise NotImplementedError
+
+    def verify(self, text: str) -> bool:
+        return True
+
+
+class TermPredicate(Predicate):
+    """El documento contiene el término (o algún término con ese prefijo)."""
+
+    def __init__(self, term: str, prefix: bool = False):
+        self.term = term
+        self.prefix = prefix
+
+    def _terms(self, index: TokenIndex) -> List[str]:
+        return index.prefix_terms(self.term) if self.prefix else [self.term]
+
+    def cost(self, index: TokenIndex) -> float:
+        return sum(index.posting_size(term) for term in self._terms(index))
+
+    def candidates(self, index: TokenIndex) -> set[int]:
+        return index.union_postings(self._terms(index))
+
+    def __repr__(self) -> str:
+        return f"Term({self.term!r}{'*' if self.prefix else ''})"
+
+
+class YearPredicate(Predicate):
+    """Año de publicación dentro de [low, high] (extremos opcionales)."""
+
+    def __init__(self, low: int | None, high: int | None):
+        self.low = low
+        self.high = high
+
+    def _terms(self, index: TokenIndex) -> List[str]:
+        prefix = field_term("year", "")
+        matched = []
+        # Hay pocos años distintos: se recorren todos sin el tope de prefijos
+        for term in index.prefix_terms(prefix, limit=index.term_count):
+            year = int(term[len(prefix):])
+            if (self.low is None or year >= self.low) and (self.high is None or year <= self.high):
+                matched.append(term)
+        return matched
+
+    def cost(self, index: TokenIndex) -> float:
+        return sum(index.posting_size(term) for term in self._terms(index))
+
+    def candidates(self, index: TokenIndex) -> set[int]:
+        return index.union_postings(self._terms(index))
+
+    def __repr__(self) -> str:
+        return f"Year({self.low}..{self.high})"
+
+
+class PhrasePredicate(Predicate):
+    """
+    Frase exacta: los candidatos salen de intersectar las postings de sus
+    tokens y luego se comprueba la adyacencia sobre el texto del documento,
+    que el índice no guarda: lo carga quien ejecuta el plan.
+    """
+
+    def __init__(self, phrase: str):
+        self.phrase = phrase
+        self.tokens = list(dict.fromkeys(tokenize(phrase)))
+        self.needle = f" {' '.join(words(phrase))} "
+
+    def _useful(self, index: TokenIndex) -> List[str]:
+        return [t for t in self.tokens if t not in index.skipped_terms]
+
+    def cost(self, index: TokenIndex) -> float:
+        useful = self._useful(index)
+        if not useful:
+            return math.inf
+        return min(index.posting_size(token) for token in useful)
+
+    def candidates(self, index: TokenIndex) -> set[int] | None:
+        useful = self._useful(index)
+        if not useful:
+            return None
+        return index.intersect_postings([token] for token in useful)
+
+    def verify(self, text: str) -> bool:
+        return self.needle in f" {' '.join(words(text))} "
+
+    def __repr__(self) -> str:
+        return f"Phrase({self.phrase!r})"
+
+
+class NoMatchPredicate(Predicate):
+    """Ningún documento la cumple: filtro sobre un campo que este tipo no tiene."""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def cost(self, index: TokenIndex) -> float:
+        return 0
+
+    def candidates(self, index: TokenIndex) -> set[int]:
+        return set()
+
+    def __repr__(self) -> str:
+        return f"NoMatch({self.field})"
+
+
+def build_predicates(index: TokenIndex, parsed: ParsedQuery) -> List[Predicate]:
+    # Un filtro sobre un campo que este tipo no tiene (`genre:` en álbumes o
+    # artistas, `year:` en artistas) no puede cumplirse: ignorarlo ampliaría
+    # los resultados (`genre:rock year:1975` daría todos los álbumes de 1975)
+    for field_filter in parsed.filters:
+        if field_filter.field not in index.fields:
+            return [NoMatchPredicate(field_filter.field)]
+    if parsed.year_range is not None and "year" not in index.fields:
+        return [NoMatchPredicate("year")]
+
+    predicates: List[Predicate] = []
+
+    free = [t for t in dict.fromkeys(tokenize(parsed.free_text)) if t not in index.skipped_terms]
+    for i, token in enumerate(free):
+        is_last = i == len(free) - 1
+        predicates.append(TermPredicate(token, prefix=is_last and len(token) >= 2))
+
+    for field_filter in parsed.filters:
+        tokens = list(dict.fromkeys(tokenize(field_filter.value)))
+        for i, token in enumerate(tokens):
+            is_last = i == len(tokens) - 1
+            predicates.append(
+                TermPredicate(
+                    field_term(field_filter.field, token),
+                    prefix=is_last and not field_filter.exact,
+                )
+            )
+
+    if parsed.year_range is not None:
+        predicates.append(YearPredicate(*parsed.year_range))
+
+    predicates.extend(PhrasePredicate(phrase) for phrase in parsed.phrases)
+    return predicates
+
+
+def plan(index: TokenIndex, parsed: ParsedQuery) -> List[Predicate]:
+    """Predicados ordenados del más selectivo (postings más pequeñas) al menos."""
+    return sorted(build_predicates(index, parsed), key=lambda p: p.cost(index))
+
+
+def plan_cost(index: TokenIndex, predicates: List[Predicate]) -> float:
+    """Bytes de postings que como mucho decodificaría `match`."""
+    costs = (p.cost(index) for p in predicates)
+    return sum(cost for cost in costs if cost != math.inf)
+
+
+def match(index: TokenIndex, predicates: List[Predicate]) -> set[int] | None:
+    """
+    Intersecta los candidatos del plan, empezando por el predicado más
+    selectivo y cortando en cuanto la intersección se vacía. None si ningún
+    predicado da candidatos (solo frases de términos omnipresentes).
+    """
+    matched: set[int] | None = None
+    for predicate in predicates:
+        candidates = predicate.candidates(index)
+        if candidates is None:
+            continue
+        matched = candidates if matched is None else matched & candidates
+        if not matched:
+            return set()
+    return matched
+
+
+def phrase_verifiers(predicates: List[Predicate]) -> List[PhrasePredicate]:
+    return [p for p in predicates if isinstance(p, PhrasePredicate)]
+
+
+def verify(verifiers: List[PhrasePredicate], texts: Mapping[int, str]) -> set[int]:
+    """Ids cuyo texto (cargado solo para los candidatos) contiene todas las frases."""
+    return {
+        doc_id for doc_id, text in texts.items() if all(p.verify(text) for p in verifiers)
+    }
+
+
+def score(
+    index: TokenIndex, parsed: ParsedQuery, matched: Iterable[int], top_k: int
+) -> List[Tuple[int, float]]:
+    """
+    Misma puntuación que `TokenIndex.search`: fracción del documento
+    cubierta por el texto libre y las frases de la consulta.
+    """
+    query_tokens = set(tokenize(parsed.free_text))
+    for phrase in parsed.phrases:
+        query_tokens.update(tokenize(phrase))
+    n_query = len(query_tokens)
+
+    scored = [
+        (doc_id, n_query / max(index.docs[doc_id].length, n_query) if n_query else 1.0)
+        for doc_id in matched
+        if doc_id in index.docs
+    ]
+    # Empates: ids más bajos (más antiguos) primero, para un orden estable
+    scored.sort(key=lambda hit: (-hit[1], hit[0]))
+    return scored[:top_k]
@@ -0,0 +1,88 @@
+# indexing/postings.py
+import mmap
+import os
+import tempfile
+import weakref
+from array import array
+from typing import Iterable
+
+
+def encode_postings(doc_ids: Iterable[int]) -> bytes:
+    """
+    Codifica ids ordenados de forma ascendente como deltas en varint
+    (7 bits por byte, bit alto = continúa). Una posting de ids cercanos
+    ocupa ~1 byte por documento en lugar de los ~36 de un int en un set.
+    """
+    out = bytearray()
+    prev = 0
+    for doc_id in doc_ids:
+        delta = doc_id - prev
+        prev = doc_id
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(data: bytes | memoryview) -> array:
+    """Inverso de `encode_postings`: devuelve los ids como array('q')."""
+    ids = array("q")
+    value = shift = prev = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            prev += value
+            ids.append(prev)
+            value = shift = 0
+    return ids
+
+
+def _remove_file(mm: mmap.mmap, path: str) -> None:
+    try:
+        mm.close()
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+class DiskTier:
+    """
+    Postings poco frecuentes volcadas a un fichero y leídas vía mmap.
+
+    El fichero es privado del índice: se borra cuando el índice se descarta
+    (por ejemplo, al reemplazarlo por uno reconstruido).
+    """
+
+    def __init__(self, blobs: dict[str, bytes], directory: str | None = None):
+        self.offsets: dict[str, tuple[int, int]] = {}
+        self.size = 0
+        self._mm: mmap.mmap | None = None
+        if not blobs:
+            return
+
+        fd, path = tempfile.mkstemp(prefix="search-postings-", suffix=".bin", dir=directory)
+        with os.fdopen(fd, "wb") as fh:
+            for term, blob in blobs.items():
+                self.offsets[term] = (self.size, len(blob))
+                fh.write(blob)
+                self.size += len(blob)
+
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        weakref.finalize(self, _remove_file, self._mm, path)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.offsets
+
+    def get(self, term: str) -> bytes | None:
+        location = self.offsets.get(term)
+        if location is None or self._mm is None:
+            return None
+        offset, length = location
+        # Copia pequeña: así ninguna vista impide cerrar el mmap después
+        return self._mm[offset : offset + length]
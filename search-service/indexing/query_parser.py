@@ -0,0 +1,90 @@
+# indexing/query_parser.py
+import re
+from typing import List, Tuple
+
+# Campos admitidos en la consulta: `artist:queen album:"night at" genre:rock year:1975..1980`
+FIELDS = ("artist", "album", "genre", "year")
+
+# Alias en español para los mismos campos
+_FIELD_ALIASES = {"artista": "artist", "album": "album", "genero": "genre", "anio": "year"}
+
+_CLAUSE_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+_YEAR_RE = re.compile(r"^(\d{4})?(?:(\.\.)(\d{4})?)?$")
+
+
+class FieldFilter:
+    """Filtro `campo:valor`; `exact` si el valor iba entre comillas (sin prefijo)."""
+
+    __slots__ = ("field", "value", "exact")
+
+    def __init__(self, field: str, value: str, exact: bool):
+        self.field = field
+        self.value = value
+        self.exact = exact
+
+
+class ParsedQuery:
+    """Consulta descompuesta en texto libre, frases exactas y filtros por campo."""
+
+    __slots__ = ("text", "phrases", "filters", "year_range")
+
+    def __init__(self):
+        self.text: List[str] = []
+        self.phrases: List[str] = []
+        self.filters: List[FieldFilter] = []
+        self.year_range: Tuple[int | None, int | None] | None = None
+
+    @property
+    def free_text(self) -> str:
+        return " ".join(self.text)
+
+    @property
+    def is_structured(self) -> bool:
+        """True si usa algo más que texto libre (campos o frases)."""
+        return bool(self.phrases or self.filters or self.year_range)
+
+
+def _parse_year(value: str) -> Tuple[int | None, int | None] | None:
+    """`2020`, `2020..2023`, `2020..` o `..2023`; None si no es un año válido."""
+    match = _YEAR_RE.match(value)
+    if not match or value in ("", ".."):
+        return None
+    start, is_range, end = match.groups()
+    low = int(start) if start else None
+    high = int(end) if end else None
+    if not is_range:
+        high = low
+    if low is not None and high is not None and low > high:
+        low, high = high, low
+    return low, high
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Descompone la consulta. Los campos desconocidos y los valores inválidos
+    (p. ej. `year:abc`) se tratan como texto libre, de modo que cualquier
+    consulta antigua sigue funcionando igual.
+    """
+    parsed = ParsedQuery()
+    for match in _CLAUSE_RE.finditer(query or ""):
+        raw_field, quoted, bare = match.groups()
+        field = _FIELD_ALIASES.get((raw_field or "").lower(), (raw_field or "").lower())
+        value = quoted if quoted is not None else bare
+
+        if raw_field and field in FIELDS and value:
+            if field == "year":
+                year_range = _parse_year(value)
+                if year_range is not None:
+                    parsed.year_range = year_range
+                    continue
+            else:
+                parsed.filters.append(FieldFilter(field, value, exact=quoted is not None))
+                continue
+
+        if raw_field is None and quoted is not None:
+            if quoted.strip():
+                parsed.phrases.append(quoted)
+            continue
+
+        parsed.text.append(match.group(0))
+    return parsed
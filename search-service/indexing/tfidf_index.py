@@ -0,0 +1,126 @@
+# indexing/tfidf_index.py
+import math
+from typing import Iterable, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from indexing.tokenizer import normalize_text
+
+
+class CharNgramTfidfIndex:
+    """
+    Índice TF-IDF de n-gramas de caracteres sobre una colección (id, texto).
+
+    Cada documento es una fila de una matriz CSR normalizada (L2), de modo que
+    el producto matriz-vector con la consulta devuelve directamente la
+    similitud coseno contra todo el catálogo.
+    """
+
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 3)):
+        self.ngram_range = ngram_range
+        self.vocabulary: dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.matrix = csr_matrix((0, 0), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return int(self.ids.shape[0])
+
+    def _ngrams(self, text: str) -> List[str]:
+        padded = f" {normalize_text(text)} "
+        low, high = self.ngram_range
+        grams = []
+        for n in range(low, high + 1):
+            grams.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+        return grams
+
+    def fit(self, documents: Iterable[Tuple[int, str]]) -> "CharNgramTfidfIndex":
+        vocabulary: dict[str, int] = {}
+        ids: List[int] = []
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        counts: List[float] = []
+
+        for doc_id, text in documents:
+            if not text:
+                continue
+            row: dict[int, int] = {}
+            for gram in self._ngrams(text):
+                col = vocabulary.setdefault(gram, len(vocabulary))
+                row[col] = row.get(col, 0) + 1
+            ids.append(doc_id)
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+
+        n_docs, n_terms = len(ids), len(vocabulary)
+        indices_arr = np.asarray(indices, dtype=np.int32)
+
+        # idf suavizado (igual que sklearn) y tf sublineal
+        df = np.bincount(indices_arr, minlength=n_terms).astype(np.float32)
+        idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+        data = (1.0 + np.log(np.asarray(counts, dtype=np.float32))) * idf[indices_arr]
+
+        matrix = csr_matrix(
+            (data, indices_arr, np.asarray(indptr, dtype=np.int64)),
+            shape=(n_docs, n_terms),
+            dtype=np.float32,
+        )
+
+        # Normalización L2 por fila
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.matrix = matrix
+        return self
+
+    def _query_vector(self, text: str) -> np.ndarray | None:
+        counts: dict[int, int] = {}
+        for gram in self._ngrams(text):
+            col = self.vocabulary.get(gram)
+            if col is not None:
+                counts[col] = counts.get(col, 0) + 1
+        if not counts:
+            return None
+
+        cols = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        weights = (1.0 + np.log(tf)) * self.idf[cols]
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        if norm == 0:
+            return None
+
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vector[cols] = weights / norm
+        return vector
+
+    def search(
+        self, text: str, top_k: int, min_score: float = 0.0
+    ) -> List[Tuple[int, float]]:
+        """Devuelve los top_k (id, score) ordenados por similitud descendente."""
+        if top_k <= 0 or len(self) == 0:
+            return []
+        vector = self._query_vector(text)
+        if vector is None:
+            return []
+
+        scores = self.matrix @ vector
+        k = min(top_k, scores.shape[0])
+        if k < scores.shape[0]:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.shape[0])
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        results = []
+        for row in candidates:
+            score = float(scores[row])
+            if score < min_score or math.isclose(score, 0.0):
+                break
+            results.append((int(self.ids[row]), score))
+        return results
@@ -0,0 +1,364 @@
+# indexing/token_index.py
+import bisect
+import sys
+from array import array
+from typing import Iterable, List, Mapping, Tuple
+from indexing.tokenizer import tokenize
+from indexing.postings import DiskTier, decode_postings, encode_postings
+
+# Los términos de campo (`artist:queen`) llevan este prefijo: ordena antes que
+# cualquier letra, así nunca aparecen al expandir prefijos de texto libre
+FIELD_MARK = "\x01"
+
+# Documento de entrada: (id, texto principal, {campo: valor o lista de valores})
+Document = Tuple[int, str, Mapping[str, object]]
+
+
+def field_term(field: str, value: str) -> str:
+    return f"{FIELD_MARK}{field}:{value}"
+
+
+def _scan_prefix(sorted_terms: List[str], prefix: str, limit: int) -> List[str]:
+    matched = []
+    position = bisect.bisect_left(sorted_terms, prefix)
+    while position < len(sorted_terms) and len(matched) < limit:
+        term = sorted_terms[position]
+        if not term.startswith(prefix):
+            break
+        matched.append(term)
+        position += 1
+    return matched
+
+
+class DocRecord:
+    """
+    Datos mínimos por documento; `__slots__` evita un dict por instancia. El
+    texto no se guarda: las frases se verifican cargando solo las filas
+    candidatas (ver `indexing.planner`).
+    """
+
+    __slots__ = ("doc_id", "length")
+
+    def __init__(self, doc_id: int, length: int):
+        self.doc_id = doc_id
+        self.length = length
+
+
+class TokenIndex:
+    """
+    Índice invertido término -> ids de documento para un tipo de entidad.
+
+    Mientras se construye, las postings son arrays de ids; `finalize` las
+    codifica (deltas + varint) en bytes, interna los términos y, si se
+    supera el presupuesto de memoria, vuelca las postings de los términos
+    más raros a un `DiskTier`.
+
+    Los términos presentes en más de `max_df_ratio` de los documentos se
+    consideran omnipresentes: no se guardan sus postings y se ignoran en la
+    consulta, porque no ayudan a discriminar y son los más caros de cruzar.
+
+    Ya finalizado, `upsert`/`remove` aplican cambios sueltos (eventos del
+    catálogo) sobre un overlay en memoria con lápidas para la parte
+    codificada; la siguiente reconstrucción completa lo compacta.
+    """
+
+    def __init__(
+        self,
+        max_df_ratio: float = 0.3,
+        min_docs_for_df_cut: int = 1000,
+        max_prefix_terms: int = 64,
+    ):
+        self.max_df_ratio = max_df_ratio
+        self.min_docs_for_df_cut = min_docs_for_df_cut
+        self.max_prefix_terms = max_prefix_terms
+        self.docs: dict[int, DocRecord] = {}
+        # Campos que tienen los documentos de este tipo (los álbumes no tienen `genre`)
+        self.fields: set[str] = set()
+        self.skipped_terms: frozenset[str] = frozenset()
+        self.memory_postings: dict[str, bytes] = {}
+        self.disk: DiskTier | None = None
+        self._building: dict[str, array] = {}
+        self._sorted_terms: List[str] = []
+        # Cambios posteriores a `finalize`
+        self._overlay: dict[str, set[int]] = {}
+        self._overlay_terms: List[str] = []
+        self._overlay_docs: dict[int, set[str]] = {}
+        self._tombstones: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._sorted_terms) + len(self._overlay_terms)
+
+    def _append(self, term: str, doc_id: int) -> None:
+        postings = self._building.get(term)
+        if postings is None:
+            postings = self._building[sys.intern(term)] = array("q")
+        postings.append(doc_id)
+
+    @staticmethod
+    def _document_terms(tokens: List[str], fields: Mapping[str, object] | None) -> set[str]:
+        terms = set(tokens)
+        for field, values in (fields or {}).items():
+            if values is None:
+                continue
+            if isinstance(values, (str, int)):
+                values = [values]
+            for value in values:
+                if isinstance(value, int):
+                    terms.add(field_term(field, str(value)))
+                elif value:
+                    terms.update(field_term(field, token) for token in tokenize(value))
+        return terms
+
+    def add(self, doc_id: int, text: str, fields: Mapping[str, object] | None = None) -> None:
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        self.docs[doc_id] = DocRecord(doc_id, len(tokens))
+        self.fields.update(fields or ())
+        for term in self._document_terms(tokens, fields):
+            self._append(term, doc_id)
+
+    def add_documents(self, documents: Iterable[Document]) -> None:
+        for doc_id, text, fields in documents:
+            self.add(doc_id, text, fields)
+
+    def _in_base(self, term: str) -> bool:
+        return term in self.memory_postings or (self.disk is not None and term in self.disk)
+
+    def upsert(self, doc_id: int, text: str, fields: Mapping[str, object] | None = None) -> None:
+        """Añade o reemplaza un documento en un índice ya finalizado."""
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        if not tokens:
+            return
+
+        self.docs[doc_id] = DocRecord(doc_id, len(tokens))
+        self.fields.update(fields or ())
+        terms = self._document_terms(tokens, fields)
+        for term in terms:
+            postings = self._overlay.get(term)
+            if postings is None:
+                postings = self._overlay[sys.intern(term)] = set()
+                if not self._in_base(term):
+                    bisect.insort(self._overlay_terms, term)
+            postings.add(doc_id)
+        self._overlay_docs[doc_id] = terms
+
+    def remove(self, doc_id: int) -> None:
+        for term in self._overlay_docs.pop(doc_id, ()):
+            self._overlay[term].discard(doc_id)
+        if self.docs.pop(doc_id, None) is not None:
+            # Sus entradas en las postings codificadas dejan de valer
+            self._tombstones.add(doc_id)
+
+    def encode(self) -> dict[str, bytes]:
+        """Codifica las postings en construcción y descarta las omnipresentes."""
+        n_docs = len(self.docs)
+        max_df = self.max_df_ratio * n_docs if n_docs >= self.min_docs_for_df_cut else None
+
+        encoded: dict[str, bytes] = {}
+        skipped = set()
+        for term, ids in self._building.items():
+            # Los filtros por campo se conservan siempre: son restricciones, no relevancia
+            if max_df is not None and len(ids) > max_df and not term.startswith(FIELD_MARK):
+                skipped.add(term)
+                continue
+            encoded[term] = encode_postings(sorted(set(ids)))
+
+        self._building = {}
+        self.skipped_terms = frozenset(skipped)
+        return encoded
+
+    def finalize(
+        self,
+        memory_budget_bytes: int | None = None,
+        disk_dir: str | None = None,
+        encoded: dict[str, bytes] | None = None,
+    ) -> "TokenIndex":
+        """
+        Deja el índice listo para consultas. Con presupuesto, las postings de
+        los términos más frecuentes se quedan en memoria (son las que más se
+        consultan) y el resto va a disco.
+        """
+        if encoded is None:
+            encoded = self.encode()
+
+        in_memory, on_disk = encoded, {}
+        if memory_budget_bytes is not None:
+            in_memory, used = {}, 0
+            # Más bytes ~ más documentos: los términos comunes van primero
+            for term in sorted(encoded, key=lambda t: len(encoded[t]), reverse=True):
+                blob = encoded[term]
+                if used + len(blob) <= memory_budget_bytes:
+                    in_memory[term] = blob
+                    used += len(blob)
+                else:
+                    on_disk[term] = blob
+
+        self.memory_postings = in_memory
+        self.disk = DiskTier(on_disk, directory=disk_dir) if on_disk else None
+        self._sorted_terms = sorted(encoded)
+        return self
+
+    def postings(self, term: str) -> array:
+        blob = self.memory_postings.get(term)
+        if blob is None and self.disk is not None:
+            blob = self.disk.get(term)
+        ids = decode_postings(blob) if blob else array("q")
+        if self._tombstones:
+            ids = array("q", (doc_id for doc_id in ids if doc_id not in self._tombstones))
+        extra = self._overlay.get(term)
+        if extra:
+            ids.extend(sorted(extra))
+        return ids
+
+    def posting_size(self, term: str) -> int:
+        """Bytes codificados de la posting: estimación barata de su frecuencia."""
+        size = len(self._overlay.get(term, ()))
+        blob = self.memory_postings.get(term)
+        if blob is not None:
+            return size + len(blob)
+        if self.disk is not None and term in self.disk:
+            return size + self.disk.offsets[term][1]
+        return size
+
+    def prefix_terms(self, prefix: str, limit: int | None = None) -> List[str]:
+        """Términos que empiezan por `prefix`; como mucho `limit` (o `max_prefix_terms`)."""
+        limit = self.max_prefix_terms if limit is None else limit
+        matched = _scan_prefix(self._sorted_terms, prefix, limit)
+        if self._overlay_terms:
+            extra = _scan_prefix(self._overlay_terms, prefix, limit)
+            matched = sorted(set(matched).union(extra))[:limit]
+        return matched
+
+    def union_postings(self, terms: Iterable[str]) -> set[int]:
+        matched: set[int] = set()
+        for term in terms:
+            matched.update(self.postings(term))
+        return matched
+
+    def _prefix_postings(self, prefix: str) -> set[int]:
+        """Unión de postings de los términos que empiezan por `prefix` (acotada)."""
+        return self.union_postings(self.prefix_terms(prefix))
+
+    def intersect_postings(self, groups: Iterable[List[str]]) -> set[int]:
+        """
+        Intersección de grupos de términos (cada grupo vale por la unión de
+        sus postings). Los grupos se ordenan por tamaño codificado antes de
+        decodificar nada, y se decodifican de uno en uno: en cuanto la
+        intersección se vacía, las postings grandes ni se llegan a leer.
+        """
+        ordered = sorted(groups, key=lambda terms: sum(self.posting_size(t) for t in terms))
+        result: set[int] | None = None
+        for terms in ordered:
+            matched = self.union_postings(terms)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+    def _token_terms(self, tokens: List[str], prefix_last: bool) -> List[List[str]] | None:
+        useful = [t for t in dict.fromkeys(tokens) if t not in self.skipped_terms]
+        if not useful:
+            return None
+        groups = []
+        for i, token in enumerate(useful):
+            is_last = i == len(useful) - 1
+            if prefix_last and is_last and len(token) >= 2:
+                groups.append(self.prefix_terms(token))
+            else:
+                groups.append([token])
+        return groups
+
+    def candidates(self, tokens: List[str], prefix_last: bool = True) -> set[int] | None:
+        """
+        Intersección de postings de los tokens de la consulta, del más
+        selectivo al menos selectivo. Devuelve None si ningún token es útil.
+        """
+        groups = self._token_terms(tokens, prefix_last)
+        if groups is None:
+            return None
+        return self.intersect_postings(groups)
+
+    def query_cost(self, query: str) -> int:
+        """Bytes de postings que como mucho decodificaría `search(query)`."""
+        groups = self._token_terms(tokenize(query), prefix_last=True) or []
+        return sum(self.posting_size(term) for terms in groups for term in terms)
+
+    def search(self, query: str, top_k: int) -> List[Tuple[int, float]]:
+        """
+        Documentos que contienen todos los tokens de la consulta, puntuados
+        por la fracción del documento que cubre la consulta (en [0, 1]).
+        """
+        tokens = tokenize(query)
+        matched = self.candidates(tokens)
+        if not matched or top_k <= 0:
+            return []
+
+        n_query = len(set(tokens))
+        scored = [
+            (doc_id, n_query / max(self.docs[doc_id].length, n_query))
+            for doc_id in matched
+        ]
+        # Empates: ids más bajos (más antiguos) primero, para un orden estable
+        scored.sort(key=lambda hit: (-hit[1], hit[0]))
+        return scored[:top_k]
+
+    def stats(self) -> dict:
+        return {
+            "documents": len(self.docs),
+            "terms": self.term_count,
+            "skipped_terms": len(self.skipped_terms),
+            "memory_postings_bytes": sum(len(b) for b in self.memory_postings.values()),
+            "disk_terms": len(self.disk.offsets) if self.disk else 0,
+            "disk_postings_bytes": self.disk.size if self.disk else 0,
+            "overlay_docs": len(self._overlay_docs),
+            "tombstones": len(self._tombstones),
+        }
+
+
+class CatalogIndex:
+    """Índices de tokens de canciones, álbumes y artistas."""
+
+    KINDS = ("songs", "albums", "artists")
+
+    def __init__(self, max_df_ratio: float = 0.3):
+        self.indexes = {kind: TokenIndex(max_df_ratio=max_df_ratio) for kind in self.KINDS}
+
+    def __getitem__(self, kind: str) -> TokenIndex:
+        return self.indexes[kind]
+
+    @classmethod
+    def build(
+        cls,
+        songs: Iterable[Document],
+        albums: Iterable[Document],
+        artists: Iterable[Document],
+        max_df_ratio: float = 0.3,
+        memory_budget_bytes: int | None = None,
+        disk_dir: str | None = None,
+    ) -> "CatalogIndex":
+        catalog = cls(max_df_ratio=max_df_ratio)
+        for kind, documents in zip(cls.KINDS, (songs, albums, artists)):
+            catalog[kind].add_documents(documents)
+        catalog.finalize(memory_budget_bytes, disk_dir)
+        return catalog
+
+    def finalize(self, memory_budget_bytes: int | None, disk_dir: str | None) -> None:
+        """Reparte el presupuesto de memoria entre tipos según su tamaño codificado."""
+        encoded = {kind: index.encode() for kind, index in self.indexes.items()}
+        sizes = {kind: sum(len(b) for b in blobs.values()) for kind, blobs in encoded.items()}
+        total = sum(sizes.values()) or 1
+
+        for kind, index in self.indexes.items():
+            budget = None
+            if memory_budget_bytes is not None:
+                budget = int(memory_budget_bytes * sizes[kind] / total)
+            index.finalize(budget, disk_dir, encoded=encoded[kind])
+
+    def stats(self) -> dict:
+        return {kind: index.stats() for kind, index in self.indexes.items()}
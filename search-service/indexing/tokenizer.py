@@ -0,0 +1,79 @@
+# indexing/tokenizer.py
+import re
+import unicodedata
+from typing import List
+
+# Palabras vacías en español e inglés (ya normalizadas: minúsculas y sin acentos)
+STOPWORDS_ES = frozenset(
+    """
+    a al algo ante con contra de del desde e el en entre es esta este eso esto
+    ha hay la las le les lo los me mi mis muy no nos o os para pero por que se
+    si sin sobre su sus te ti tu tus u un una unas uno unos y ya yo
+    """.split()
+)
+
+STOPWORDS_EN = frozenset(
+    """
+    a an and are as at be but by for from i in is it its me my of on or so
+    that the this to was we with you your
+    """.split()
+)
+
+STOPWORDS = STOPWORDS_ES | STOPWORDS_EN
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin acentos y con espacios colapsados."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def light_stem(token: str) -> str:
+    """
+    Stemming ligero de plurales en español/inglés.
+
+    No pretende ser lingüísticamente exacto: basta con que indexación y
+    consulta pasen por la misma función ("canciones" y "cancion" -> "cancion").
+
+    Sin diccionario no se sabe si "-es" es plural de un singular acabado en
+    "e" ("stones" -> "stone") o en consonante ("canciones" -> "cancion"), así
+    que el singular también pierde la "e" final: "stone" y "stones" -> "ston",
+    "rose" y "roses" -> "ros". La "z" final tras vocal se escribe "c" ("voz" y
+    "voces" -> "voc") y la "y" tras consonante, "i" ("story" y "stories" ->
+    "stori", "movie" y "movies" -> "movi").
+    """
+    if token.isdigit():
+        return token
+    if len(token) >= 3 and token[-1] == "y" and token[-2] not in "aeiou":
+        return token[:-1] + "i"
+    if len(token) >= 3 and token[-1] == "z" and token[-2] in "aeiou":
+        return token[:-1] + "c"
+    if len(token) <= 3:
+        return token
+    if token.endswith("es") and len(token) > 4:
+        return token[:-2]
+    if token.endswith("e"):
+        return token[:-1]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def words(text: str) -> List[str]:
+    """Palabras normalizadas, sin filtrar ni aplicar stemming."""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokens normalizados y con stemming, sin palabras vacías.
+
+    Si el texto solo contiene palabras vacías ("The The", "La La") se
+    conservan, para que esos títulos sigan siendo encontrables.
+    """
+    all_words = words(text)
+    content = [w for w in all_words if w not in STOPWORDS]
+    return [light_stem(w) for w in (content or all_words)]
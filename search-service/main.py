@@ -1,11 +1,43 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from handlers.search_handler import router as search_router
-from middleware.auth_middleware import AuthMiddleware
+from middleware.auth_middleware import AuthMiddleware, token_cache
 from config import settings
 import uvicorn
 
-app = FastAPI(title="Search Service", version="0.1")
+try:
+    from events.consumer import consume_events
+
+    RABBITMQ_AVAILABLE = bool(settings.rabbitmq_url)
+except ImportError:
+    RABBITMQ_AVAILABLE = False
+    print("[!] Módulo events.consumer no disponible")
+
+
+@asynccontextmanager
+async def lifespan(_):
+    # Startup: eventos del catálogo para mantener el índice al día
+    connection = None
+    if RABBITMQ_AVAILABLE:
+        try:
+            connection = await consume_events()
+            print("[*] Consumer de eventos del catálogo iniciado.")
+        except Exception as e:
+            print(f"[!] Error iniciando consumer RabbitMQ: {e}")
+            print("[!] Continuando sin RabbitMQ (el índice se refresca por antigüedad)...")
+    else:
+        print("[!] Ejecutando sin RabbitMQ (modo desarrollo)")
+
+    yield
+
+    # Shutdown
+    if connection is not None:
+        await connection.close()
+        print("[*] Consumer detenido correctamente.")
+
+
+app = FastAPI(title="Search Service", version="0.1", lifespan=lifespan)
 
 # debug: Verificar orígenes permitidos
 print("Allowed origins:", settings.frontend_origins)
@@ -32,5 +64,10 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return token_cache.stats()
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=settings.port, reload=True)
@@ -0,0 +1,52 @@
+"""
+Reconstrucción completa del índice de búsqueda.
+
+    # Construye desde una instantánea y muestra estadísticas
+    python reindex.py
+
+    # Pide al servicio en marcha un reindexado azul/verde
+    python reindex.py --url http://localhost:8006 --token <JWT admin>
+"""
+import argparse
+import asyncio
+import json
+import urllib.request
+
+
+def trigger_remote(url: str, token: str) -> dict:
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/search/admin/reindex",
+        method="POST",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+async def build_local() -> dict:
+    from indexing.manager import index_manager
+    from database.connection import engine
+
+    try:
+        return await index_manager.rebuild()
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reindexado completo del search-service")
+    parser.add_argument("--url", help="URL del search-service en marcha")
+    parser.add_argument("--token", help="JWT con rol admin (requerido con --url)")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.token:
+            parser.error("--token es obligatorio con --url")
+        result = trigger_remote(args.url, args.token)
+    else:
+        result = asyncio.run(build_local())
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,4 +19,19 @@ class AlbumRepository:
             .offset(offset)
         )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    async def get_by_ids(self, ids: list[int]):
+        """Carga álbumes por id respetando el orden recibido."""
+        if not ids:
+            return []
+        stmt = (
+            select(Album)
+            .options(
+                selectinload(Album.artist).selectinload(Artist.user)
+            )
+            .where(Album.id.in_(ids))
+        )
+        result = await self.session.execute(stmt)
+        by_id = {album.id: album for album in result.scalars().all()}
+        return [by_id[i] for i in ids if i in by_id]
\ No newline at end of file
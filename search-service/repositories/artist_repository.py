@@ -17,4 +17,17 @@ class ArtistRepository:
             .offset(offset)
         )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    async def get_by_ids(self, ids: list[int]):
+        """Carga artistas por id respetando el orden recibido."""
+        if not ids:
+            return []
+        stmt = (
+            select(Artist)
+            .options(selectinload(Artist.user))
+            .where(Artist.id.in_(ids))
+        )
+        result = await self.session.execute(stmt)
+        by_id = {artist.id: artist for artist in result.scalars().all()}
+        return [by_id[i] for i in ids if i in by_id]
\ No newline at end of file
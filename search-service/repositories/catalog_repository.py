@@ -0,0 +1,210 @@
+# catalog_repository.py
+from typing import Iterable
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.models import Song, Album, Artist, Genre, song_artists
+
+# Texto principal (el que se indexa) de cada tipo: (columna id, columna texto)
+_TEXT_COLUMNS = {
+    "songs": (Song.id, Song.title),
+    "albums": (Album.id, Album.title),
+    "artists": (Artist.id, Artist.artist_name),
+}
+
+
+class CatalogRepository:
+    """Lecturas ligeras (id + texto y campos) para construir índices en memoria."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def list_song_titles(self) -> list[tuple[int, str]]:
+        result = await self.session.execute(select(Song.id, Song.title).order_by(Song.id))
+        return [(row.id, row.title) for row in result]
+
+    async def list_album_titles(self) -> list[tuple[int, str]]:
+        result = await self.session.execute(select(Album.id, Album.title).order_by(Album.id))
+        return [(row.id, row.title) for row in result]
+
+    async def list_artist_names(self) -> list[tuple[int, str]]:
+        result = await self.session.execute(
+            select(Artist.id, Artist.artist_name).order_by(Artist.id)
+        )
+        return [(row.id, row.artist_name) for row in result]
+
+    def _song_documents_stmt(self):
+        return (
+            select(
+                Song.id,
+                Song.title,
+                Album.title,
+                Album.release_date,
+                Album.artist_id,
+                Artist.artist_name,
+                Genre.name,
+            )
+            .join(Album, Song.album_id == Album.id)
+            .outerjoin(Artist, Album.artist_id == Artist.id)
+            .outerjoin(Genre, Song.genre_id == Genre.id)
+            .order_by(Song.id)
+        )
+
+    async def _song_documents(self, rows) -> list[tuple[int, str, dict]]:
+        """(id, título, campos) de cada canción: álbum, artistas, género y año."""
+        # Artistas invitados (song_artists) además del artista del álbum
+        credits: dict[int, list[tuple[int, str]]] = {}
+        if rows:
+            credit_rows = await self.session.execute(
+                select(song_artists.c.song_id, Artist.id, Artist.artist_name)
+                .join(Artist, Artist.id == song_artists.c.artist_id)
+                .where(song_artists.c.song_id.in_([row[0] for row in rows]))
+            )
+            for song_id, artist_id, artist_name in credit_rows:
+                credits.setdefault(song_id, []).append((artist_id, artist_name))
+
+        documents = []
+        for row in rows:
+            song_id, title, album_title, release_date, album_artist_id, album_artist, genre = row
+            artists = dict(credits.get(song_id, []))
+            if album_artist_id is not None:
+                artists.setdefault(album_artist_id, album_artist)
+            documents.append(
+                (
+                    song_id,
+                    title,
+                    {
+                        "album": album_title,
+                        "artist": list(artists.values()),
+                        "artist_id": list(artists),
+                        "genre": genre,
+                        "year": release_date.year if release_date else None,
+                    },
+                )
+            )
+        return documents
+
+    def _album_documents_stmt(self):
+        return (
+            select(Album.id, Album.title, Album.release_date, Album.artist_id, Artist.artist_name)
+            .outerjoin(Artist, Album.artist_id == Artist.id)
+            .order_by(Album.id)
+        )
+
+    @staticmethod
+    def _album_documents(rows) -> list[tuple[int, str, dict]]:
+        """(id, título, campos) de cada álbum: artista y año."""
+        return [
+            (
+                album_id,
+                title,
+                {
+                    "album": title,
+                    "artist": artist_name,
+                    "artist_id": artist_id,
+                    "year": release_date.year if release_date else None,
+                },
+            )
+            for album_id, title, release_date, artist_id, artist_name in rows
+        ]
+
+    def _artist_documents_stmt(self):
+        return select(Artist.id, Artist.artist_name).order_by(Artist.id)
+
+    @staticmethod
+    def _artist_documents(rows) -> list[tuple[int, str, dict]]:
+        return [
+            (artist_id, name, {"artist": name, "artist_id": artist_id})
+            for artist_id, name in rows
+        ]
+
+    async def _stream(self, stmt, batch_size: int):
+        """Cursor del lado del servidor: nunca hay más de `batch_size` filas en memoria."""
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions(batch_size):
+            yield rows
+
+    async def iter_song_documents(self, batch_size: int = 1000):
+        async for rows in self._stream(self._song_documents_stmt(), batch_size):
+            yield await self._song_documents(rows)
+
+    async def iter_album_documents(self, batch_size: int = 1000):
+        async for rows in self._stream(self._album_documents_stmt(), batch_size):
+            yield self._album_documents(rows)
+
+    async def iter_artist_documents(self, batch_size: int = 1000):
+        async for rows in self._stream(self._artist_documents_stmt(), batch_size):
+            yield self._artist_documents(rows)
+
+    async def get_song_documents(
+        self, song_ids: list[int] | None = None, album_id: int | None = None
+    ) -> list[tuple[int, str, dict]]:
+        """Documentos de canciones concretas o de todo un álbum (para eventos)."""
+        stmt = self._song_documents_stmt()
+        if song_ids is not None:
+            stmt = stmt.where(Song.id.in_(song_ids))
+        if album_id is not None:
+            stmt = stmt.where(Song.album_id == album_id)
+        result = await self.session.execute(stmt)
+        return await self._song_documents(result.all())
+
+    async def get_album_documents(self, album_ids: list[int]) -> list[tuple[int, str, dict]]:
+        result = await self.session.execute(
+            self._album_documents_stmt().where(Album.id.in_(album_ids))
+        )
+        return self._album_documents(result.all())
+
+    async def get_ids_by_artists(self, artist_ids: list[int]) -> dict[int, dict[str, set[int]]]:
+        """Canciones y álbumes de cada artista (del álbum o invitado, como en el índice)."""
+        owned: dict[int, dict[str, set[int]]] = {
+            artist_id: {"songs": set(), "albums": set()} for artist_id in artist_ids
+        }
+        if not artist_ids:
+            return owned
+        albums = await self.session.execute(
+            select(Album.artist_id, Album.id).where(Album.artist_id.in_(artist_ids))
+        )
+        for artist_id, album_id in albums:
+            owned[artist_id]["albums"].add(album_id)
+        songs = await self.session.execute(
+            select(Album.artist_id, Song.id)
+            .join(Album, Song.album_id == Album.id)
+            .where(Album.artist_id.in_(artist_ids))
+            .union(
+                select(song_artists.c.artist_id, song_artists.c.song_id).where(
+                    song_artists.c.artist_id.in_(artist_ids)
+                )
+            )
+        )
+        for artist_id, song_id in songs:
+            owned[artist_id]["songs"].add(song_id)
+        return owned
+
+    async def get_texts(
+        self, kind: str, ids: Iterable[int], batch_size: int = 1000
+    ) -> dict[int, str]:
+        """Texto principal de `ids`, por lotes (para verificar frases)."""
+        id_col, text_col = _TEXT_COLUMNS[kind]
+        ids = list(ids)
+        texts: dict[int, str] = {}
+        for start in range(0, len(ids), batch_size):
+            result = await self.session.execute(
+                select(id_col, text_col).where(id_col.in_(ids[start : start + batch_size]))
+            )
+            texts.update((row[0], row[1]) for row in result)
+        return texts
+
+    async def search_texts(self, kind: str, query: str, limit: int) -> list[tuple[int, str]]:
+        """
+        Candidatos (id, texto) cuyo texto contiene la consulta (ILIKE). Con
+        orden fijo (los textos más cortos primero) para que el corte de
+        `limit` devuelva siempre los mismos candidatos.
+        """
+        id_col, text_col = _TEXT_COLUMNS[kind]
+        result = await self.session.execute(
+            select(id_col, text_col)
+            .where(text_col.ilike(f"%{query}%"))
+            .order_by(func.length(text_col), id_col)
+            .limit(limit)
+        )
+        return [(row[0], row[1]) for row in result]
@@ -0,0 +1,18 @@
+# entity_loader.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from repositories.song_repository import SongRepository
+from repositories.album_repository import AlbumRepository
+from repositories.artist_repository import ArtistRepository
+
+_REPOSITORIES = {
+    "songs": SongRepository,
+    "albums": AlbumRepository,
+    "artists": ArtistRepository,
+}
+
+
+async def load_entities(session: AsyncSession, kind: str, ids: list[int]) -> list:
+    """Hidrata ids de "songs", "albums" o "artists" respetando su orden."""
+    if not ids:
+        return []
+    return list(await _REPOSITORIES[kind](session).get_by_ids(ids))
@@ -20,4 +20,20 @@ class SongRepository:
             .offset(offset)
         )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    async def get_by_ids(self, ids: list[int]):
+        """Carga canciones por id respetando el orden recibido."""
+        if not ids:
+            return []
+        stmt = (
+            select(Song)
+            .options(
+                selectinload(Song.album).selectinload(Album.artist).selectinload(Artist.user),
+                selectinload(Song.artists).selectinload(Artist.user)
+            )
+            .where(Song.id.in_(ids))
+        )
+        result = await self.session.execute(stmt)
+        by_id = {song.id: song for song in result.scalars().all()}
+        return [by_id[i] for i in ids if i in by_id]
\ No newline at end of file
@@ -0,0 +1,15 @@
+# subscription_repository.py
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.models import ArtistSubscription
+
+
+class SubscriptionRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_followed_artist_ids(self, user_id: int) -> set[int]:
+        result = await self.session.execute(
+            select(ArtistSubscription.artist_id).where(ArtistSubscription.user_id == user_id)
+        )
+        return set(result.scalars().all())
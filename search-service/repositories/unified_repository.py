@@ -0,0 +1,33 @@
+# unified_repository.py
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database.models import Song, Album, Artist
+
+
+class UnifiedRepository:
+    """Candidatos de canciones, álbumes y artistas en un solo UNION ALL."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @staticmethod
+    def _candidates(kind: str, id_col, text_col, query: str, limit: int):
+        # Los títulos más cortos que contienen la consulta son los más parecidos
+        return (
+            select(literal(kind).label("kind"), id_col.label("id"), text_col.label("text"))
+            .where(text_col.ilike(f"%{query}%"))
+            .order_by(func.length(text_col))
+            .limit(limit)
+            .subquery()
+        )
+
+    async def top_candidates(self, query: str, limit_per_kind: int) -> list[tuple[str, int, str]]:
+        parts = [
+            self._candidates("song", Song.id, Song.title, query, limit_per_kind),
+            self._candidates("album", Album.id, Album.title, query, limit_per_kind),
+            self._candidates("artist", Artist.id, Artist.artist_name, query, limit_per_kind),
+        ]
+        stmt = union_all(*(select(p.c.kind, p.c.id, p.c.text) for p in parts))
+        result = await self.session.execute(stmt)
+        return [(row.kind, row.id, row.text) for row in result]
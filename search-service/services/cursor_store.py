@@ -0,0 +1,73 @@
+# services/cursor_store.py
+import secrets
+import time
+from array import array
+from collections import OrderedDict
+
+
+class RankedCursor:
+    """Ranking completo de una consulta, guardado como arrays compactos de ids."""
+
+    __slots__ = ("query", "user_id", "ranked", "expires_at", "prefetched", "paged")
+
+    def __init__(
+        self,
+        query: str,
+        ranked: dict[str, list[int]],
+        expires_at: float,
+        user_id: int | None = None,
+    ):
+        self.query = query
+        # Dueño del ranking: si está personalizado, solo vale para ese usuario
+        self.user_id = user_id
+        self.ranked = {kind: array("q", ids) for kind, ids in ranked.items()}
+        self.expires_at = expires_at
+        # Última página precargada por tipo: kind -> (offset, limit, resultados)
+        self.prefetched: dict[str, tuple[int, int, list]] = {}
+        # Ya se pidió alguna página más allá de la primera con este cursor
+        self.paged = False
+
+    def total(self, kind: str) -> int:
+        return len(self.ranked.get(kind, ()))
+
+    def page(self, kind: str, offset: int, limit: int) -> list[int]:
+        return self.ranked.get(kind, array("q"))[offset : offset + limit].tolist()
+
+    def take_prefetched(self, kind: str, offset: int, limit: int) -> list | None:
+        cached = self.prefetched.get(kind)
+        if cached and cached[0] == offset and cached[1] == limit:
+            del self.prefetched[kind]
+            return cached[2]
+        return None
+
+
+class CursorStore:
+    """
+    Cursores de búsqueda en memoria del worker, con TTL y tamaño acotado (LRU).
+    Un cursor caducado o desconocido simplemente obliga a recalcular el ranking.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, RankedCursor] = OrderedDict()
+
+    def create(
+        self, query: str, ranked: dict[str, list[int]], user_id: int | None = None
+    ) -> tuple[str, RankedCursor]:
+        token = secrets.token_urlsafe(12)
+        entry = RankedCursor(query, ranked, time.monotonic() + self.ttl_seconds, user_id)
+        self._entries[token] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return token, entry
+
+    def get(self, token: str) -> RankedCursor | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return entry
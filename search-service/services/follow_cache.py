@@ -0,0 +1,68 @@
+# services/follow_cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from repositories.subscription_repository import SubscriptionRepository
+from services.metrics import metrics
+from database.connection import AsyncSessionLocal
+
+
+class FollowCache:
+    """
+    Artistas seguidos por usuario, en memoria del worker (LRU con TTL).
+
+    Solo la primera búsqueda de un usuario consulta la base de datos. Cuando
+    una entrada caduca se sigue sirviendo la versión anterior y se refresca
+    en segundo plano, así la personalización nunca añade una consulta a la
+    respuesta de un usuario conocido.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_users: int,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.session_factory = session_factory
+        self._entries: OrderedDict[int, tuple[frozenset[int], float]] = OrderedDict()
+        self._refreshing: dict[int, asyncio.Task] = {}
+
+    def _store(self, user_id: int, artist_ids: set[int]) -> frozenset[int]:
+        followed = frozenset(artist_ids)
+        self._entries[user_id] = (followed, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+        return followed
+
+    async def _refresh(self, user_id: int) -> None:
+        try:
+            async with self.session_factory() as session:
+                repo = SubscriptionRepository(session)
+                self._store(user_id, await repo.get_followed_artist_ids(user_id))
+        except Exception as e:
+            print(f"❌ Error refrescando artistas seguidos del usuario {user_id}: {e}")
+        finally:
+            self._refreshing.pop(user_id, None)
+
+    async def get(self, session: AsyncSession, user_id: int) -> frozenset[int]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            metrics.incr("search.follows.misses")
+            repo = SubscriptionRepository(session)
+            return self._store(user_id, await repo.get_followed_artist_ids(user_id))
+
+        followed, expires_at = entry
+        self._entries.move_to_end(user_id)
+        if expires_at < time.monotonic() and user_id not in self._refreshing:
+            metrics.incr("search.follows.stale")
+            self._refreshing[user_id] = asyncio.create_task(self._refresh(user_id))
+        else:
+            metrics.incr("search.follows.hits")
+        return followed
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
@@ -0,0 +1,157 @@
+# services/fragment_cache.py
+import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from services.metrics import metrics
+from config import settings
+
+Key = tuple[str, int]
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_fragment(serialized: dict) -> bytes:
+    """Mismo formato que la respuesta JSON por defecto de FastAPI."""
+    return json.dumps(
+        serialized, default=_json_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def entity_version(obj) -> str | None:
+    updated_at = getattr(obj, "updated_at", None)
+    return updated_at.isoformat() if updated_at else None
+
+
+def entity_dependencies(kind: str, obj) -> set[Key]:
+    """Otras entidades embebidas en el fragmento (si cambian, el fragmento caduca)."""
+    deps: set[Key] = set()
+    if kind == "songs":
+        if getattr(obj, "album_id", None) is not None:
+            deps.add(("albums", obj.album_id))
+        album = getattr(obj, "album", None)
+        if album is not None and album.artist_id is not None:
+            deps.add(("artists", album.artist_id))
+        for artist in getattr(obj, "artists", None) or []:
+            deps.add(("artists", artist.id))
+    elif kind == "albums" and getattr(obj, "artist_id", None) is not None:
+        deps.add(("artists", obj.artist_id))
+    return deps
+
+
+class _Fragment:
+    __slots__ = ("version", "data", "expires_at", "deps")
+
+    def __init__(self, version: str | None, data: bytes, expires_at: float, deps: set[Key]):
+        self.version = version
+        self.data = data
+        self.expires_at = expires_at
+        self.deps = deps
+
+
+class FragmentCache:
+    """
+    JSON ya codificado por entidad (canción, álbum, artista), listo para
+    concatenarse en la respuesta. Se invalida con los eventos del catálogo,
+    en cascada hacia los fragmentos que embeben la entidad cambiada (una
+    canción embebe su álbum y sus artistas); el TTL cubre los cambios que
+    no publican evento.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Key, _Fragment] = OrderedDict()
+        # Entidad embebida -> fragmentos que la contienen
+        self._dependents: dict[Key, set[Key]] = {}
+        # Generación de la última invalidación por clave, para descartar
+        # rellenos que leyeron la base de datos antes del evento
+        self._generation = 0
+        self._invalidated_at: OrderedDict[Key, int] = OrderedDict()
+        # Generación del último vaciado completo (todas las claves a la vez)
+        self._cleared_at = -1
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, kind: str, entity_id: int) -> bytes | None:
+        key = (kind, entity_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.data
+
+    def put(
+        self,
+        kind: str,
+        entity_id: int,
+        version: str | None,
+        data: bytes,
+        deps: set[Key],
+        generation: int,
+    ) -> None:
+        key = (kind, entity_id)
+        if self._cleared_at > generation:
+            return
+        if any(self._invalidated_at.get(k, -1) > generation for k in (key, *deps)):
+            return
+        current = self._entries.get(key)
+        if current is not None and version and current.version and current.version > version:
+            return
+
+        self._drop(key)
+        self._entries[key] = _Fragment(version, data, time.monotonic() + self.ttl_seconds, deps)
+        for dep in deps:
+            self._dependents.setdefault(dep, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for dep in entry.deps:
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[dep]
+
+    def invalidate(self, kind: str, entity_id: int) -> None:
+        key = (kind, entity_id)
+        self._generation += 1
+        self._invalidated_at[key] = self._generation
+        self._invalidated_at.move_to_end(key)
+        while len(self._invalidated_at) > self.max_entries:
+            self._invalidated_at.popitem(last=False)
+
+        self._drop(key)
+        for dependent in list(self._dependents.pop(key, ())):
+            self._drop(dependent)
+        metrics.incr("search.fragments.invalidations")
+
+    def clear(self) -> None:
+        """
+        Olvida todos los fragmentos, p. ej. cuando se han podido perder
+        eventos (la cola de este worker se recrea al reconectar a RabbitMQ).
+        """
+        self._generation += 1
+        self._cleared_at = self._generation
+        self._entries.clear()
+        self._dependents.clear()
+        metrics.incr("search.fragments.clears")
+
+
+fragment_cache = FragmentCache(
+    ttl_seconds=settings.search_fragment_cache_ttl_seconds,
+    max_entries=settings.search_fragment_cache_max_entries,
+)
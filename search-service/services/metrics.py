@@ -0,0 +1,55 @@
+# services/metrics.py
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """
+    Registro de métricas en memoria del proceso (contadores y distribuciones).
+
+    Las distribuciones guardan agregados y una ventana de las últimas muestras
+    para calcular percentiles aproximados sin crecer sin límite.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._samples: dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._totals: dict[str, list[float]] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self._samples[name].append(value)
+            totals = self._totals.setdefault(name, [0, 0.0, value])
+            totals[0] += 1
+            totals[1] += value
+            totals[2] = max(totals[2], value)
+
+    @staticmethod
+    def _percentile(ordered: list[float], pct: float) -> float:
+        if not ordered:
+            return 0.0
+        idx = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            distributions = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                count, total, maximum = self._totals[name]
+                distributions[name] = {
+                    "count": count,
+                    "avg": total / count if count else 0.0,
+                    "p50": self._percentile(ordered, 0.50),
+                    "p95": self._percentile(ordered, 0.95),
+                    "max": maximum,
+                }
+            return {"counters": dict(self._counters), "distributions": distributions}
+
+
+metrics = Metrics()
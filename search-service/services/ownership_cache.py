@@ -0,0 +1,92 @@
+# services/ownership_cache.py
+import time
+from collections import OrderedDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from repositories.catalog_repository import CatalogRepository
+from services.metrics import metrics
+from config import settings
+
+Key = tuple[str, int]
+
+
+class OwnershipCache:
+    """
+    Canciones y álbumes de cada artista, en memoria del worker (LRU con TTL).
+
+    La personalización la usa cuando no hay índice de tokens construido: un
+    artista seguido se carga una vez y sirve para todas las consultas de
+    todos sus seguidores. Los eventos del catálogo descartan a los artistas
+    afectados (los dueños conocidos de la entidad y los que trae el evento);
+    el TTL cubre los cambios que no llegan como evento.
+    """
+
+    def __init__(self, ttl_seconds: int, max_artists: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_artists = max_artists
+        self._entries: OrderedDict[int, tuple[dict[str, frozenset[int]], float]] = OrderedDict()
+        # (tipo, id) -> artistas en caché que lo tienen
+        self._owners: dict[Key, set[int]] = {}
+
+    def _store(self, artist_id: int, owned: dict[str, set[int]]) -> None:
+        self._drop(artist_id)
+        entry = {kind: frozenset(ids) for kind, ids in owned.items()}
+        self._entries[artist_id] = (entry, time.monotonic() + self.ttl_seconds)
+        for kind, ids in entry.items():
+            for doc_id in ids:
+                self._owners.setdefault((kind, doc_id), set()).add(artist_id)
+        while len(self._entries) > self.max_artists:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, artist_id: int) -> None:
+        entry = self._entries.pop(artist_id, None)
+        if entry is None:
+            return
+        for kind, ids in entry[0].items():
+            for doc_id in ids:
+                owners = self._owners.get((kind, doc_id))
+                if owners is not None:
+                    owners.discard(artist_id)
+                    if not owners:
+                        del self._owners[(kind, doc_id)]
+
+    async def get(self, session: AsyncSession, artist_ids: frozenset[int]) -> dict[str, set[int]]:
+        """Unión por tipo ("songs", "albums", "artists") de lo que tienen `artist_ids`."""
+        owned: dict[str, set[int]] = {"songs": set(), "albums": set(), "artists": set(artist_ids)}
+        now = time.monotonic()
+        missing = []
+        for artist_id in artist_ids:
+            entry = self._entries.get(artist_id)
+            if entry is None or entry[1] < now:
+                missing.append(artist_id)
+                continue
+            self._entries.move_to_end(artist_id)
+            for kind, ids in entry[0].items():
+                owned[kind].update(ids)
+        metrics.incr("search.ownership.hits", len(artist_ids) - len(missing))
+
+        if missing:
+            metrics.incr("search.ownership.misses", len(missing))
+            loaded = await CatalogRepository(session).get_ids_by_artists(missing)
+            for artist_id in missing:
+                artist_owned = loaded.get(artist_id, {})
+                self._store(artist_id, artist_owned)
+                for kind, ids in artist_owned.items():
+                    owned[kind].update(ids)
+        return owned
+
+    def invalidate(self, kind: str, entity_id: int, artist_ids=()) -> None:
+        """Descarta a los artistas que tenían la entidad y a `artist_ids`."""
+        affected = set(self._owners.get((kind, entity_id), ()))
+        affected.update(artist_ids)
+        for artist_id in affected:
+            self._drop(artist_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._owners.clear()
+
+
+ownership_cache = OwnershipCache(
+    ttl_seconds=settings.search_ownership_cache_ttl_seconds,
+    max_artists=settings.search_ownership_cache_max_artists,
+)
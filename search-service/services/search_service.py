@@ -1,11 +1,169 @@
 # services/search_service.py
+import asyncio
+import json
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from strategies.base_strategy import SearchStrategy
 from services.serializers import serialize_song, serialize_album, serialize_artist
+from services.metrics import metrics
+from services.shadow import ShadowEvaluator
+from services.cursor_store import CursorStore, RankedCursor
+from services.personalization import Personalizer
+from services.fragment_cache import (
+    FragmentCache,
+    encode_fragment,
+    entity_dependencies,
+    entity_version,
+    fragment_cache,
+)
+from repositories.entity_loader import load_entities
+from indexing.query_parser import parse_query
+from database.connection import AsyncSessionLocal
+
+# Serializer y nombre (para logs) por tipo de entidad
+_SERIALIZERS = {
+    "songs": (serialize_song, "canción"),
+    "albums": (serialize_album, "álbum"),
+    "artists": (serialize_artist, "artista"),
+}
+
+# Tipos singulares del ranking unificado -> tipo de colección
+_TOP_KINDS = {"song": "songs", "album": "albums", "artist": "artists"}
+
+_EMPTY_SEARCH = (
+    b'{"songs":{"page":1,"results":[],"total":0},'
+    b'"albums":{"page":1,"results":[],"total":0},'
+    b'"artists":{"page":1,"results":[],"total":0},"cursor":null}'
+)
+
+
+def _json_list(fragments: list[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
 
 class SearchService:
-    def __init__(self, strategy: SearchStrategy):
+    """
+    Las respuestas salen ya codificadas (bytes JSON), montadas concatenando
+    el fragmento cacheado de cada entidad en lugar de serializar de nuevo.
+    """
+
+    def __init__(
+        self,
+        strategy: SearchStrategy,
+        shadow: ShadowEvaluator | None = None,
+        structured: SearchStrategy | None = None,
+        cursors: CursorStore | None = None,
+        personalizer: Personalizer | None = None,
+        fragments: FragmentCache = fragment_cache,
+        max_results: int = 200,
+        max_prefetches: int = 4,
+        session_factory=AsyncSessionLocal,
+    ):
         self.strategy = strategy
+        self.shadow = shadow
+        # Estrategia que entiende campos y frases (`artist:queen "love of"`)
+        self.structured = structured or strategy
+        self.cursors = cursors or CursorStore(ttl_seconds=600, max_entries=5000)
+        self.personalizer = personalizer
+        self.fragments = fragments
+        self.max_results = max_results
+        self.max_prefetches = max_prefetches
+        self.session_factory = session_factory
+        self._prefetch_tasks: set[asyncio.Task] = set()
+
+    async def _render(self, session: AsyncSession, kind: str, ids: list[int]) -> dict[int, bytes]:
+        """Fragmento JSON por id; solo se cargan y serializan los que no están en caché."""
+        rendered = {}
+        for obj_id in ids:
+            data = self.fragments.get(kind, obj_id)
+            if data is not None:
+                rendered[obj_id] = data
+
+        missing = [obj_id for obj_id in ids if obj_id not in rendered]
+        if rendered:
+            metrics.incr("search.fragments.hits", len(rendered))
+        if not missing:
+            return rendered
+
+        metrics.incr("search.fragments.misses", len(missing))
+        generation = self.fragments.generation
+        serializer, label = _SERIALIZERS[kind]
+        for obj in await load_entities(session, kind, missing):
+            try:
+                serialized = serializer(obj)
+                if not serialized:
+                    continue
+                data = encode_fragment(serialized)
+            except Exception as e:
+                print(f"❌ Error serializando {label} {getattr(obj, 'id', 'unknown')}: {e}")
+                continue
+            rendered[obj.id] = data
+            self.fragments.put(
+                kind, obj.id, entity_version(obj), data, entity_dependencies(kind, obj), generation
+            )
+        return rendered
+
+    async def _render_page(self, session: AsyncSession, kind: str, ids: list[int]) -> list[bytes]:
+        rendered = await self._render(session, kind, ids)
+        return [rendered[obj_id] for obj_id in ids if obj_id in rendered]
+
+    async def _ranked_cursor(
+        self, session: AsyncSession, query: str, cursor: str | None, user_id: int | None = None
+    ) -> tuple[str, RankedCursor]:
+        """
+        Reutiliza el ranking del cursor o lo calcula una sola vez para la consulta.
+        El cursor solo vale para la misma consulta y el mismo usuario: un ranking
+        personalizado dejaría ver a quién sigue su dueño.
+        """
+        entry = self.cursors.get(cursor) if cursor else None
+        if entry is not None and entry.query == query and entry.user_id == user_id:
+            metrics.incr("search.cursor.hits")
+            return cursor, entry
+
+        strategy = self.structured if parse_query(query).is_structured else self.strategy
+        start = time.perf_counter()
+        ranked = await strategy.rank_ids(session, query, self.max_results)
+        metrics.observe("search.primary.latency_ms", (time.perf_counter() - start) * 1000)
+        metrics.incr("search.cursor.misses")
+
+        # El ranking personalizado queda guardado en el cursor: se paga una vez
+        if self.personalizer and user_id is not None:
+            try:
+                ranked = await self.personalizer.rerank(session, user_id, ranked)
+            except Exception as e:
+                print(f"❌ Error personalizando resultados: {e}")
+        return self.cursors.create(query, ranked, user_id)
+
+    def _schedule_prefetch(self, entry: RankedCursor, pages: dict[str, int], limit: int) -> None:
+        """
+        Precarga la página siguiente de `pages` si queda algo que mostrar y
+        no hay ya `max_prefetches` en curso (cada una usa su propia sesión).
+        """
+        pending = {
+            kind: offset for kind, offset in pages.items() if offset < entry.total(kind)
+        }
+        if not pending:
+            return
+        if len(self._prefetch_tasks) >= self.max_prefetches:
+            metrics.incr("search.cursor.prefetch_dropped")
+            return
+        task = asyncio.create_task(self._prefetch(entry, pending, limit))
+        self._prefetch_tasks.add(task)
+        task.add_done_callback(self._prefetch_tasks.discard)
+
+    async def _prefetch(self, entry: RankedCursor, pages: dict[str, int], limit: int) -> None:
+        """Prepara en segundo plano la página siguiente de cada tipo."""
+        try:
+            async with self.session_factory() as session:
+                for kind, offset in pages.items():
+                    ids = entry.page(kind, offset, limit)
+                    entry.prefetched[kind] = (
+                        offset,
+                        limit,
+                        await self._render_page(session, kind, ids),
+                    )
+        except Exception as e:
+            print(f"❌ Error precargando página siguiente: {e}")
 
     async def search(
         self,
@@ -15,67 +173,92 @@ class SearchService:
         offset_songs: int = 0,
         offset_albums: int = 0,
         offset_artists: int = 0,
-    ) -> dict:
+        cursor: str | None = None,
+        user_id: int | None = None,
+        prefetch: bool = False,
+    ) -> bytes:
+        """
+        JSON {songs, albums, artists: {page, results, total}, cursor} ya codificado.
+
+        La página siguiente solo se precarga si se pide (`prefetch`) o cuando
+        el cursor ya se ha usado para pasar de página: la mayoría de búsquedas
+        no pasan de la primera y no deben pagar una segunda carga.
+        """
+        offsets = {"songs": offset_songs, "albums": offset_albums, "artists": offset_artists}
         try:
-            songs, albums, artists = await self.strategy.search(
-                session, query, limit, offset_songs, offset_albums, offset_artists
-            )
+            cursor, entry = await self._ranked_cursor(session, query, cursor, user_id)
+            page_ids = {kind: entry.page(kind, offset, limit) for kind, offset in offsets.items()}
 
-            # Serializar resultados de forma segura
-            serialized_songs = []
-            for song in songs:
-                try:
-                    serialized = serialize_song(song)
-                    if serialized:
-                        serialized_songs.append(serialized)
-                except Exception as e:
-                    print(f"❌ Error serializando canción {getattr(song, 'id', 'unknown')}: {e}")
-                    continue
+            # La estrategia sombra corre aparte y no retrasa esta respuesta.
+            # Las consultas con campos no se comparan: la sombra no las entiende
+            if self.shadow and not parse_query(query).is_structured:
+                self.shadow.maybe_schedule(
+                    query, limit, (offset_songs, offset_albums, offset_artists), page_ids
+                )
 
-            serialized_albums = []
-            for album in albums:
-                try:
-                    serialized = serialize_album(album)
-                    if serialized:
-                        serialized_albums.append(serialized)
-                except Exception as e:
-                    print(f"❌ Error serializando álbum {getattr(album, 'id', 'unknown')}: {e}")
-                    continue
+            parts = []
+            for kind, offset in offsets.items():
+                fragments = entry.take_prefetched(kind, offset, limit)
+                if fragments is not None:
+                    metrics.incr("search.cursor.prefetch_hits")
+                else:
+                    fragments = await self._render_page(session, kind, page_ids[kind])
 
-            serialized_artists = []
-            for artist in artists:
-                try:
-                    serialized = serialize_artist(artist)
-                    if serialized:
-                        serialized_artists.append(serialized)
-                except Exception as e:
-                    print(f"❌ Error serializando artista {getattr(artist, 'id', 'unknown')}: {e}")
-                    continue
+                page = (offset // limit) + 1 if limit > 0 else 1
+                parts.append(
+                    b'"%s":{"page":%d,"results":%s,"total":%d}'
+                    % (kind.encode(), page, _json_list(fragments), entry.total(kind))
+                )
 
-            return {
-                "songs": {
-                    "page": (offset_songs // limit) + 1 if limit > 0 else 1,
-                    "results": serialized_songs,
-                    "total": len(serialized_songs)
-                },
-                "albums": {
-                    "page": (offset_albums // limit) + 1 if limit > 0 else 1,
-                    "results": serialized_albums,
-                    "total": len(serialized_albums)
-                },
-                "artists": {
-                    "page": (offset_artists // limit) + 1 if limit > 0 else 1,
-                    "results": serialized_artists,
-                    "total": len(serialized_artists)
-                },
-            }
+            if any(offsets.values()):
+                entry.paged = True
+            if prefetch:
+                self._schedule_prefetch(
+                    entry, {kind: offset + limit for kind, offset in offsets.items()}, limit
+                )
+            elif entry.paged:
+                # Solo los tipos por los que se está paginando
+                self._schedule_prefetch(
+                    entry,
+                    {kind: offset + limit for kind, offset in offsets.items() if offset},
+                    limit,
+                )
+            parts.append(b'"cursor":' + json.dumps(cursor).encode())
+            return b"{" + b",".join(parts) + b"}"
 
         except Exception as e:
             print(f"❌ Error en SearchService: {e}")
             import traceback
             traceback.print_exc()
-            return {
-                "songs": {"page": 1, "results": [], "total": 0},
-                "albums": {"page": 1, "results": [], "total": 0},
-                "artists": {"page": 1, "results": [], "total": 0},
-            }
\ No newline at end of file
+            return _EMPTY_SEARCH
+
+    async def search_top(self, session: AsyncSession, query: str, limit: int = 10) -> bytes:
+        """
+        Lista única de resultados (canciones, álbumes y artistas) ya mezclada
+        y ordenada por score en el servidor, como JSON {results, total}.
+        """
+        try:
+            start = time.perf_counter()
+            hits = await self.strategy.search_top(session, query, limit)
+            metrics.observe("search.top.latency_ms", (time.perf_counter() - start) * 1000)
+
+            # Fragmentos de los ids ganadores; como mucho una consulta por tipo
+            rendered = {}
+            for kind, collection in _TOP_KINDS.items():
+                ids = [obj_id for hit_kind, obj_id, _ in hits if hit_kind == kind]
+                for obj_id, data in (await self._render(session, collection, ids)).items():
+                    rendered[(kind, obj_id)] = data
+
+            results = [
+                b'{"type":"%s","score":%s,"item":%s}'
+                % (kind.encode(), json.dumps(round(score, 4)).encode(), rendered[(kind, obj_id)])
+                for kind, obj_id, score in hits
+                if (kind, obj_id) in rendered
+            ]
+            return b'{"results":%s,"total":%d}' % (_json_list(results), len(results))
+
+        except Exception as e:
+            print(f"❌ Error en SearchService.search_top: {e}")
+            import traceback
+            traceback.print_exc()
+            return b'{"results":[],"total":0}'
@@ -0,0 +1,84 @@
+# services/shadow.py
+import asyncio
+import random
+import time
+from strategies.base_strategy import SearchStrategy
+from services.metrics import metrics
+from database.connection import AsyncSessionLocal
+
+
+def overlap(primary: list[int], candidate: list[int]) -> float:
+    """Jaccard entre los ids devueltos por ambas estrategias (1.0 si ambas vacías)."""
+    a, b = set(primary), set(candidate)
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class ShadowEvaluator:
+    """
+    Ejecuta una estrategia candidata en segundo plano sobre una fracción de
+    las consultas reales y registra su latencia y el solapamiento con la
+    principal. Nunca bloquea la respuesta: usa su propia sesión de base de
+    datos y descarta muestras si ya hay demasiadas en vuelo.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        strategy: SearchStrategy,
+        sample_rate: float,
+        max_in_flight: int = 4,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.name = name
+        self.strategy = strategy
+        self.sample_rate = sample_rate
+        self.max_in_flight = max_in_flight
+        self.session_factory = session_factory
+        self._tasks: set[asyncio.Task] = set()
+
+    def maybe_schedule(
+        self,
+        query: str,
+        limit: int,
+        offsets: tuple[int, int, int],
+        primary_ids: dict[str, list[int]],
+    ) -> None:
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        if len(self._tasks) >= self.max_in_flight:
+            metrics.incr(f"shadow.{self.name}.dropped")
+            return
+
+        task = asyncio.create_task(self._run(query, limit, offsets, primary_ids))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        query: str,
+        limit: int,
+        offsets: tuple[int, int, int],
+        primary_ids: dict[str, list[int]],
+    ) -> None:
+        prefix = f"shadow.{self.name}"
+        try:
+            async with self.session_factory() as session:
+                start = time.perf_counter()
+                ranked = await self.strategy.rank_ids(
+                    session, query, max(offsets) + limit
+                )
+                latency_ms = (time.perf_counter() - start) * 1000
+
+            metrics.incr(f"{prefix}.runs")
+            metrics.observe(f"{prefix}.latency_ms", latency_ms)
+            for kind, offset in zip(("songs", "albums", "artists"), offsets):
+                candidate_ids = ranked.get(kind, [])[offset : offset + limit]
+                metrics.observe(
+                    f"{prefix}.overlap.{kind}",
+                    overlap(primary_ids.get(kind, []), candidate_ids),
+                )
+        except Exception as e:
+            metrics.incr(f"{prefix}.errors")
+            print(f"❌ Error en estrategia sombra '{self.name}': {e}")
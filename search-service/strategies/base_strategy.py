@@ -1,11 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from typing import Dict, Tuple, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import Song, Album, Artist
+from repositories.entity_loader import load_entities
 
 
 class SearchStrategy(ABC):
     @abstractmethod
+    async def rank_ids(
+        self,
+        session: AsyncSession,
+        query: str,
+        max_results: int,
+    ) -> Dict[str, List[int]]:
+        """Ids ordenados por relevancia para "songs", "albums" y "artists"."""
+        ...
+
     async def search(
         self,
         session: AsyncSession,
@@ -14,4 +24,23 @@ class SearchStrategy(ABC):
         offset_songs: int,
         offset_albums: int,
         offset_artists: int,
-    ) -> Tuple[List[Song], List[Album], List[Artist]]: ...
+    ) -> Tuple[List[Song], List[Album], List[Artist]]:
+        """Una página por tipo: se rankea una vez y se hidratan solo los ids de la página."""
+        offsets = {"songs": offset_songs, "albums": offset_albums, "artists": offset_artists}
+        ranked = await self.rank_ids(session, query, max(offsets.values()) + limit)
+
+        pages = []
+        for kind, offset in offsets.items():
+            ids = ranked.get(kind, [])[offset : offset + limit]
+            pages.append(await load_entities(session, kind, ids))
+        return pages[0], pages[1], pages[2]
+
+    @abstractmethod
+    async def search_top(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+    ) -> List[Tuple[str, int, float]]:
+        """Ranking único (tipo, id, score en [0, 1]) entre canciones, álbumes y artistas."""
+        ...
@@ -1,80 +1,81 @@
 # strategies/fuzzy_strategy.py
-from rapidfuzz import fuzz
-from typing import List, Tuple
+import heapq
+from rapidfuzz import fuzz, utils
+from typing import Dict, List, Tuple
 from strategies.base_strategy import SearchStrategy
-from repositories.song_repository import SongRepository
-from repositories.album_repository import AlbumRepository
-from repositories.artist_repository import ArtistRepository
+from repositories.catalog_repository import CatalogRepository
+from repositories.unified_repository import UnifiedRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 
 class FuzzySearchStrategy(SearchStrategy):
     def __init__(self, threshold: int = 70):
         self.threshold = threshold
 
-    async def _filter_objects(self, objects, query: str, field_name: str) -> List:
+    def _rank_texts(self, candidates: List[Tuple[int, str]], query: str) -> List[int]:
         """
-        Filtra una lista de OBJETOS usando fuzzy matching sobre un campo específico.
+        Ordena candidatos (id, texto) por fuzzy matching y descarta los que no
+        superan el umbral. Empates por id, para que el orden sea estable entre
+        páginas.
         """
-        filtered = []
-        for obj in objects:
-            try:
-                # Obtener el valor del campo usando getattr
-                field_value = getattr(obj, field_name, None)
-                if field_value:
-                    similarity = fuzz.partial_ratio(
-                        query.lower(), str(field_value).lower()
-                    )
-                    if similarity >= self.threshold:
-                        filtered.append((obj, similarity))
-            except Exception as e:
-                print(f"Error filtrando objeto: {e}")
-                continue
+        scored = []
+        for obj_id, text in candidates:
+            if text:
+                similarity = fuzz.partial_ratio(query.lower(), str(text).lower())
+                if similarity >= self.threshold:
+                    scored.append((obj_id, similarity))
 
-        # Ordenar por similitud (mayor a menor) y retornar solo los objetos
-        filtered.sort(key=lambda x: x[1], reverse=True)
-        return [item for item, score in filtered]
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return [obj_id for obj_id, score in scored]
 
-    async def search(
+    async def rank_ids(
         self,
         session: AsyncSession,
         query: str,
-        limit: int,
-        offset_songs: int,
-        offset_albums: int,
-        offset_artists: int,
-    ) -> Tuple[List, List, List]:
-        song_repo = SongRepository(session)
-        album_repo = AlbumRepository(session)
-        artist_repo = ArtistRepository(session)
+        max_results: int,
+    ) -> Dict[str, List[int]]:
+        catalog = CatalogRepository(session)
 
         try:
-            print(f"🎵 Buscando canciones con: '{query}'")
-            songs = await song_repo.get_by_title_ilike(query, limit * 3, offset_songs)
-            print(f"🎵 Canciones encontradas: {len(songs)}")
+            ranked = {}
+            for kind in ("songs", "albums", "artists"):
+                candidates = await catalog.search_texts(kind, query, max_results * 3)
+                ranked[kind] = self._rank_texts(candidates, query)[:max_results]
 
-            print(f"📀 Buscando álbumes con: '{query}'")
-            albums = await album_repo.get_by_title_ilike(query, limit * 3, offset_albums)
-            print(f"📀 Álbumes encontrados: {len(albums)}")
+            print(
+                f"🎯 Resultados después de filtro fuzzy: {len(ranked['songs'])} canciones, "
+                f"{len(ranked['albums'])} álbumes, {len(ranked['artists'])} artistas"
+            )
+            return ranked
 
-            print(f"👤 Buscando artistas con: '{query}'")
-            artists = await artist_repo.search_by_name(query, limit * 3, offset_artists)
-            print(f"👤 Artistas encontrados: {len(artists)}")
+        except Exception as e:
+            print(f"❌ Error en búsqueda fuzzy: {e}")
+            import traceback
+            traceback.print_exc()
+            return {"songs": [], "albums": [], "artists": []}
 
-            # Filtrar usando fuzzy matching sobre los objetos
-            filtered_songs = await self._filter_objects(songs, query, "title")
-            filtered_albums = await self._filter_objects(albums, query, "title")
-            filtered_artists = await self._filter_objects(artists, query, "artist_name")
+    async def search_top(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+    ) -> List[Tuple[str, int, float]]:
+        """
+        Un solo UNION ALL trae candidatos de los tres tipos y se puntúan todos
+        con el mismo scorer, así los scores son comparables entre tipos.
+        """
+        try:
+            candidates = await UnifiedRepository(session).top_candidates(query, limit * 3)
 
-            print(f"🎯 Resultados después de filtro fuzzy: {len(filtered_songs)} canciones, {len(filtered_albums)} álbumes, {len(filtered_artists)} artistas")
+            scored = []
+            for kind, obj_id, text in candidates:
+                score = fuzz.WRatio(query, text or "", processor=utils.default_process)
+                if score >= self.threshold:
+                    scored.append((kind, obj_id, score / 100))
 
-            return (
-                filtered_songs[:limit],
-                filtered_albums[:limit],
-                filtered_artists[:limit],
-            )
+            return heapq.nlargest(limit, scored, key=lambda hit: hit[2])
 
         except Exception as e:
-            print(f"❌ Error en búsqueda fuzzy: {e}")
+            print(f"❌ Error en búsqueda unificada fuzzy: {e}")
             import traceback
             traceback.print_exc()
-            return [], [], []
\ No newline at end of file
+            return []
@@ -0,0 +1,28 @@
+# strategies/registry.py
+from strategies.base_strategy import SearchStrategy
+from strategies.fuzzy_strategy import FuzzySearchStrategy
+from strategies.tfidf_strategy import TfidfSearchStrategy
+from strategies.token_strategy import TokenSearchStrategy
+from config import settings
+
+# Constructores por nombre; se eligen con SEARCH_STRATEGY / SEARCH_SHADOW_STRATEGY
+STRATEGY_BUILDERS = {
+    "fuzzy": lambda: FuzzySearchStrategy(threshold=settings.search_fuzzy_threshold),
+    "tfidf": lambda: TfidfSearchStrategy(),
+    "token": lambda: TokenSearchStrategy(),
+}
+
+_instances: dict[str, SearchStrategy] = {}
+
+
+def get_strategy(name: str) -> SearchStrategy:
+    """Devuelve la instancia (única por proceso) de la estrategia indicada."""
+    key = name.strip().lower()
+    if key not in STRATEGY_BUILDERS:
+        raise ValueError(
+            f"Estrategia de búsqueda desconocida: '{name}'. "
+            f"Disponibles: {', '.join(STRATEGY_BUILDERS)}"
+        )
+    if key not in _instances:
+        _instances[key] = STRATEGY_BUILDERS[key]()
+    return _instances[key]
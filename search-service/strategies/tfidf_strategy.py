@@ -0,0 +1,133 @@
+# strategies/tfidf_strategy.py
+import asyncio
+import heapq
+import time
+from typing import Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from strategies.base_strategy import SearchStrategy
+from indexing.tfidf_index import CharNgramTfidfIndex
+from repositories.catalog_repository import CatalogRepository
+from database.connection import AsyncSessionLocal
+
+
+class TfidfSearchStrategy(SearchStrategy):
+    """
+    Búsqueda difusa sobre todo el catálogo con TF-IDF de n-gramas de caracteres.
+
+    Los índices se comparten entre instancias. Solo la primera consulta
+    espera a construirlos; después, pasados `refresh_seconds`, se siguen
+    sirviendo los anteriores mientras una tarea en segundo plano (con su
+    propia sesión) construye los nuevos. Cada consulta es un producto
+    matriz-vector más `argpartition` para el top-k.
+    """
+
+    _indexes: dict[str, CharNgramTfidfIndex] | None = None
+    _built_at: float = 0.0
+    _lock = asyncio.Lock()
+    _refresh_task: asyncio.Task | None = None
+
+    def __init__(
+        self,
+        min_score: float = 0.3,
+        refresh_seconds: int = 300,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.min_score = min_score
+        self.refresh_seconds = refresh_seconds
+        self.session_factory = session_factory
+
+    async def _build_indexes(self) -> dict[str, CharNgramTfidfIndex]:
+        async with self.session_factory() as session:
+            catalog = CatalogRepository(session)
+            songs = await catalog.list_song_titles()
+            albums = await catalog.list_album_titles()
+            artists = await catalog.list_artist_names()
+
+        # Construir las matrices fuera del event loop
+        def fit_all():
+            return {
+                "songs": CharNgramTfidfIndex().fit(songs),
+                "albums": CharNgramTfidfIndex().fit(albums),
+                "artists": CharNgramTfidfIndex().fit(artists),
+            }
+
+        indexes = await asyncio.to_thread(fit_all)
+        print(
+            f"🧮 Índice TF-IDF construido: {len(indexes['songs'])} canciones, "
+            f"{len(indexes['albums'])} álbumes, {len(indexes['artists'])} artistas"
+        )
+        return indexes
+
+    async def _rebuild(self) -> None:
+        cls = type(self)
+        async with cls._lock:
+            cls._indexes = await self._build_indexes()
+            cls._built_at = time.monotonic()
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self._rebuild()
+        except Exception as e:
+            # Los índices anteriores siguen sirviendo; se reintentará al caducar
+            type(self)._built_at = time.monotonic()
+            print(f"❌ Error reconstruyendo el índice TF-IDF: {e}")
+
+    async def _get_indexes(self) -> dict[str, CharNgramTfidfIndex]:
+        cls = type(self)
+        if cls._indexes is None:
+            async with cls._lock:
+                # Otra corrutina pudo construirlo mientras esperábamos el lock
+                if cls._indexes is None:
+                    cls._indexes = await self._build_indexes()
+                    cls._built_at = time.monotonic()
+        elif time.monotonic() - cls._built_at > self.refresh_seconds:
+            if cls._refresh_task is None or cls._refresh_task.done():
+                cls._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return cls._indexes
+
+    async def rank_ids(
+        self,
+        session: AsyncSession,
+        query: str,
+        max_results: int,
+    ) -> Dict[str, List[int]]:
+        try:
+            indexes = await self._get_indexes()
+            ranked = {
+                kind: [doc_id for doc_id, _ in index.search(query, max_results, self.min_score)]
+                for kind, index in indexes.items()
+            }
+            print(
+                f"🎯 TF-IDF '{query}': {len(ranked['songs'])} canciones, "
+                f"{len(ranked['albums'])} álbumes, {len(ranked['artists'])} artistas"
+            )
+            return ranked
+
+        except Exception as e:
+            print(f"❌ Error en búsqueda TF-IDF: {e}")
+            import traceback
+            traceback.print_exc()
+            return {"songs": [], "albums": [], "artists": []}
+
+    async def search_top(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+    ) -> List[Tuple[str, int, float]]:
+        """La similitud coseno ya es comparable entre índices: se mezclan los top-k."""
+        try:
+            indexes = await self._get_indexes()
+            kinds = {"songs": "song", "albums": "album", "artists": "artist"}
+            hits = [
+                (kind, doc_id, score)
+                for name, kind in kinds.items()
+                for doc_id, score in indexes[name].search(query, limit, self.min_score)
+            ]
+            return heapq.nlargest(limit, hits, key=lambda hit: hit[2])
+
+        except Exception as e:
+            print(f"❌ Error en búsqueda unificada TF-IDF: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
@@ -0,0 +1,119 @@
+# strategies/token_strategy.py
+import asyncio
+import heapq
+from typing import Dict, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from strategies.base_strategy import SearchStrategy
+from indexing.manager import IndexManager, index_manager
+from indexing.query_parser import ParsedQuery, parse_query
+from indexing.token_index import TokenIndex
+from indexing import planner
+from repositories.catalog_repository import CatalogRepository
+
+# A partir de estos bytes de postings, decodificar (varint en Python puro)
+# bloquearía el event loop durante milisegundos: se hace en un hilo
+OFFLOAD_POSTING_BYTES = 64 * 1024
+# Frases formadas solo por términos omnipresentes: filas (ILIKE) a verificar
+PHRASE_SCAN_LIMIT = 5000
+
+
+class TokenSearchStrategy(SearchStrategy):
+    """
+    Búsqueda por intersección de tokens (con stopwords y stemming es/en)
+    sobre el índice invertido en memoria, en lugar de `partial_ratio` sobre
+    cadenas completas.
+
+    Admite la sintaxis de campos (`artist:`, `album:`, `genre:`,
+    `year:2020..2023`) y frases entre comillas; ver `indexing.planner`.
+    """
+
+    def __init__(self, manager: IndexManager = index_manager):
+        self.manager = manager
+
+    @staticmethod
+    async def _run(cost: float, fn, *args):
+        """Ejecuta `fn` en el loop si es barata, o en un hilo si no."""
+        if cost > OFFLOAD_POSTING_BYTES:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def _execute(
+        self,
+        session: AsyncSession,
+        kind: str,
+        index: TokenIndex,
+        parsed: ParsedQuery,
+        max_results: int,
+    ) -> List[int]:
+        """
+        Ejecuta el plan sobre un tipo. Las frases se verifican cargando el
+        texto solo de los candidatos: el índice no guarda el de cada documento.
+        """
+        predicates = planner.plan(index, parsed)
+        if not predicates or max_results <= 0:
+            return []
+        matched = await self._run(
+            planner.plan_cost(index, predicates), planner.match, index, predicates
+        )
+
+        verifiers = planner.phrase_verifiers(predicates)
+        if verifiers and (matched is None or matched):
+            catalog = CatalogRepository(session)
+            if matched is None:
+                rows = await catalog.search_texts(kind, parsed.phrases[0], PHRASE_SCAN_LIMIT)
+                texts = dict(rows)
+            else:
+                texts = await catalog.get_texts(kind, matched)
+            matched = planner.verify(verifiers, texts)
+
+        hits = planner.score(index, parsed, matched or (), max_results)
+        return [doc_id for doc_id, _ in hits]
+
+    async def rank_ids(
+        self,
+        session: AsyncSession,
+        query: str,
+        max_results: int,
+    ) -> Dict[str, List[int]]:
+        try:
+            index = await self.manager.get_index()
+            parsed = parse_query(query)
+            ranked = {
+                kind: await self._execute(session, kind, index[kind], parsed, max_results)
+                for kind in index.KINDS
+            }
+            print(
+                f"🎯 Tokens '{query}': {len(ranked['songs'])} canciones, "
+                f"{len(ranked['albums'])} álbumes, {len(ranked['artists'])} artistas"
+            )
+            return ranked
+
+        except Exception as e:
+            print(f"❌ Error en búsqueda por tokens: {e}")
+            import traceback
+            traceback.print_exc()
+            return {"songs": [], "albums": [], "artists": []}
+
+    async def search_top(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+    ) -> List[Tuple[str, int, float]]:
+        """El score (cobertura del documento) está en [0, 1] para los tres tipos."""
+        try:
+            index = await self.manager.get_index()
+            kinds = {"songs": "song", "albums": "album", "artists": "artist"}
+            hits = []
+            for name, kind in kinds.items():
+                found = await self._run(
+                    index[name].query_cost(query), index[name].search, query, limit
+                )
+                hits.extend((kind, doc_id, score) for doc_id, score in found)
+            return heapq.nlargest(limit, hits, key=lambda hit: hit[2])
+
+        except Exception as e:
+            print(f"❌ Error en búsqueda unificada por tokens: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
@@ -8,6 +8,8 @@ class Settings(BaseSettings):
     db_url: str = Field(alias="db_url_py")
     jwt_secret: str
     jwt_algorithm: str = "HS256"
+    # Claims ya verificados que se recuerdan por worker (LRU)
+    jwt_cache_max_entries: int = 10000
     port: int = Field(alias="SUBSCRIPTION_PORT", default=8007)
     # Orígenes permitidos para CORS (configurable)
     frontend_origins_raw: str = Field(alias="FRONTEND_ORIGINS", default="http://localhost:5173")
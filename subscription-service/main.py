@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from handlers.subscription_handler import router as subscription_router
-from middleware.auth_middleware import AuthMiddleware
+from middleware.auth_middleware import AuthMiddleware, token_cache
 from config import settings
 import uvicorn
 
@@ -29,6 +29,11 @@ def health_check():
     return {"status": "ok"}
 
 
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return token_cache.stats()
+
+
 if __name__ == "__main__":
     # Usar el puerto configurado en settings para respetar la variable de entorno
     uvicorn.run("main:app", host="0.0.0.0", port=settings.port, reload=True)
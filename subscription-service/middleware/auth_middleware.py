@@ -1,50 +1,98 @@
-from fastapi import Request, HTTPException
-from fastapi.security import HTTPBearer
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 import jwt
 
 from config import settings
+from middleware.token_cache import VerifiedTokenCache
 
 # claims requeridos según tu auth-service en Go
 REQUIRED_CLAIMS = {"user_id", "username", "email", "role", "exp"}
 
+# Rutas que no requieren autenticación (prefijos, para str.startswith)
+PUBLIC_PREFIXES = ("/health",)
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.url.path.startswith("/health"):
-            return await call_next(request)
+token_cache = VerifiedTokenCache(max_entries=settings.jwt_cache_max_entries)
 
-        auth = HTTPBearer(auto_error=False)
-        credentials = await auth(request)
-        if credentials is None:
-            raise HTTPException(status_code=401, detail="Falta header Authorization")
+_DECODE_OPTIONS = {"verify_signature": True, "require": list(REQUIRED_CLAIMS)}
+_ALGORITHMS = [settings.jwt_algorithm]
 
-        token = credentials.credentials
+
+def _error(status_code: int, detail: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"detail": detail})
+
+
+# Respuestas de error fijas: se construyen una vez y se reutilizan
+_MISSING_AUTH = _error(401, "Falta header Authorization")
+_EXPIRED = _error(401, "Token expirado")
+_BAD_SIGNATURE = _error(401, "Firma no válida")
+_INVALID_TOKEN = _error(401, "Token inválido")
+
+
+def bearer_token(scope: Scope) -> str | None:
+    """Token de `Authorization: Bearer <token>`, leído directamente del scope."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            return token
+    return None
+
+
+def authenticate(token: str) -> dict:
+    """Claims del usuario; lanza los errores de `jwt` si el token no es válido."""
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+
+    payload = jwt.decode(
+        token, settings.jwt_secret, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS
+    )
+    user = {
+        "user_id": payload["user_id"],
+        "username": payload["username"],
+        "email": payload["email"],
+        "role": payload["role"],
+    }
+    token_cache.put(token, user, payload["exp"])
+    return user
+
+
+class AuthMiddleware:
+    """
+    Middleware ASGI puro: a diferencia de BaseHTTPMiddleware no crea tareas
+    ni envuelve el stream de la respuesta, y en el camino feliz no construye
+    ningún objeto (ni Request ni HTTPBearer). El usuario queda en
+    `request.state.user`; los handlers solo lo leen, así que se comparte la
+    entrada de la caché de tokens.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(PUBLIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        token = bearer_token(scope)
+        if token is None:
+            await _MISSING_AUTH(scope, receive, send)
+            return
 
         try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm],
-                options={
-                    "verify_signature": True,
-                    "require": list(REQUIRED_CLAIMS),
-                },
-            )
+            user = authenticate(token)
         except jwt.ExpiredSignatureError:
-            raise HTTPException(status_code=401, detail="Token expirado")
+            response = _EXPIRED
         except jwt.InvalidSignatureError:
-            raise HTTPException(status_code=401, detail="Firma no válida")
+            response = _BAD_SIGNATURE
         except jwt.MissingRequiredClaimError as e:
-            raise HTTPException(status_code=400, detail=f"Falta claim: {e.claim}")
+            response = _error(400, f"Falta claim: {e.claim}")
         except jwt.InvalidTokenError:
-            raise HTTPException(status_code=401, detail="Token inválido")
-
-        request.state.user = {
-            "user_id": payload["user_id"],
-            "username": payload["username"],
-            "email": payload["email"],
-            "role": payload["role"],
-        }
+            response = _INVALID_TOKEN
+        else:
+            scope.setdefault("state", {})["user"] = user
+            await self.app(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await response(scope, receive, send)